@@ -2,7 +2,14 @@ from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
+from pymongo.errors import PyMongoError
 from scheduler import start_scheduler
+from commands import register_commands
+from utils.db import db
+from utils.indexes import ensure_indexes
+from utils.json_provider import OrjsonProvider
+from utils.metrics import init_metrics
+from utils.compression import init_compression
 from routes.auth_routes import auth_bp
 from routes.food_routes import food_bp
 
@@ -10,6 +17,7 @@ from routes.food_routes import food_bp
 
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     CORS(
         app,
@@ -23,9 +31,24 @@ def create_app():
 
     CORS(app)
     JWTManager(app)
+    register_commands(app)
+    init_metrics(app)
+    # after_request hooks run in reverse, so metrics sees compressed sizes
+    init_compression(app)
 
-    # start background jobs
-    start_scheduler(app)
+    try:
+        ensure_indexes(db)
+    except PyMongoError as e:
+        # legacy { lat, lng } documents block the 2dsphere index,
+        # duplicate emails block the unique one
+        app.logger.warning(
+            "Index creation failed (%s); run `flask migrate-locations` "
+            "and `flask ensure-indexes`", e
+        )
+
+    # start background jobs (leader-elected across processes)
+    if Config.RUN_JOBS:
+        start_scheduler(app)
 
     @app.route("/")
     def home():
@@ -33,7 +56,10 @@ def create_app():
 
     return app
 
-app = create_app()
+# `python app.py`: the password hashing workers re-import this module
+# as __mp_main__ and must not build (and start) another app
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=False, host='0.0.0.0')
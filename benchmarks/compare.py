@@ -0,0 +1,51 @@
+# python -m benchmarks.compare baseline.json candidate.json
+import argparse
+import json
+
+
+def change(old, new):
+    if not old:
+        return "    n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--fail-over", type=float, default=None,
+                        help="exit 1 if any route's p95 regresses by more than this percent")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        old = json.load(f)["routes"]
+    with open(args.candidate) as f:
+        new = json.load(f)["routes"]
+
+    regressed = []
+    print(f"{'route':24} {'rps':>16} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17}")
+
+    for route in sorted(set(old) | set(new)):
+        if route not in old or route not in new:
+            print(f"{route:24} only in {'candidate' if route in new else 'baseline'}")
+            continue
+
+        a, b = old[route], new[route]
+        print(
+            f"{route:24} {b['rps']:8.1f} {change(a['rps'], b['rps'])} "
+            f"{b['p50_ms']:9.1f} {change(a['p50_ms'], b['p50_ms'])} "
+            f"{b['p95_ms']:9.1f} {change(a['p95_ms'], b['p95_ms'])} "
+            f"{b['p99_ms']:9.1f} {change(a['p99_ms'], b['p99_ms'])}"
+        )
+
+        if args.fail_over is not None and a["p95_ms"] and \
+                (b["p95_ms"] - a["p95_ms"]) / a["p95_ms"] * 100 > args.fail_over:
+            regressed.append(route)
+
+    if regressed:
+        print(f"p95 regressed by more than {args.fail_over}% on: {', '.join(regressed)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
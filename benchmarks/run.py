@@ -0,0 +1,268 @@
+# Drive the API under concurrency and report per-route latency:
+#
+#   MONGO_DB_NAME=zero_hunger_bench python -m benchmarks.run --duration 60 --concurrency 32
+#
+# Runs against the app in-process (Flask test client) by default, or
+# against a running server with --base-url http://localhost:5000.
+# Results are printed and written as JSON to --out for
+# `python -m benchmarks.compare old.json new.json`.
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+os.environ.setdefault("RUN_JOBS", "false")
+
+from flask_jwt_extended import create_access_token
+from config import Config
+from utils.db import users_collection
+from benchmarks.seed import CENTER, SPREAD, make_jpeg
+
+FLOWS = {"donor": 0.3, "volunteer": 0.5, "public": 0.2}
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers=None, body=None):
+        response = self.client.open(path, method=method, headers=headers, json=body)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    # one keep-alive connection per worker thread
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+
+    def request(self, method, path, headers=None, body=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            return 599, b""
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bytes = defaultdict(int)
+
+    # Returns (status, parsed JSON body or None). Statuses outside `ok`
+    # count as errors; callers still check the status before relying on
+    # the call having done anything.
+    def call(self, client, route, method, path, headers=None, body=None, ok=(200, 201)):
+        started = time.perf_counter()
+        status, data = client.request(method, path, headers, body)
+        elapsed = time.perf_counter() - started
+
+        with self.lock:
+            self.latencies[route].append(elapsed)
+            self.bytes[route] += len(data)
+            if status not in ok:
+                self.errors[route] += 1
+
+        if status in ok and data:
+            try:
+                return status, json.loads(data)
+            except ValueError:
+                pass
+        return status, None
+
+
+def auth(user):
+    token = create_access_token(identity=str(user["_id"]), additional_claims={"role": user["role"]})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def food_payload(rng, image):
+    return {
+        "foodName": "Bench meal",
+        "quantity": str(rng.randint(1, 20)),
+        "foodType": "veg",
+        "itemCategory": rng.choice(["cooked", "packed"]),
+        "expiryTime": (datetime.utcnow() + timedelta(hours=6)).isoformat(),
+        "location": {
+            "lat": CENTER[0] + rng.uniform(-SPREAD, SPREAD),
+            "lng": CENTER[1] + rng.uniform(-SPREAD, SPREAD)
+        },
+        "address": "Bench Road",
+        "isSameAsLocation": True,
+        "image": image
+    }
+
+
+def donor_flow(rec, client, rng, headers, image):
+    rec.call(client, "POST /add", "POST", "/api/food/add", headers, food_payload(rng, image))
+    rec.call(client, "GET /my-foods", "GET", "/api/food/my-foods?limit=20", headers)
+    rec.call(client, "GET /donor-stats", "GET", "/api/food/donor-stats", headers)
+
+
+def volunteer_flow(rec, client, rng, headers, image):
+    lat = CENTER[0] + rng.uniform(-SPREAD, SPREAD)
+    lng = CENTER[1] + rng.uniform(-SPREAD, SPREAD)
+
+    _, page = rec.call(
+        client, "GET /available", "GET",
+        f"/api/food/available?lat={lat}&lng={lng}&radius=5&limit=20", headers
+    )
+    items = (page or {}).get("items") or []
+    if not items:
+        return
+
+    food_id = rng.choice(items)["_id"]
+
+    # losing the race for an item is expected under concurrency (a 400,
+    # not an error), but ends this volunteer's flow
+    status, _ = rec.call(
+        client, "POST /reserve", "POST", f"/api/food/reserve/{food_id}", headers, ok=(200, 400)
+    )
+    if status != 200:
+        return
+
+    status, _ = rec.call(client, "POST /pick", "POST", f"/api/food/pick/{food_id}", headers)
+    if status != 200:
+        return
+
+    rec.call(
+        client, "POST /deliver", "POST", f"/api/food/deliver/{food_id}", headers,
+        {"deliveryAddress": "Shelter Road", "deliveryImage": image}
+    )
+
+
+def public_flow(rec, client, rng, headers, image):
+    for route in ("stats", "donors", "deliveries", "volunteers"):
+        rec.call(client, f"GET /public/{route}", "GET", f"/api/food/public/{route}")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def summarize(rec, elapsed):
+    routes = {}
+
+    for route, values in sorted(rec.latencies.items()):
+        values = sorted(values)
+        routes[route] = {
+            "count": len(values),
+            "errors": rec.errors[route],
+            "rps": len(values) / elapsed,
+            "mean_ms": sum(values) / len(values) * 1000,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000,
+            "avg_bytes": rec.bytes[route] / len(values)
+        }
+
+    return routes
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API benchmark")
+    parser.add_argument("--base-url")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=200, help="sampled donors and volunteers")
+    parser.add_argument("--image-kb", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default=f"benchmarks/results/{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    args = parser.parse_args(argv)
+
+    if Config.MONGO_DB_NAME == "zero_hunger":
+        sys.exit("Set MONGO_DB_NAME to the seeded benchmark database")
+
+    from app import app
+
+    with app.app_context():
+        donors = [auth(u) for u in users_collection.find({"role": "donor"}).limit(args.users)]
+        volunteers = [auth(u) for u in users_collection.find({"role": "volunteer"}).limit(args.users)]
+
+    if not donors or not volunteers:
+        sys.exit("No users found; run `python -m benchmarks.seed` first")
+
+    image = base64.b64encode(make_jpeg(random.Random(args.seed), args.image_kb)).decode()
+    rec = Recorder()
+    deadline = time.perf_counter() + args.duration
+
+    def worker(n):
+        rng = random.Random(args.seed + n)
+        client = HttpClient(args.base_url) if args.base_url else InProcessClient(app)
+
+        while time.perf_counter() < deadline:
+            flow = rng.choices(list(FLOWS), list(FLOWS.values()))[0]
+            if flow == "donor":
+                donor_flow(rec, client, rng, rng.choice(donors), image)
+            elif flow == "volunteer":
+                volunteer_flow(rec, client, rng, rng.choice(volunteers), image)
+            else:
+                public_flow(rec, client, rng, None, image)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    routes = summarize(rec, elapsed)
+
+    print(f"{'route':24} {'count':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'bytes':>10}")
+    for route, r in routes.items():
+        print(
+            f"{route:24} {r['count']:7d} {r['errors']:5d} {r['rps']:8.1f} "
+            f"{r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f} {r['avg_bytes']:10.0f}"
+        )
+
+    result = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(),
+            "commit": git_commit(),
+            "mode": "http" if args.base_url else "in-process",
+            "elapsed_s": elapsed,
+            **{k: v for k, v in vars(args).items() if k != "out"}
+        },
+        "routes": routes
+    }
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
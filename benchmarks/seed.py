@@ -0,0 +1,183 @@
+# Seed a throwaway database with production-like volumes:
+#
+#   MONGO_DB_NAME=zero_hunger_bench python -m benchmarks.seed --foods 200000
+#
+# Refuses to touch the default database. Images are real JPEGs of about
+# --image-kb each; by default a pool of them goes through the blob store
+# like uploads do, --inline-images stores base64 in the documents the
+# way the API did before the blob store (useful for before/after runs).
+import argparse
+import base64
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from PIL import Image
+from werkzeug.security import generate_password_hash
+from config import Config
+from utils.db import client, db
+from utils.geo import geohash_of, to_geojson
+from utils.indexes import ensure_indexes
+from services.counter_service import reconcile_counters
+from services.map_service import reconcile_cells
+from services.image_service import store_image
+from services.sync_service import next_change_seq
+
+BENCH_PASSWORD = "benchmark"
+
+# a city-sized box around Hyderabad
+CENTER = (17.385, 78.4867)
+SPREAD = 0.15
+
+STATUS_WEIGHTS = {
+    "available": 0.35,
+    "reserved": 0.05,
+    "picked": 0.03,
+    "delivered": 0.42,
+    "expired": 0.15
+}
+
+
+def random_location(rng):
+    return {
+        "lat": CENTER[0] + rng.uniform(-SPREAD, SPREAD),
+        "lng": CENTER[1] + rng.uniform(-SPREAD, SPREAD)
+    }
+
+
+def make_jpeg(rng, size_kb):
+    # noise compresses badly, so the pixel count sets the file size
+    side = max(int((size_kb * 1024 / 1.5) ** 0.5), 16)
+    img = Image.frombytes("RGB", (side, side), rng.randbytes(side * side * 3))
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def seed_users(rng, role, count, password_hash, batch):
+    ids = []
+    now = datetime.utcnow()
+
+    for start in range(0, count, batch):
+        docs = []
+        for i in range(start, min(start + batch, count)):
+            docs.append({
+                "_id": ObjectId(),
+                "name": f"{role.title()} {i}",
+                "email": f"{role}{i}@bench.local",
+                "phone": f"9{i:09d}",
+                "password": password_hash,
+                "role": role,
+                "address": f"{i} Bench Street",
+                "location": to_geojson(random_location(rng)),
+                "karmaPoints": rng.randint(0, 500) if role == "volunteer" else 0,
+                "deliveriesCompleted": rng.randint(0, 50) if role == "volunteer" else 0,
+                "isActive": True,
+                "createdAt": now - timedelta(days=rng.uniform(0, 365))
+            })
+        db.users.insert_many(docs, ordered=False)
+        ids.extend(str(doc["_id"]) for doc in docs)
+
+    return ids
+
+
+def seed_foods(rng, count, donors, volunteers, images, batch):
+    now = datetime.utcnow()
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    last_seq = next_change_seq(count)
+    seq = last_seq - count
+
+    for start in range(0, count, batch):
+        docs = []
+        for _ in range(min(batch, count - start)):
+            seq += 1
+            status = rng.choices(statuses, weights)[0]
+            created = now - timedelta(hours=rng.uniform(0, 24 * 90))
+            category = rng.choice(["cooked", "packed"])
+            location = to_geojson(random_location(rng))
+            doc = {
+                "donorId": rng.choice(donors),
+                "foodName": rng.choice(["Rice", "Dal", "Bread", "Biryani", "Fruit", "Snacks"]),
+                "quantity": str(rng.randint(1, 50)),
+                "foodType": rng.choice(["veg", "non-veg"]),
+                "itemCategory": category,
+                "expiryTime": now + timedelta(hours=rng.uniform(1, 48)) if status == "available"
+                else created + timedelta(hours=rng.uniform(2, 24)),
+                "location": location,
+                "geohash": geohash_of(location),
+                "address": "Bench Road",
+                "isSameAsLocation": True,
+                "image": rng.choice(images),
+                "status": status,
+                "createdAt": created,
+                "updatedAt": created,
+                "changeSeq": seq
+            }
+
+            if status != "available" and status != "expired":
+                doc["reservedBy"] = rng.choice(volunteers)
+                doc["reservedAt"] = created + timedelta(minutes=rng.uniform(5, 120))
+            if status in ("picked", "delivered"):
+                doc["pickedAt"] = doc["reservedAt"] + timedelta(minutes=rng.uniform(5, 60))
+            if status == "delivered":
+                doc["deliveredAt"] = doc["pickedAt"] + timedelta(minutes=rng.uniform(10, 90))
+                doc["deliveryAddress"] = "Shelter Road"
+                doc["deliveryImage"] = rng.choice(images)
+                doc["deliveryNotes"] = ""
+            if status == "expired":
+                doc["expiredAt"] = doc["expiryTime"]
+
+            docs.append(doc)
+
+        db.foods.insert_many(docs, ordered=False)
+        print(f"  foods {start + len(docs)}/{count}", end="\r", flush=True)
+
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a benchmark database")
+    parser.add_argument("--donors", type=int, default=2000)
+    parser.add_argument("--volunteers", type=int, default=3000)
+    parser.add_argument("--foods", type=int, default=200000)
+    parser.add_argument("--image-kb", type=int, default=150)
+    parser.add_argument("--image-pool", type=int, default=64)
+    parser.add_argument("--inline-images", action="store_true")
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if Config.MONGO_DB_NAME == "zero_hunger":
+        sys.exit("Set MONGO_DB_NAME to a throwaway database (e.g. zero_hunger_bench)")
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    client.drop_database(Config.MONGO_DB_NAME)
+    ensure_indexes(db)
+
+    print(f"Generating {args.image_pool} images of ~{args.image_kb} KB")
+    raw_images = [make_jpeg(rng, args.image_kb) for _ in range(args.image_pool)]
+    if args.inline_images:
+        images = [base64.b64encode(data).decode() for data in raw_images]
+    else:
+        images = [store_image(data) for data in raw_images]
+
+    password_hash = generate_password_hash(BENCH_PASSWORD, Config.PASSWORD_HASH_METHOD)
+    donors = seed_users(rng, "donor", args.donors, password_hash, args.batch)
+    volunteers = seed_users(rng, "volunteer", args.volunteers, password_hash, args.batch)
+    print(f"Seeded {len(donors)} donors and {len(volunteers)} volunteers")
+
+    seed_foods(rng, args.foods, donors, volunteers, images, args.batch)
+    reconcile_counters()
+    reconcile_cells()
+
+    print(f"Done in {time.perf_counter() - started:.1f}s ({Config.MONGO_DB_NAME} on {os.getenv('MONGO_URI')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import click
+from pymongo import UpdateOne
+from utils.db import db, foods_collection, users_collection
+from utils.indexes import ensure_indexes
+from utils.geo import to_geojson
+from services.image_service import InvalidImage, store_base64_image
+from services.counter_service import reconcile_counters
+from services.map_service import reconcile_cells
+from services.rollup_service import reset_rollups, roll_up, roll_up_archive
+from services.leaderboard_service import rebuild_windows
+from services.archive_service import archive_foods
+
+BATCH_SIZE = 500
+
+
+def register_commands(app):
+
+    # flask --app app ensure-indexes
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        """Create any missing indexes from utils/indexes.py."""
+        for collection_name, names in ensure_indexes(db).items():
+            click.echo(f"{collection_name}: {', '.join(names)}")
+
+    # flask --app app reconcile-counters
+    @app.cli.command("reconcile-counters")
+    def reconcile_counters_command():
+        """Rebuild the stats counters and map cells from the source collections."""
+        scopes = reconcile_counters()
+        click.echo(f"Rebuilt {scopes} counter documents")
+
+        cells = reconcile_cells()
+        click.echo(f"Rebuilt {cells} map cells")
+
+    # flask --app app rebuild-rollups
+    @app.cli.command("rebuild-rollups")
+    def rebuild_rollups_command():
+        """Recount the daily analytics buckets from every food, archived included."""
+        reset_rollups()
+        processed = roll_up() + roll_up_archive()
+        click.echo(f"Rolled up {processed} foods")
+
+    # flask --app app rebuild-karma-windows
+    @app.cli.command("rebuild-karma-windows")
+    def rebuild_karma_windows_command():
+        """Rebuild this week's and month's leaderboards from delivered foods."""
+        written = rebuild_windows()
+        click.echo(f"Rebuilt {written} leaderboard entries")
+
+    # flask --app app archive-foods
+    @app.cli.command("archive-foods")
+    def archive_foods_command():
+        """Move old delivered and expired foods to foods_archive now."""
+        archived = archive_foods()
+        click.echo(f"Archived {archived} foods")
+
+    # flask --app app migrate-locations
+    @app.cli.command("migrate-locations")
+    def migrate_locations():
+        """Convert legacy { lat, lng } locations to GeoJSON Points."""
+        for collection in (foods_collection, users_collection):
+            converted = 0
+            skipped = 0
+            ops = []
+
+            for doc in collection.find(
+                {"location.lat": {"$exists": True}},
+                {"location": 1}
+            ):
+                point = to_geojson(doc["location"])
+                if point is None:
+                    skipped += 1
+                    continue
+
+                ops.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"location": point}}
+                ))
+
+                if len(ops) >= BATCH_SIZE:
+                    converted += collection.bulk_write(ops, ordered=False).modified_count
+                    ops = []
+
+            if ops:
+                converted += collection.bulk_write(ops, ordered=False).modified_count
+
+            click.echo(f"{collection.name}: {converted} converted, {skipped} invalid")
+
+        ensure_indexes(db)
+        click.echo("Indexes ready")
+
+    # flask --app app migrate-images
+    @app.cli.command("migrate-images")
+    def migrate_images():
+        """Move inline base64 food images into the blob store."""
+        for field in ("image", "deliveryImage"):
+            migrated = 0
+            failed = 0
+            ops = []
+
+            for doc in foods_collection.find(
+                {field: {"$type": "string"}},
+                {field: 1}
+            ):
+                try:
+                    ref = store_base64_image(doc[field])
+                except InvalidImage:
+                    failed += 1
+                    continue
+
+                ops.append(UpdateOne(
+                    {"_id": doc["_id"], field: {"$type": "string"}},
+                    {"$set": {field: ref}}
+                ))
+
+                if len(ops) >= BATCH_SIZE:
+                    migrated += foods_collection.bulk_write(ops, ordered=False).modified_count
+                    ops = []
+
+            if ops:
+                migrated += foods_collection.bulk_write(ops, ordered=False).modified_count
+
+            click.echo(f"{field}: {migrated} migrated, {failed} unreadable")
@@ -11,3 +11,139 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     MONGO_URI = os.getenv("MONGO_URI")
+    MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "zero_hunger")
+
+    # Nearby search on /api/food/available (kilometres)
+    DEFAULT_SEARCH_RADIUS_KM = float(os.getenv("DEFAULT_SEARCH_RADIUS_KM", 10))
+    MAX_SEARCH_RADIUS_KM = float(os.getenv("MAX_SEARCH_RADIUS_KM", 100))
+
+    # Image blob storage
+    BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local")
+    BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "blobs")
+    IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL", "/api/food/images")
+    THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", 320))
+    MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", 10 * 1024 * 1024))
+    # whole multipart request on /add and /deliver (image + form fields)
+    MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", MAX_IMAGE_BYTES + 64 * 1024))
+
+    # Cursor pagination on list endpoints
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", 20))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", 1000))
+
+    # Pages of at least this many items are streamed as chunked JSON
+    STREAM_MIN_ITEMS = int(os.getenv("STREAM_MIN_ITEMS", 100))
+    STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", 64 * 1024))
+
+    # Expiry engine
+    EXPIRY_BATCH_SIZE = int(os.getenv("EXPIRY_BATCH_SIZE", 500))
+    EXPIRY_RESEED_SECONDS = int(os.getenv("EXPIRY_RESEED_SECONDS", 30))
+    EXPIRY_CATCHUP_SECONDS = int(os.getenv("EXPIRY_CATCHUP_SECONDS", 2))
+    EXPIRY_HORIZON_SECONDS = int(os.getenv("EXPIRY_HORIZON_SECONDS", 3600))
+    EXPIRY_SEED_LIMIT = int(os.getenv("EXPIRY_SEED_LIMIT", 10000))
+
+    # Reservations: 0 disables the hold limit / per-volunteer cap
+    RESERVATION_HOLD_MINUTES = int(os.getenv("RESERVATION_HOLD_MINUTES", 120))
+    RESERVATION_SWEEP_SECONDS = int(os.getenv("RESERVATION_SWEEP_SECONDS", 60))
+    MAX_ACTIVE_RESERVATIONS = int(os.getenv("MAX_ACTIVE_RESERVATIONS", 0))
+
+    # Background jobs: set RUN_JOBS=false on web processes when a
+    # separate `python worker.py` runs them
+    RUN_JOBS = os.getenv("RUN_JOBS", "true").lower() == "true"
+    LEADER_LEASE_SECONDS = int(os.getenv("LEADER_LEASE_SECONDS", 15))
+    LEADER_HEARTBEAT_SECONDS = int(os.getenv("LEADER_HEARTBEAT_SECONDS", 5))
+
+    # Bulk intake (/api/food/add/bulk)
+    BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 500))
+    BULK_INSERT_CHUNK = int(os.getenv("BULK_INSERT_CHUNK", 100))
+    BULK_IMAGE_WORKERS = int(os.getenv("BULK_IMAGE_WORKERS", 4))
+
+    # Cart batch endpoints (/api/food/cart/*)
+    CART_BATCH_MAX = int(os.getenv("CART_BATCH_MAX", 50))
+
+    # Server-sent events feed (/api/food/stream)
+    CHANGE_FEED_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", 256))
+    CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", 2))
+    SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+
+    # Delta sync (?since=<token>). Keep tombstones for longer than a
+    # client stays offline; older tokens get a 410 and must refetch.
+    SYNC_TOMBSTONE_TTL_HOURS = int(os.getenv("SYNC_TOMBSTONE_TTL_HOURS", 168))
+    SYNC_SEQ_OVERLAP = int(os.getenv("SYNC_SEQ_OVERLAP", 20))
+    SYNC_MAX_CHANGES = int(os.getenv("SYNC_MAX_CHANGES", 1000))
+
+    # Log requests slower than this with their Mongo commands (0 = off)
+    SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", 0))
+    # Share of Mongo replies whose encoded size is measured for
+    # mongodb_reply_size_bytes (slow requests measure all of theirs)
+    MONGO_REPLY_SAMPLE_RATE = float(os.getenv("MONGO_REPLY_SAMPLE_RATE", 0.01))
+    # worker.py serves its own /metrics here (expiry engine, jobs); 0 = off
+    WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", 9100))
+
+    # In-process response cache (utils/response_cache.py); TTLs in
+    # seconds per cached endpoint, 0 turns caching off for it
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    RESPONSE_CACHE_TTL = {
+        "public-stats": int(os.getenv("CACHE_TTL_PUBLIC_STATS", 30)),
+        "public-donors": int(os.getenv("CACHE_TTL_PUBLIC_DONORS", 60)),
+        "public-deliveries": int(os.getenv("CACHE_TTL_PUBLIC_DELIVERIES", 30)),
+        "public-volunteers": int(os.getenv("CACHE_TTL_PUBLIC_VOLUNTEERS", 60)),
+        "platform-stats": int(os.getenv("CACHE_TTL_PLATFORM_STATS", 30)),
+        "public-leaderboard": int(os.getenv("CACHE_TTL_PUBLIC_LEADERBOARD", 30))
+    }
+
+    # Weekly / monthly leaderboard totals are kept this long after the
+    # period ends
+    KARMA_WINDOW_RETENTION_DAYS = int(os.getenv("KARMA_WINDOW_RETENTION_DAYS", 35))
+
+    # Cart route planner (/api/food/my-cart/route): assumed travel speed,
+    # and the detour (km) worth taking to avoid being an hour late
+    ROUTE_SPEED_KMH = float(os.getenv("ROUTE_SPEED_KMH", 20))
+    ROUTE_LATENESS_WEIGHT_KM = float(os.getenv("ROUTE_LATENESS_WEIGHT_KM", 30))
+    ROUTE_MAX_STOPS = int(os.getenv("ROUTE_MAX_STOPS", 100))
+    ROUTE_MAX_PASSES = int(os.getenv("ROUTE_MAX_PASSES", 5))
+
+    # Ranked feed (/api/food/available/ranked)
+    FEED_CANDIDATES = int(os.getenv("FEED_CANDIDATES", 2000))
+    FEED_URGENCY_HOURS = float(os.getenv("FEED_URGENCY_HOURS", 2))
+    FEED_WEIGHTS = {
+        "urgency": float(os.getenv("FEED_WEIGHT_URGENCY", 0.45)),
+        "distance": float(os.getenv("FEED_WEIGHT_DISTANCE", 0.35)),
+        "category": float(os.getenv("FEED_WEIGHT_CATEGORY", 0.1)),
+        "quantity": float(os.getenv("FEED_WEIGHT_QUANTITY", 0.1))
+    }
+    FEED_CATEGORY_FACTORS = {
+        "cooked": float(os.getenv("FEED_FACTOR_COOKED", 1.0)),
+        "packed": float(os.getenv("FEED_FACTOR_PACKED", 0.4))
+    }
+
+    # Map clustering (/api/food/map/cells): geohash stored on each food,
+    # and the prefix lengths kept as cells in map_cells
+    GEOHASH_PRECISION = int(os.getenv("GEOHASH_PRECISION", 9))
+    MAP_CELL_PRECISIONS = [
+        int(p) for p in os.getenv("MAP_CELL_PRECISIONS", "2,3,4,5,6,7").split(",")
+    ]
+    MAP_MAX_CELLS = int(os.getenv("MAP_MAX_CELLS", 1024))
+
+    # Daily analytics rollups (services/rollup_service.py)
+    ROLLUP_INTERVAL_SECONDS = int(os.getenv("ROLLUP_INTERVAL_SECONDS", 300))
+    ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", 500))
+    ROLLUP_MAX_DAYS = int(os.getenv("ROLLUP_MAX_DAYS", 366))
+
+    # Archival of delivered / expired foods to foods_archive. Keep
+    # ARCHIVE_AFTER_DAYS above the sync tombstone TTL and a month.
+    # ARCHIVE_IMAGES: externalize (inline base64 -> blob store), drop, keep
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 45))
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+    ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", 3600))
+    ARCHIVE_IMAGES = os.getenv("ARCHIVE_IMAGES", "externalize")
+
+    # Response compression (utils/compression.py); brotli when installed
+    COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+
+    # Password hashing (services/password_service.py). Changing the method
+    # or its cost upgrades stored hashes on each user's next login.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
@@ -1,4 +1,5 @@
 from datetime import datetime
+from utils.geo import geohash_of, to_geojson
 
 class Food:
     def __init__(
@@ -20,9 +21,11 @@ class Food:
         self.foodType = food_type
         self.itemCategory = item_category
         self.expiryTime = expiry_time
-        self.location = location
+        self.location = to_geojson(location)   # GeoJSON Point
+        self.geohash = geohash_of(self.location)  # map cell prefixes
         self.address = address
         self.isSameAsLocation = is_same_as_location
-        self.image = image  # 🖼 Base64
+        self.image = image  # 🖼 blob store reference { hash, thumbnail, contentType }
         self.status = "available"
         self.createdAt = datetime.utcnow()
+        self.updatedAt = self.createdAt
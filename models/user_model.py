@@ -1,5 +1,8 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.password_service import hash_password, verify_password
+from utils.geo import to_geojson
+
+ROLES = ("donor", "volunteer")
 
 class User:
     def __init__(
@@ -15,10 +18,10 @@ class User:
         self.name = name
         self.email = email
         self.phone = phone
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
         self.role = role                  # donor | volunteer
         self.address = address
-        self.location = location          # { lat, lng }
+        self.location = to_geojson(location)  # GeoJSON Point from { lat, lng }
 
         # ⭐ VOLUNTEER GAMIFICATION FIELDS
         self.karmaPoints = 0              # increases after delivery
@@ -31,4 +34,4 @@ class User:
 
     @staticmethod
     def verify_password(hashed_password, password):
-        return check_password_hash(hashed_password, password)
+        return verify_password(hashed_password, password)
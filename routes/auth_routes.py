@@ -1,10 +1,22 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
+from pymongo.errors import DuplicateKeyError
 from utils.db import users_collection
-from models.user_model import User
+from models.user_model import ROLES, User
+from services.counter_service import record_user_registered
+from services.password_service import HashingBusy, hash_password, needs_rehash
+from utils.geo import parse_lat_lng
+from utils.response_cache import invalidate
 
 auth_bp = Blueprint("auth", __name__)
 
+
+def busy_response():
+    response = jsonify({"message": "Server busy, please retry"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
 # REGISTER
 @auth_bp.route("/register", methods=["POST"])
 def register():
@@ -19,23 +31,35 @@ def register():
         if field not in data or not data[field]:
             return jsonify({"message": f"{field} is required"}), 400
 
-    if not data["location"].get("lat") or not data["location"].get("lng"):
+    # also a counter field name (users.<role>), so never free text
+    if data["role"] not in ROLES:
+        return jsonify({"message": "Invalid role"}), 400
+
+    if parse_lat_lng(data["location"]) is None:
         return jsonify({"message": "Valid location is required"}), 400
 
-    if users_collection.find_one({"email": data["email"]}):
+    try:
+        user = User(
+            name=data["name"],
+            email=data["email"],
+            password=data["password"],
+            phone=data["phone"],
+            role=data["role"],
+            address=data["address"],
+            location=data["location"]
+        )
+    except HashingBusy:
+        return busy_response()
+
+    # unique index on email rejects duplicates
+    try:
+        users_collection.insert_one(user.__dict__)
+    except DuplicateKeyError:
         return jsonify({"message": "User already exists"}), 400
 
-    user = User(
-        name=data["name"],
-        email=data["email"],
-        password=data["password"],
-        phone=data["phone"],
-        role=data["role"],
-        address=data["address"],
-        location=data["location"]
-    )
+    record_user_registered(user.role)
+    invalidate("users")
 
-    users_collection.insert_one(user.__dict__)
     return jsonify({"message": "User registered successfully"}), 201
 
 
@@ -49,8 +73,22 @@ def login():
     if not user:
         return jsonify({"message": "Invalid credentials"}), 401
 
-    if not User.verify_password(user["password"], data["password"]):
-        return jsonify({"message": "Invalid credentials"}), 401
+    try:
+        if not User.verify_password(user["password"], data["password"]):
+            return jsonify({"message": "Invalid credentials"}), 401
+    except HashingBusy:
+        return busy_response()
+
+    # upgrade hashes made with an older method / cost; best effort,
+    # the next login retries if the pool is busy
+    if needs_rehash(user["password"]):
+        try:
+            users_collection.update_one(
+                {"_id": user["_id"], "password": user["password"]},
+                {"$set": {"password": hash_password(data["password"])}}
+            )
+        except HashingBusy:
+            pass
 
     token = create_access_token(
         identity=str(user["_id"]),
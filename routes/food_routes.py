@@ -1,13 +1,124 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
+from flask import (
+    Blueprint, Response, request, jsonify, abort, send_file,
+    stream_with_context
+)
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from werkzeug.exceptions import RequestEntityTooLarge
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import json
+import queue
 from models.food_model import Food
 from utils.db import foods_collection, users_collection
 from utils.role_required import role_required
+from utils.geo import (
+    EARTH_RADIUS_KM, haversine_km, parse_lat_lng, to_geojson, to_lat_lng
+)
+from utils.blob_store import get_blob_store
+from utils.pagination import (
+    InvalidPageRequest, after_cursor, decode_cursor, find_page, hidden_sort_fields,
+    is_unpaged, parse_page_args
+)
+from utils.json_provider import page_response
+from utils.projection import InvalidFields, projection_for
+from utils.response_cache import cached
+from services.image_service import (
+    InvalidImage, expand_image, store_base64_image, store_upload
+)
+from services.food_lifecycle import (
+    create_foods, delete_one, reserve_each, transition_each, transition_one,
+    update_food_fields
+)
+from services.sync_service import (
+    InvalidSyncToken, SyncResyncRequired, current_change_seq, delta, encode_token
+)
+from services.counter_service import donor_scope, get_counters, PLATFORM
+from services.expiry_engine import engine as expiry_engine
+from services.reservation_service import hold_expires_at
+from services.leaderboard_service import (
+    KARMA_PER_DELIVERY, InvalidWindow, credit_deliveries, leaderboard_page, volunteer_rank
+)
+from services.change_feed import feed, for_audience
+from services.route_planner import plan_route
+from services.matching_service import ranked_feed
+from services.map_service import InvalidMapRequest, get_cells
+from services.rollup_service import InvalidRange, time_series
+from services.archive_service import find_foods_page
+from config import Config
 from bson import ObjectId
 
 food_bp = Blueprint("food", __name__)
 
+
+# stored food -> client shape; fields left out by the projection stay out
+def present_food(food):
+    if "location" in food:
+        food["location"] = to_lat_lng(food["location"])
+    expand_image(food, "image")
+    expand_image(food, "deliveryImage")
+    return food
+
+
+# Filters and sorts of the listings below; tests/test_query_plans.py
+# explains the same shapes against the indexes.
+MY_FOODS_SORT = [("createdAt", -1), ("_id", -1)]
+AVAILABLE = {"status": "available"}
+NO_LONGER_AVAILABLE = {"status": {"$ne": "available"}}
+AVAILABLE_SORT = [("expiryTime", 1), ("_id", 1)]
+# 📍 Nearest first, soonest expiry breaks ties
+NEARBY_SORT = [("distanceKm", 1), ("expiryTime", 1), ("_id", 1)]
+CART_STATUSES = ["reserved", "picked"]
+CART_SORT = [("reservedAt", -1), ("_id", -1)]
+DELIVERIES_SORT = [("deliveredAt", -1), ("_id", -1)]
+DELIVERED = {"status": "delivered"}
+DONORS = {"role": "donor"}
+VOLUNTEERS = {"role": "volunteer"}
+VOLUNTEERS_SORT = [("createdAt", -1), ("_id", -1)]
+
+
+def cart_query(volunteer_id):
+    return {"reservedBy": volunteer_id, "status": {"$in": CART_STATUSES}}
+
+
+# changed cart items that are no longer in the cart
+def cart_removed_query(volunteer_id):
+    return {"reservedBy": volunteer_id, "status": {"$nin": CART_STATUSES}}
+
+
+def delivered_by(volunteer_id):
+    return {"reservedBy": volunteer_id, **DELIVERED}
+
+
+# Available food within radius_km of origin in NEARBY_SORT order;
+# `after` is a decoded cursor, limit None lists every match.
+def nearby_pipeline(origin, radius_km, projection, limit=None, after=None):
+    geo_near = {
+        "near": to_geojson({"lat": origin[0], "lng": origin[1]}),
+        "distanceField": "distanceKm",
+        "distanceMultiplier": 0.001,
+        "maxDistance": radius_km * 1000,
+        "query": AVAILABLE,
+        "spherical": True
+    }
+    pipeline = [{"$geoNear": geo_near}]
+
+    if after:
+        # let the index skip everything closer than the last page,
+        # with 1 m of slack for the km -> m round trip
+        geo_near["minDistance"] = max(after[0] * 1000 - 1, 0)
+        pipeline.append({"$match": after_cursor({}, NEARBY_SORT, after)})
+
+    pipeline.append({"$sort": dict(NEARBY_SORT)})
+    if limit is not None:
+        pipeline.append({"$limit": limit + 1})
+
+    # sort fields are kept for the cursor, page_response hides them
+    pipeline.append({"$project": {**projection, **{field: 1 for field, _ in NEARBY_SORT}}})
+
+    return pipeline
+
+
 # =========================
 # GET MY FOODS (DONOR)
 # =========================
@@ -16,29 +127,23 @@ food_bp = Blueprint("food", __name__)
 @role_required(["donor"])
 def get_my_foods():
     donor_id = get_jwt_identity()
+    sort = MY_FOODS_SORT
 
-    foods = list(
-        foods_collection.find(
+    try:
+        projection = projection_for("my-foods", "donor", request.args)
+        foods, limit = find_foods_page(
             {"donorId": donor_id},
-            {
-                "_id": 1,
-                "foodName": 1,
-                "quantity": 1,
-                "foodType": 1,
-                "itemCategory": 1,
-                "expiryTime": 1,
-                "status": 1,
-                "address": 1,
-                "image": 1,
-                "isSameAsLocation": 1
-            }
-        ).sort("createdAt", -1)
-    )
-
-    for food in foods:
-        food["_id"] = str(food["_id"])
+            projection,
+            sort,
+            request.args,
+            whole_list=True
+        )
+    except (InvalidPageRequest, InvalidFields) as e:
+        return jsonify({"message": str(e)}), 400
 
-    return jsonify(foods), 200
+    return page_response(
+        foods, sort, limit, present_food, hidden_sort_fields(projection, sort)
+    )
 
 
 # =========================
@@ -86,11 +191,36 @@ def get_all_foods():
 # =========================
 # ADD FOOD
 # =========================
-@food_bp.route("/add", methods=["POST"])
-@jwt_required()
-@role_required(["donor"])
-def add_food():
-    data = request.json
+@food_bp.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({"message": "Request is too large"}), 413
+
+
+# /add and /deliver take a JSON body with a base64 image, or
+# multipart/form-data with the other fields as JSON in a "data" part
+# and the image as a file part. The parser spools file parts to disk
+# and stops at MAX_UPLOAD_BYTES.
+def request_data(image_field):
+    if request.mimetype != "multipart/form-data":
+        return request.json
+
+    request.max_content_length = Config.MAX_UPLOAD_BYTES
+    try:
+        data = json.loads(request.form.get("data") or "{}")
+    except ValueError:
+        return None
+
+    if isinstance(data, dict) and request.files.get(image_field):
+        data[image_field] = request.files[image_field]
+
+    return data
+
+
+# Shared by /add and /add/bulk: returns (food document, None) or
+# (None, error message)
+def build_food(data, donor_id):
+    if not isinstance(data, dict):
+        return None, "Item must be an object"
 
     required_fields = [
         "foodName",
@@ -106,12 +236,23 @@ def add_food():
 
     for field in required_fields:
         if field not in data or data[field] in ["", None]:
-            return jsonify({"message": f"{field} is required"}), 400
+            return None, f"{field} is required"
 
     if data["itemCategory"] not in ["cooked", "packed"]:
-        return jsonify({"message": "Invalid item category"}), 400
+        return None, "Invalid item category"
 
-    donor_id = get_jwt_identity()
+    if parse_lat_lng(data["location"]) is None:
+        return None, "Valid location is required"
+
+    try:
+        expiry_time = datetime.fromisoformat(data["expiryTime"])
+    except (TypeError, ValueError):
+        return None, "Invalid expiryTime"
+
+    try:
+        image = store_upload(data["image"])
+    except InvalidImage as e:
+        return None, str(e)
 
     food = Food(
         donor_id=donor_id,
@@ -119,18 +260,104 @@ def add_food():
         quantity=data["quantity"],
         food_type=data["foodType"],
         item_category=data["itemCategory"],
-        expiry_time=datetime.fromisoformat(data["expiryTime"]),
+        expiry_time=expiry_time,
         location=data["location"],
         address=data["address"],
         is_same_as_location=data["isSameAsLocation"],
-        image=data["image"]
+        image=image
     )
 
-    foods_collection.insert_one(food.__dict__)
+    return food.__dict__, None
+
+
+@food_bp.route("/add", methods=["POST"])
+@jwt_required()
+@role_required(["donor"])
+def add_food():
+    food, error = build_food(request_data("image"), get_jwt_identity())
+    if error:
+        return jsonify({"message": error}), 400
+
+    create_foods([food])
+    expiry_engine.schedule(food["_id"], food["expiryTime"])
 
     return jsonify({"message": "Item added successfully"}), 201
 
 
+# =========================
+# BULK ADD FOOD
+# =========================
+# Accepts a JSON array, or NDJSON (one item per line) with
+# Content-Type: application/x-ndjson, which is read as a stream.
+# Every item is validated like /add; valid ones are written with
+# unordered insert_many in chunks and each gets its own result.
+class InvalidBulkRequest(ValueError):
+    pass
+
+
+def read_bulk_items():
+    if request.mimetype == "application/x-ndjson":
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            raise InvalidBulkRequest("Expected a JSON array of items")
+        yield from data
+
+
+@food_bp.route("/add/bulk", methods=["POST"])
+@jwt_required()
+@role_required(["donor"])
+def add_food_bulk():
+    donor_id = get_jwt_identity()
+    results = []
+
+    try:
+        items = list(islice(read_bulk_items(), Config.BULK_MAX_ITEMS + 1))
+    except InvalidBulkRequest as e:
+        return jsonify({"message": str(e)}), 400
+
+    if len(items) > Config.BULK_MAX_ITEMS:
+        return jsonify({"message": f"At most {Config.BULK_MAX_ITEMS} items per request"}), 413
+
+    # image decoding + thumbnails dominate; Pillow releases the GIL
+    with ThreadPoolExecutor(max_workers=Config.BULK_IMAGE_WORKERS) as pool:
+        built = list(pool.map(lambda item: build_food(item, donor_id), items))
+
+    pending = []
+    for index, (food, error) in enumerate(built):
+        if error:
+            results.append({"index": index, "status": "error", "message": error})
+        else:
+            pending.append((index, food))
+
+    for start in range(0, len(pending), Config.BULK_INSERT_CHUNK):
+        chunk = pending[start:start + Config.BULK_INSERT_CHUNK]
+        inserted, failed = create_foods([food for _, food in chunk])
+
+        for position, (index, food) in enumerate(chunk):
+            if position in failed:
+                results.append({"index": index, "status": "error", "message": failed[position]})
+            else:
+                results.append({"index": index, "status": "created", "_id": str(food["_id"])})
+                expiry_engine.schedule(food["_id"], food["expiryTime"])
+
+    results.sort(key=lambda r: r["index"])
+    created = sum(1 for r in results if r["status"] == "created")
+
+    return jsonify({
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }), 201 if created else 400
+
+
 # =========================
 # UPDATE FOOD
 # =========================
@@ -169,11 +396,14 @@ def update_food(food_id):
     if not update_fields:
         return jsonify({"message": "No fields to update"}), 400
 
-    foods_collection.update_one(
+    update_food_fields(
         {"_id": ObjectId(food_id)},
-        {"$set": update_fields}
+        update_fields
     )
 
+    if "expiryTime" in update_fields and food["status"] == "available":
+        expiry_engine.schedule(food_id, update_fields["expiryTime"])
+
     return jsonify({"message": "Food updated successfully"}), 200
 
 
@@ -197,7 +427,15 @@ def delete_food(food_id):
     if food["status"] in ["picked", "delivered"]:
         return jsonify({"message": "Cannot delete picked or delivered food"}), 400
 
-    foods_collection.delete_one({"_id": ObjectId(food_id)})
+    # guard on the status we checked so a concurrent pick can't slip through
+    deleted = delete_one({
+        "_id": ObjectId(food_id),
+        "donorId": donor_id,
+        "status": food["status"]
+    })
+
+    if not deleted:
+        return jsonify({"message": "Food was modified, please retry"}), 409
 
     return jsonify({"message": "Food deleted successfully"}), 200
 
@@ -211,72 +449,182 @@ def delete_food(food_id):
 def donor_food_stats():
     donor_id = get_jwt_identity()
 
-    total = foods_collection.count_documents({"donorId": donor_id})
-    delivered = foods_collection.count_documents({
-        "donorId": donor_id,
-        "status": "delivered"
-    })
-    expired = foods_collection.count_documents({
-        "donorId": donor_id,
-        "status": "expired"
-    })
+    foods = get_counters(donor_scope(donor_id))["foods"]
 
     return jsonify({
-        "total": total,
-        "delivered": delivered,
-        "expired": expired
+        "total": foods["total"],
+        "delivered": foods["delivered"],
+        "expired": foods["expired"]
     }), 200
 
+# Daily series from the rollup buckets, ?from=&to=YYYY-MM-DD
+@food_bp.route("/donor-stats/daily", methods=["GET"])
+@jwt_required()
+@role_required(["donor"])
+def donor_daily_stats():
+    try:
+        series = time_series(donor_scope(get_jwt_identity()), request.args)
+    except InvalidRange as e:
+        return jsonify({"message": str(e)}), 400
+
+    return jsonify(series), 200
+
+# Optional ?lat=&lng=&radius= (km) -> (((lat, lng), radius_km), error)
+def parse_area(args):
+    if "lat" not in args and "lng" not in args:
+        return None, None
+
+    origin = parse_lat_lng(args)
+    if origin is None:
+        return None, "Valid lat and lng are required"
+
+    try:
+        radius_km = float(args.get("radius", Config.DEFAULT_SEARCH_RADIUS_KM))
+    except ValueError:
+        return None, "Invalid radius"
+
+    if radius_km <= 0 or radius_km > Config.MAX_SEARCH_RADIUS_KM:
+        return None, "Invalid radius"
+
+    return (origin, radius_km), None
+
+
 @food_bp.route("/available", methods=["GET"])
 @jwt_required()
 @role_required(["volunteer", "donor"])
 def get_available_food():
-    foods = list(
-        foods_collection.find(
-            {"status": "available"},
-            {
-                "_id": 1,
-                "foodName": 1,
-                "quantity": 1,
-                "foodType": 1,
-                "itemCategory": 1,
-                "expiryTime": 1,
-                "address": 1,
-                "location": 1,
-                "image": 1
+    try:
+        projection = projection_for("available", get_jwt()["role"], request.args)
+    except InvalidFields as e:
+        return jsonify({"message": str(e)}), 400
+
+    area, error = parse_area(request.args)
+    if error:
+        return jsonify({"message": error}), 400
+
+    # read before querying so nothing written meanwhile is skipped
+    sync_token = encode_token(current_change_seq())
+
+    if "since" in request.args:
+        query = dict(AVAILABLE)
+        if area:
+            (lat, lng), radius_km = area
+            query["location"] = {
+                "$geoWithin": {"$centerSphere": [[lng, lat], radius_km / EARTH_RADIUS_KM]}
             }
-        ).sort("expiryTime", 1)
+
+        try:
+            foods, removed = delta(
+                request.args["since"],
+                query,
+                projection,
+                NO_LONGER_AVAILABLE,
+                ["all"]
+            )
+        except InvalidSyncToken as e:
+            return jsonify({"message": str(e)}), 400
+        except SyncResyncRequired as e:
+            return jsonify({"message": f"{e}, refetch without since"}), 410
+
+        for food in foods:
+            present_food(food)
+
+        return jsonify({"items": foods, "removed": removed, "sync_token": sync_token}), 200
+
+    if area:
+        origin, radius_km = area
+
+        sort = NEARBY_SORT
+
+        limit, after = None, None
+        try:
+            if not is_unpaged(request.args):
+                limit, cursor = parse_page_args(request.args)
+                after = decode_cursor(cursor, sort) if cursor else None
+        except InvalidPageRequest as e:
+            return jsonify({"message": str(e)}), 400
+
+        projection = {**projection, "distanceKm": 1}
+        foods = foods_collection.aggregate(
+            nearby_pipeline(origin, radius_km, projection, limit, after)
+        )
+    else:
+        sort = AVAILABLE_SORT
+
+        try:
+            foods, limit = find_page(
+                foods_collection,
+                AVAILABLE,
+                projection,
+                sort,
+                request.args,
+                whole_list=True
+            )
+        except InvalidPageRequest as e:
+            return jsonify({"message": str(e)}), 400
+
+    return page_response(
+        foods, sort, limit, present_food, hidden_sort_fields(projection, sort),
+        sync_token=sync_token
     )
 
-    for food in foods:
-        food["_id"] = str(food["_id"])
+# Best matches for the volunteer rather than soonest expiry: scores
+# the nearest candidates on urgency, distance, category and quantity
+# (see services/matching_service.py). Centred on ?lat=&lng= if given,
+# else on the location in the volunteer's profile.
+@food_bp.route("/available/ranked", methods=["GET"])
+@jwt_required()
+@role_required(["volunteer"])
+def get_ranked_food():
+    try:
+        projection = projection_for("available", "volunteer", request.args)
+        limit, _ = parse_page_args(request.args)
+    except (InvalidFields, InvalidPageRequest) as e:
+        return jsonify({"message": str(e)}), 400
+
+    area, error = parse_area(request.args)
+    if error:
+        return jsonify({"message": error}), 400
+
+    if area:
+        origin, radius_km = area
+    else:
+        user = users_collection.find_one({"_id": ObjectId(get_jwt_identity())}, {"location": 1})
+        location = to_lat_lng((user or {}).get("location"))
+        origin = parse_lat_lng(location)
+        radius_km = Config.DEFAULT_SEARCH_RADIUS_KM
+
+        if origin is None:
+            return jsonify({"message": "lat and lng are required (no location on profile)"}), 400
+
+    foods, candidates = ranked_feed(origin, radius_km, projection, limit)
 
-    return jsonify(foods), 200
+    return jsonify({
+        "items": [present_food(food) for food in foods],
+        "candidates": candidates
+    }), 200
 
 @food_bp.route("/reserve/<food_id>", methods=["POST"])
 @jwt_required()
 @role_required(["volunteer"])
 def reserve_food(food_id):
     volunteer_id = get_jwt_identity()
+    reserved_at = datetime.utcnow()
 
-    result = foods_collection.update_one(
-        {
-            "_id": ObjectId(food_id),
-            "status": "available"
-        },
-        {
-            "$set": {
-                "status": "reserved",
-                "reservedBy": volunteer_id,
-                "reservedAt": datetime.utcnow()
-            }
-        }
+    changed, over_limit = reserve_each(
+        [ObjectId(food_id)], volunteer_id, reserved_at, Config.MAX_ACTIVE_RESERVATIONS
     )
 
-    if result.matched_count == 0:
+    if over_limit:
+        return jsonify({"message": "Reservation limit reached"}), 400
+
+    if not changed:
         return jsonify({"message": "Food already reserved or unavailable"}), 400
 
-    return jsonify({"message": "Food reserved successfully"}), 200
+    return jsonify({
+        "message": "Food reserved successfully",
+        "holdExpiresAt": hold_expires_at(reserved_at)
+    }), 200
 
 
 @food_bp.route("/my-cart", methods=["GET"])
@@ -284,20 +632,112 @@ def reserve_food(food_id):
 @role_required(["volunteer"])
 def get_my_cart():
     volunteer_id = get_jwt_identity()
+    sync_token = encode_token(current_change_seq())
+
+    try:
+        projection = projection_for("my-cart", "volunteer", request.args)
+    except InvalidFields as e:
+        return jsonify({"message": str(e)}), 400
+
+    if "since" in request.args:
+        try:
+            foods, removed = delta(
+                request.args["since"],
+                cart_query(volunteer_id),
+                projection,
+                cart_removed_query(volunteer_id),
+                ["all", f"cart:{volunteer_id}"]
+            )
+        except InvalidSyncToken as e:
+            return jsonify({"message": str(e)}), 400
+        except SyncResyncRequired as e:
+            return jsonify({"message": f"{e}, refetch without since"}), 410
+
+        for food in foods:
+            present_food(food)
+
+        return jsonify({"items": foods, "removed": removed, "sync_token": sync_token}), 200
+
+    sort = CART_SORT
+
+    try:
+        foods, limit = find_page(
+            foods_collection,
+            cart_query(volunteer_id),
+            projection,
+            sort,
+            request.args,
+            whole_list=True
+        )
+    except InvalidPageRequest as e:
+        return jsonify({"message": str(e)}), 400
+
+    return page_response(
+        foods, sort, limit, present_food, hidden_sort_fields(projection, sort),
+        sync_token=sync_token
+    )
+
+
+# Pickup order for the reserved items in the cart, starting from
+# ?lat=&lng=; picked items are already in hand and listed separately,
+# reserved items without a usable location come back as unroutable ids.
+@food_bp.route("/my-cart/route", methods=["GET"])
+@jwt_required()
+@role_required(["volunteer"])
+def plan_cart_route():
+    volunteer_id = get_jwt_identity()
+
+    origin = parse_lat_lng(request.args)
+    if origin is None:
+        return jsonify({"message": "Valid lat and lng are required"}), 400
 
     foods = list(
         foods_collection.find(
-            {
-                "reservedBy": volunteer_id,
-                "status": {"$in": ["reserved", "picked"]}
-            }
-        ).sort("reservedAt", -1)
+            cart_query(volunteer_id),
+            {"foodName": 1, "address": 1, "location": 1, "expiryTime": 1, "status": 1}
+        ).sort([("reservedAt", 1), ("_id", 1)]).limit(Config.ROUTE_MAX_STOPS)
     )
 
+    now = datetime.utcnow()
+    stops, points, unroutable = [], [], []
+    carrying = [f for f in foods if f["status"] == "picked"]
+
     for food in foods:
-        food["_id"] = str(food["_id"])
+        if food["status"] != "reserved":
+            continue
+
+        # GeoJSON or legacy { lat, lng }; missing / invalid can't be routed
+        position = parse_lat_lng(to_lat_lng(food.get("location")))
+        if position is None:
+            unroutable.append(str(food["_id"]))
+            continue
+
+        expiry = food.get("expiryTime")
+        hours_left = (expiry - now).total_seconds() / 3600 if expiry else float("inf")
+        stops.append(food)
+        points.append((*position, hours_left))
+
+    order, legs, arrivals, _ = plan_route(
+        origin, points, Config.ROUTE_SPEED_KMH, Config.ROUTE_LATENESS_WEIGHT_KM,
+        Config.ROUTE_MAX_PASSES
+    )
 
-    return jsonify(foods), 200
+    route = []
+    for index, leg_km, arrival_hours in zip(order, legs, arrivals):
+        food = present_food(stops[index])
+        eta = now + timedelta(hours=arrival_hours)
+
+        food["legKm"] = round(leg_km, 3)
+        food["etaMinutes"] = round(arrival_hours * 60, 1)
+        food["late"] = bool(food.get("expiryTime") and eta > food["expiryTime"])
+        route.append(food)
+
+    return jsonify({
+        "stops": route,
+        "totalKm": round(sum(legs), 3),
+        "carrying": [present_food(f) for f in carrying],
+        "unroutable": unroutable
+    }), 200
 
 
 @food_bp.route("/pick/<food_id>", methods=["POST"])
@@ -306,21 +746,17 @@ def get_my_cart():
 def pick_food(food_id):
     volunteer_id = get_jwt_identity()
 
-    result = foods_collection.update_one(
+    result = transition_one(
         {
             "_id": ObjectId(food_id),
             "reservedBy": volunteer_id,
             "status": "reserved"
         },
-        {
-            "$set": {
-                "status": "picked",
-                "pickedAt": datetime.utcnow()
-            }
-        }
+        "picked",
+        {"pickedAt": datetime.utcnow()}
     )
 
-    if result.matched_count == 0:
+    if result is None:
         return jsonify({"message": "Pick failed"}), 400
 
     return jsonify({"message": "Picked successfully"}), 200
@@ -332,24 +768,17 @@ def pick_food(food_id):
 def unreserve_food(food_id):
     volunteer_id = get_jwt_identity()
 
-    result = foods_collection.update_one(
+    result = transition_one(
         {
             "_id": ObjectId(food_id),
             "reservedBy": volunteer_id,
             "status": "reserved"
         },
-        {
-            "$set": {
-                "status": "available"
-            },
-            "$unset": {
-                "reservedBy": "",
-                "reservedAt": ""
-            }
-        }
+        "available",
+        unset_fields=["reservedBy", "reservedAt"]
     )
 
-    if result.matched_count == 0:
+    if result is None:
         return jsonify({"message": "Unable to remove from cart"}), 400
 
     return jsonify({"message": "Removed from cart"}), 200
@@ -359,46 +788,197 @@ def unreserve_food(food_id):
 @jwt_required()
 @role_required(["volunteer"])
 def deliver_food(food_id):
-    data = request.json
+    data = request_data("deliveryImage")
     volunteer_id = get_jwt_identity()
 
+    if not isinstance(data, dict):
+        return jsonify({"message": "Invalid request body"}), 400
+
     required = ["deliveryAddress", "deliveryImage"]
     for field in required:
         if not data.get(field):
             return jsonify({"message": f"{field} is required"}), 400
 
-    result = foods_collection.update_one(
+    try:
+        delivery_image = store_upload(data["deliveryImage"])
+    except InvalidImage as e:
+        return jsonify({"message": str(e)}), 400
+
+    result = transition_one(
         {
             "_id": ObjectId(food_id),
             "reservedBy": volunteer_id,
             "status": "picked"
         },
+        "delivered",
         {
-            "$set": {
-                "status": "delivered",
-                "deliveryAddress": data["deliveryAddress"],
-                "deliveryImage": data["deliveryImage"],
-                "deliveryNotes": data.get("deliveryNotes", ""),
-                "deliveredAt": datetime.utcnow()
-            }
+            "deliveryAddress": data["deliveryAddress"],
+            "deliveryImage": delivery_image,
+            "deliveryNotes": data.get("deliveryNotes", ""),
+            "deliveredAt": datetime.utcnow()
         }
     )
 
-    if result.matched_count == 0:
+    if result is None:
         return jsonify({"message": "Delivery failed"}), 400
 
-    # ⭐ KARMA POINTS
-    users_collection.update_one(
-        {"_id": ObjectId(volunteer_id)},
-        {
-            "$inc": {
-                "karmaPoints": 10,
-                "deliveriesCompleted": 1
-            }
-        }
+    credit_deliveries(volunteer_id, 1)
+
+    return jsonify({"message": f"Delivered successfully. +{KARMA_PER_DELIVERY} Karma!"}), 200
+
+
+# =========================
+# CART BATCH OPERATIONS
+# =========================
+# Each takes { "foodIds": [...] } (deliver takes { "items": [...] }),
+# applies the same status guards as the single-item routes per item
+# and reports which ids went through, which lost a race and (reserve
+# only) which were over the volunteer's reservation cap.
+def parse_food_ids(values):
+    if not isinstance(values, list) or not values:
+        return None, "foodIds must be a non-empty list"
+
+    if len(values) > Config.CART_BATCH_MAX:
+        return None, f"At most {Config.CART_BATCH_MAX} items per request"
+
+    ids = []
+    for value in dict.fromkeys(map(str, values)):
+        if not ObjectId.is_valid(value):
+            return None, f"Invalid food id: {value}"
+        ids.append(ObjectId(value))
+
+    return ids, None
+
+
+def batch_result(ids, changed, over_limit=()):
+    succeeded = {doc["_id"] for doc in changed}
+    skipped = set(over_limit)
+
+    result = {
+        "succeeded": [str(i) for i in ids if i in succeeded],
+        "failed": [str(i) for i in ids if i not in succeeded and i not in skipped]
+    }
+    if over_limit:
+        result["overLimit"] = [str(i) for i in over_limit]
+
+    return jsonify(result), 200
+
+
+@food_bp.route("/cart/reserve", methods=["POST"])
+@jwt_required()
+@role_required(["volunteer"])
+def reserve_food_batch():
+    volunteer_id = get_jwt_identity()
+
+    ids, error = parse_food_ids((request.json or {}).get("foodIds"))
+    if error:
+        return jsonify({"message": error}), 400
+
+    changed, over_limit = reserve_each(
+        ids, volunteer_id, datetime.utcnow(), Config.MAX_ACTIVE_RESERVATIONS
+    )
+
+    return batch_result(ids, changed, over_limit)
+
+
+@food_bp.route("/cart/pick", methods=["POST"])
+@jwt_required()
+@role_required(["volunteer"])
+def pick_food_batch():
+    volunteer_id = get_jwt_identity()
+
+    ids, error = parse_food_ids((request.json or {}).get("foodIds"))
+    if error:
+        return jsonify({"message": error}), 400
+
+    picked_at = datetime.utcnow()
+
+    changed = transition_each(
+        [
+            ({"_id": food_id, "reservedBy": volunteer_id}, {"pickedAt": picked_at})
+            for food_id in ids
+        ],
+        "reserved",
+        "picked"
+    )
+
+    return batch_result(ids, changed)
+
+
+@food_bp.route("/cart/unreserve", methods=["POST"])
+@jwt_required()
+@role_required(["volunteer"])
+def unreserve_food_batch():
+    volunteer_id = get_jwt_identity()
+
+    ids, error = parse_food_ids((request.json or {}).get("foodIds"))
+    if error:
+        return jsonify({"message": error}), 400
+
+    changed = transition_each(
+        [({"_id": food_id, "reservedBy": volunteer_id}, {}) for food_id in ids],
+        "reserved",
+        "available",
+        unset_fields=["reservedBy", "reservedAt"]
     )
 
-    return jsonify({"message": "Delivered successfully. +10 Karma!"}), 200
+    return batch_result(ids, changed)
+
+
+@food_bp.route("/cart/deliver", methods=["POST"])
+@jwt_required()
+@role_required(["volunteer"])
+def deliver_food_batch():
+    volunteer_id = get_jwt_identity()
+    items = (request.json or {}).get("items")
+
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return jsonify({"message": "items must be a list of objects"}), 400
+
+    ids, error = parse_food_ids([item.get("foodId") for item in items])
+    if error:
+        return jsonify({"message": error}), 400
+
+    if len(ids) != len(items):
+        return jsonify({"message": "Duplicate foodId in items"}), 400
+
+    for item in items:
+        for field in ["deliveryAddress", "deliveryImage"]:
+            if not item.get(field):
+                return jsonify({"message": f"{field} is required for {item['foodId']}"}), 400
+
+    try:
+        with ThreadPoolExecutor(max_workers=Config.BULK_IMAGE_WORKERS) as pool:
+            images = list(pool.map(
+                lambda item: store_base64_image(item["deliveryImage"]), items
+            ))
+    except InvalidImage as e:
+        return jsonify({"message": str(e)}), 400
+
+    delivered_at = datetime.utcnow()
+
+    changed = transition_each(
+        [
+            (
+                {"_id": food_id, "reservedBy": volunteer_id},
+                {
+                    "deliveryAddress": item["deliveryAddress"],
+                    "deliveryImage": image,
+                    "deliveryNotes": item.get("deliveryNotes", ""),
+                    "deliveredAt": delivered_at
+                }
+            )
+            for food_id, item, image in zip(ids, items, images)
+        ],
+        "picked",
+        "delivered"
+    )
+
+    # one $inc for the whole trip
+    if changed:
+        credit_deliveries(volunteer_id, len(changed))
+
+    return batch_result(ids, changed)
 
 @food_bp.route("/volunteer/profile", methods=["GET"])
 @jwt_required()
@@ -415,10 +995,7 @@ def volunteer_profile():
         return jsonify({"message": "User not found"}), 404
 
     # Volunteer deliveries
-    delivered_count = foods_collection.count_documents({
-        "reservedBy": volunteer_id,
-        "status": "delivered"
-    })
+    delivered_count = foods_collection.count_documents(delivered_by(volunteer_id))
 
     return jsonify({
         "name": user["name"],
@@ -433,44 +1010,73 @@ def volunteer_profile():
 @role_required(["volunteer"])
 def volunteer_deliveries():
     volunteer_id = get_jwt_identity()
+    sort = DELIVERIES_SORT
+
+    try:
+        projection = projection_for("volunteer-deliveries", "volunteer", request.args)
+        foods, limit = find_foods_page(
+            delivered_by(volunteer_id),
+            projection,
+            sort,
+            request.args,
+            whole_list=True
+        )
+    except (InvalidPageRequest, InvalidFields) as e:
+        return jsonify({"message": str(e)}), 400
 
-    foods = list(
-        foods_collection.find(
-            {
-                "reservedBy": volunteer_id,
-                "status": "delivered"
-            },
-            {
-                "_id": 1,
-                "foodName": 1,
-                "quantity": 1,
-                "itemCategory": 1,
-                "deliveryAddress": 1,
-                "deliveryImage": 1,
-                "deliveredAt": 1
-            }
-        ).sort("deliveredAt", -1)
+    return page_response(
+        foods, sort, limit, present_food, hidden_sort_fields(projection, sort)
     )
 
-    for food in foods:
-        food["_id"] = str(food["_id"])
+# =========================
+# LEADERBOARD
+# =========================
+# ?window=all (default) | week | month, cursor-paginated, each row
+# with its rank; ties share a rank.
+@food_bp.route("/public/leaderboard", methods=["GET"])
+@cached("public-leaderboard", ["karma", "users"])
+def public_leaderboard():
+    try:
+        items, next_cursor = leaderboard_page(request.args.get("window", "all"), request.args)
+    except (InvalidWindow, InvalidPageRequest) as e:
+        return jsonify({"message": str(e)}), 400
+
+    return jsonify({"items": items, "next_cursor": next_cursor}), 200
+
+@food_bp.route("/volunteer/rank", methods=["GET"])
+@jwt_required()
+@role_required(["volunteer"])
+def volunteer_leaderboard_rank():
+    try:
+        rank = volunteer_rank(request.args.get("window", "all"), get_jwt_identity())
+    except InvalidWindow as e:
+        return jsonify({"message": str(e)}), 400
 
-    return jsonify(foods), 200
+    return jsonify(rank), 200
 
 #platform stats
 @food_bp.route("/platform/stats", methods=["GET"])
 @jwt_required()
+@cached("platform-stats", ["foods"])
 def platform_stats():
-    total = foods_collection.count_documents({})
-    delivered = foods_collection.count_documents({"status": "delivered"})
-    expired = foods_collection.count_documents({"status": "expired"})
+    foods = get_counters(PLATFORM)["foods"]
 
     return jsonify({
-        "totalPosted": total,
-        "totalDelivered": delivered,
-        "totalExpired": expired
+        "totalPosted": foods["total"],
+        "totalDelivered": foods["delivered"],
+        "totalExpired": foods["expired"]
     }), 200
 
+@food_bp.route("/platform/stats/daily", methods=["GET"])
+@jwt_required()
+def platform_daily_stats():
+    try:
+        series = time_series(PLATFORM, request.args)
+    except InvalidRange as e:
+        return jsonify({"message": str(e)}), 400
+
+    return jsonify(series), 200
+
 @food_bp.route("/donor/profile", methods=["GET"])
 @jwt_required()
 @role_required(["donor"])
@@ -496,59 +1102,165 @@ def donor_profile():
 
 #Public API' s
 @food_bp.route("/public/stats", methods=["GET"])
+@cached("public-stats", ["foods", "users"])
 def public_stats():
+    counters = get_counters(PLATFORM)
+
     return jsonify({
-        "totalPosted": foods_collection.count_documents({}),
-        "totalDelivered": foods_collection.count_documents({"status": "delivered"}),
-        "totalExpired": foods_collection.count_documents({"status": "expired"}),
-        "donors": users_collection.count_documents({"role": "donor"}),
-        "volunteers": users_collection.count_documents({"role": "volunteer"})
+        "totalPosted": counters["foods"]["total"],
+        "totalDelivered": counters["foods"]["delivered"],
+        "totalExpired": counters["foods"]["expired"],
+        "donors": counters["users"].get("donor", 0),
+        "volunteers": counters["users"].get("volunteer", 0)
     }), 200
 
 @food_bp.route("/public/donors", methods=["GET"])
+@cached("public-donors", ["users"])
 def public_donors():
     donors = list(
         users_collection.find(
-            {"role": "donor"},
+            DONORS,
             {"name": 1, "createdAt": 1}
         ).sort("createdAt", -1).limit(20)
     )
 
-    for d in donors:
-        d["_id"] = str(d["_id"])
-
     return jsonify(donors), 200
 
 @food_bp.route("/public/deliveries", methods=["GET"])
+@cached("public-deliveries", ["deliveries"])
 def public_deliveries():
+    try:
+        projection = projection_for("public-deliveries", None, request.args)
+    except InvalidFields as e:
+        return jsonify({"message": str(e)}), 400
+
     deliveries = list(
         foods_collection.find(
-            {"status": "delivered"},
-            {
-                "_id": 1,
-                "foodName": 1,
-                "deliveryImage": 1,
-                "deliveredAt": 1,
-                "deliveryAddress": 1
-            }
+            DELIVERED,
+            projection
         ).sort("deliveredAt", -1).limit(10)
     )
 
     for d in deliveries:
-        d["_id"] = str(d["_id"])
+        present_food(d)
 
     return jsonify(deliveries), 200
 
 @food_bp.route("/public/volunteers", methods=["GET"])
+@cached("public-volunteers", ["users"])
 def public_volunteers():
-    volunteers = list(
-        users_collection.find(
-            {"role": "volunteer"},
-            {"_id": 1, "name": 1}
+    sort = VOLUNTEERS_SORT
+
+    try:
+        volunteers, limit = find_page(
+            users_collection,
+            VOLUNTEERS,
+            {"_id": 1, "name": 1},
+            sort,
+            request.args,
+            whole_list=True
         )
-    )
+    except InvalidPageRequest as e:
+        return jsonify({"message": str(e)}), 400
+
+    return page_response(volunteers, sort, limit, hidden=("createdAt",), stream=False)
+
+
+# =========================
+# MAP CLUSTERS
+# =========================
+# ?bbox=minLng,minLat,maxLng,maxLat&zoom= -> available food counted
+# per geohash cell, with centroids and category / food type breakdowns
+@food_bp.route("/map/cells", methods=["GET"])
+@jwt_required()
+@role_required(["volunteer", "donor"])
+def map_cells():
+    try:
+        precision, cells = get_cells(request.args.get("bbox"), request.args.get("zoom"))
+    except InvalidMapRequest as e:
+        return jsonify({"message": str(e)}), 400
+
+    return jsonify({"precision": precision, "cells": cells}), 200
+
+
+# =========================
+# IMAGES (content addressed, immutable)
+# =========================
+@food_bp.route("/images/<key>", methods=["GET"])
+def get_image(key):
+    if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+        abort(404)
+
+    blob = get_blob_store().open(key)
+    if blob is None:
+        abort(404)
+
+    source, content_type = blob
 
-    for v in volunteers:
-        v["_id"] = str(v["_id"])
+    # streamed from disk (Range requests too); keys are content hashes
+    try:
+        response = send_file(source, mimetype=content_type, etag=key, conditional=True)
+    except FileNotFoundError:
+        abort(404)
 
-    return jsonify(volunteers), 200
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+# =========================
+# LIVE FEED (Server-Sent Events)
+# =========================
+# Volunteers get every status change (optionally only within
+# ?lat=&lng=&radius= km); donors get changes to their own food.
+@food_bp.route("/stream", methods=["GET"])
+@jwt_required()
+@role_required(["volunteer", "donor"])
+def food_stream():
+    user_id = get_jwt_identity()
+    role = get_jwt()["role"]
+
+    area, error = parse_area(request.args)
+    if error:
+        return jsonify({"message": error}), 400
+
+    def matches(event):
+        if role == "donor" and event.get("donorId") != user_id:
+            return False
+
+        location = event.get("location")
+        if area and location:
+            (lat, lng), radius_km = area
+            return haversine_km(lat, lng, location["lat"], location["lng"]) <= radius_km
+
+        return True
+
+    subscriber = feed.subscribe(matches)
+
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+
+            while True:
+                if subscriber.dropped:
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+
+                try:
+                    event = subscriber.events.get(timeout=Config.SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+
+                # None only wakes us up to notice `dropped`
+                if event is None:
+                    continue
+
+                yield f"event: food\ndata: {json.dumps(for_audience(event, user_id))}\n\n"
+        finally:
+            feed.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,7 +1,66 @@
+import atexit
+from datetime import datetime
+from functools import wraps
 from apscheduler.schedulers.background import BackgroundScheduler
+from config import Config
 from services.expiry_service import check_expired_food
+from services.reservation_service import release_stale_reservations
+from services.rollup_service import roll_up
+from services.archive_service import archive_foods
+from services.expiry_engine import engine as expiry_engine
+from services.leader_service import LeaderLease
+
+# One lease for the whole job set: every process runs the scheduler,
+# only the current leader actually does the work.
+lease = LeaderLease("scheduler", Config.LEADER_LEASE_SECONDS)
+
+
+def leader_only(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if lease.is_leader:
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def heartbeat():
+    if lease.heartbeat():
+        expiry_engine.start()
+    elif expiry_engine.running:
+        expiry_engine.stop()
+
+
+def shutdown(scheduler):
+    scheduler.shutdown(wait=False)
+    expiry_engine.stop()
+    # hand over straight away instead of waiting for the lease to lapse
+    lease.release()
+
+
+def configure_jobs(scheduler):
+    scheduler.add_job(
+        heartbeat, "interval",
+        seconds=Config.LEADER_HEARTBEAT_SECONDS,
+        next_run_time=datetime.now()
+    )
+    scheduler.add_job(leader_only(check_expired_food), "interval", minutes=10)
+    scheduler.add_job(
+        leader_only(release_stale_reservations), "interval",
+        seconds=Config.RESERVATION_SWEEP_SECONDS
+    )
+    scheduler.add_job(
+        leader_only(roll_up), "interval",
+        seconds=Config.ROLLUP_INTERVAL_SECONDS
+    )
+    scheduler.add_job(
+        leader_only(archive_foods), "interval",
+        seconds=Config.ARCHIVE_INTERVAL_SECONDS
+    )
+
 
 def start_scheduler(app):
     scheduler = BackgroundScheduler()
-    scheduler.add_job(check_expired_food, "interval", minutes=10)
+    configure_jobs(scheduler)
     scheduler.start()
+
+    atexit.register(shutdown, scheduler)
@@ -0,0 +1,96 @@
+import logging
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne
+from utils.pagination import find_page, find_page_merged
+from config import Config
+from utils.db import archive_collection, foods_collection
+from services.image_service import InvalidImage, store_base64_image
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = ("image", "deliveryImage")
+
+# terminal status -> the timestamp its age is measured from (both are
+# the leading fields of an index together with status)
+TERMINAL = {
+    "delivered": "deliveredAt",
+    "expired": "expiryTime"
+}
+
+
+def archivable(status, cutoff):
+    return {"status": status, TERMINAL[status]: {"$lt": cutoff}}
+
+
+# Donor / volunteer history: ?includeArchived=true pages over foods and
+# foods_archive as one list, same cursors and sort.
+def find_foods_page(query, projection, sort, args, whole_list=False):
+    if args.get("includeArchived", "false").lower() == "true":
+        return find_page_merged(
+            [foods_collection, archive_collection], query, projection, sort, args,
+            whole_list
+        )
+
+    return find_page(foods_collection, query, projection, sort, args, whole_list)
+
+
+def archive_images(doc):
+    mode = Config.ARCHIVE_IMAGES
+
+    for field in IMAGE_FIELDS:
+        value = doc.get(field)
+        if value is None:
+            continue
+
+        if mode == "drop":
+            del doc[field]
+        elif mode == "externalize" and isinstance(value, str):
+            # inline base64 left over from before the blob store
+            try:
+                doc[field] = store_base64_image(value)
+            except InvalidImage:
+                del doc[field]
+
+    return doc
+
+
+# Move delivered / expired foods older than ARCHIVE_AFTER_DAYS from
+# foods to foods_archive, ARCHIVE_BATCH_SIZE at a time. Copies are
+# upserts and the delete is guarded on status, so a run that dies
+# halfway is finished by the next one. Counters, rollups and karma are
+# all-time totals and are left alone.
+def archive_foods():
+    cutoff = datetime.utcnow() - timedelta(days=Config.ARCHIVE_AFTER_DAYS)
+    archived = 0
+
+    for status in TERMINAL:
+        while True:
+            docs = list(
+                foods_collection.find(archivable(status, cutoff))
+                .limit(Config.ARCHIVE_BATCH_SIZE)
+            )
+            if not docs:
+                break
+
+            archived_at = datetime.utcnow()
+            archive_collection.bulk_write([
+                ReplaceOne(
+                    {"_id": doc["_id"]},
+                    {**archive_images(doc), "archivedAt": archived_at},
+                    upsert=True
+                )
+                for doc in docs
+            ], ordered=False)
+
+            archived += foods_collection.delete_many({
+                "_id": {"$in": [doc["_id"] for doc in docs]},
+                "status": status
+            }).deleted_count
+
+            if len(docs) < Config.ARCHIVE_BATCH_SIZE:
+                break
+
+    if archived:
+        logger.info("Archived %d foods", archived)
+
+    return archived
@@ -0,0 +1,297 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from heapq import merge
+from pymongo.errors import OperationFailure, PyMongoError
+from config import Config
+from utils.db import db, foods_collection, tombstones_collection
+from utils.pagination import after_cursor
+from services.sync_service import changed_since, current_change_seq, tombstones_since
+from utils.geo import to_lat_lng
+
+logger = logging.getLogger(__name__)
+
+FEED_FIELDS = {
+    "_id": 1,
+    "donorId": 1,
+    "reservedBy": 1,
+    "status": 1,
+    "foodName": 1,
+    "foodType": 1,
+    "itemCategory": 1,
+    "quantity": 1,
+    "expiryTime": 1,
+    "location": 1,
+    "updatedAt": 1,
+    "changeSeq": 1
+}
+
+
+def to_event(doc):
+    event = {
+        "type": "upsert",
+        **{field: doc.get(field) for field in FEED_FIELDS}
+    }
+    event["_id"] = str(doc["_id"])
+    event["location"] = to_lat_lng(doc.get("location"))
+
+    for field in ("expiryTime", "updatedAt"):
+        if isinstance(event[field], datetime):
+            event[field] = event[field].isoformat()
+
+    return event
+
+
+def delete_event(tombstone):
+    return {
+        "type": "delete",
+        "_id": str(tombstone["foodId"]),
+        "donorId": tombstone.get("donorId"),
+        "changeSeq": tombstone["seq"]
+    }
+
+
+# Other users' ids stay on the server: donorId / reservedBy are only
+# sent to the user they name.
+PRIVATE_FIELDS = ("donorId", "reservedBy")
+
+
+def for_audience(event, user_id):
+    return {
+        field: value for field, value in event.items()
+        if field not in PRIVATE_FIELDS or value == user_id
+    }
+
+
+# Only real food changes: inserts, updates that moved status or
+# updatedAt (transitions and donor edits, which also stamp the changeSeq
+# the polling fallback follows) and deletion tombstones. Bookkeeping writes (rollup
+# flags, geohash backfill) and the archive job's deletes stay out.
+WATCH_PIPELINE = [{"$match": {"$or": [
+    {"ns.coll": foods_collection.name, "operationType": "insert"},
+    {
+        "ns.coll": foods_collection.name,
+        "operationType": "update",
+        "$or": [
+            {"updateDescription.updatedFields.status": {"$exists": True}},
+            {"updateDescription.updatedFields.updatedAt": {"$exists": True}}
+        ]
+    },
+    {
+        "ns.coll": tombstones_collection.name,
+        "operationType": "insert",
+        "fullDocument.scope": "all"
+    }
+]}}]
+
+# $changeStream on a standalone server
+CHANGE_STREAMS_UNSUPPORTED = 40573
+CHANGE_STREAM_HISTORY_LOST = 286
+
+POLL_SORT = [("changeSeq", 1), ("_id", 1)]
+POLL_BATCH = 1000
+
+
+# keyset on (changeSeq, _id): a batch transition stamping thousands of
+# docs with one changeSeq still pages forward. `last` is the
+# (changeSeq, _id) of the previous page's last doc.
+def poll_query(since, last=None):
+    if last is None:
+        return changed_since({}, since)
+    return after_cursor({}, POLL_SORT, last)
+
+
+class Subscriber:
+    def __init__(self, matches):
+        self.matches = matches
+        self.events = queue.Queue(maxsize=Config.CHANGE_FEED_QUEUE_SIZE)
+        self.dropped = False
+
+
+# One upstream reader per process fans food changes out to every SSE
+# subscriber. It tails a change stream when the deployment supports it
+# and otherwise polls foods and tombstones by changeSeq; deletions come
+# from the tombstones either way. A subscriber whose queue fills up, or whose
+# reader died, is dropped rather than slowing everyone else down; it
+# gets a "resync" event and has to refetch.
+class ChangeFeed:
+    def __init__(self):
+        self._subscribers = set()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def subscribe(self, matches):
+        subscriber = Subscriber(matches)
+
+        with self._cond:
+            self._subscribers.add(subscriber)
+            self._cond.notify()
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+                self._thread.start()
+
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._cond:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        with self._cond:
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            if not subscriber.matches(event):
+                continue
+            try:
+                subscriber.events.put_nowait(event)
+            except queue.Full:
+                subscriber.dropped = True
+                self.unsubscribe(subscriber)
+
+    def _idle(self):
+        with self._cond:
+            return not self._subscribers
+
+    # Blocks while nobody is listening; True if we had to wait, meaning
+    # the reader should start from "now" rather than where it left off.
+    def _wait_for_subscribers(self):
+        with self._cond:
+            waited = not self._subscribers
+            while not self._subscribers:
+                self._cond.wait()
+        return waited
+
+    # Subscribers who can't be caught up get "resync" and reconnect;
+    # stop=True when the reader itself is exiting.
+    def _drop_subscribers(self, stop=False):
+        with self._cond:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+            if stop:
+                self._thread = None
+
+        for subscriber in subscribers:
+            subscriber.dropped = True
+            try:
+                # wake the stream up now rather than at the next heartbeat
+                subscriber.events.put_nowait(None)
+            except queue.Full:
+                pass
+
+    def _run(self):
+        try:
+            try:
+                self._watch()
+            except OperationFailure as e:
+                if e.code != CHANGE_STREAMS_UNSUPPORTED:
+                    raise
+                logger.info("Change streams unavailable (%s); polling changeSeq", e)
+                self._poll()
+        except Exception:
+            logger.exception("Change feed reader stopped")
+            self._drop_subscribers(stop=True)
+
+    def _watch(self):
+        resume_token = None
+
+        while True:
+            if self._wait_for_subscribers():
+                resume_token = None
+
+            try:
+                with db.watch(
+                    WATCH_PIPELINE,
+                    full_document="updateLookup",
+                    resume_after=resume_token
+                ) as stream:
+                    while stream.alive and not self._idle():
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+
+                        resume_token = stream.resume_token
+                        doc = change.get("fullDocument")
+
+                        if change["ns"]["coll"] == tombstones_collection.name:
+                            self.publish(delete_event(doc))
+                        elif doc:
+                            self.publish(to_event(doc))
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    raise
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    # missed changes can't be replayed, clients refetch
+                    resume_token = None
+                    self._drop_subscribers()
+                logger.exception("Change stream failed; resuming")
+                time.sleep(1)
+            except PyMongoError:
+                logger.exception("Change stream interrupted; resuming")
+                time.sleep(1)
+
+    # Foods and deletion tombstones since `since`, merged in changeSeq
+    # order as (changeSeq, key, event).
+    def _changes_since(self, since):
+        def upserts():
+            last = None
+            while True:
+                docs = list(
+                    foods_collection.find(poll_query(since, last), FEED_FIELDS)
+                    .sort(POLL_SORT)
+                    .limit(POLL_BATCH)
+                )
+                for doc in docs:
+                    yield doc["changeSeq"], ("upsert", doc["_id"], doc["changeSeq"]), to_event(doc)
+                if len(docs) < POLL_BATCH:
+                    return
+                last = [docs[-1]["changeSeq"], docs[-1]["_id"]]
+
+        deletes = (
+            (tombstone["seq"], ("delete", tombstone["foodId"], tombstone["seq"]), delete_event(tombstone))
+            for tombstone in tombstones_collection.find(
+                tombstones_since(["all"], since)
+            ).sort("seq", 1)
+        )
+
+        return list(merge(upserts(), deletes, key=lambda change: change[0]))
+
+    # One changeSeq cursor for upserts and deletes. A write takes its
+    # changeSeq before it commits, so every poll reaches back
+    # SYNC_SEQ_OVERLAP numbers for writes that were still in flight and
+    # skips the changes it has already published (key -> changeSeq).
+    # Returns the advanced (seq, published).
+    def _poll_once(self, seq, published):
+        try:
+            changes = self._changes_since(max(seq - Config.SYNC_SEQ_OVERLAP, 0))
+        except PyMongoError:
+            logger.exception("Change feed poll failed")
+            return seq, published
+
+        for change_seq, key, event in changes:
+            if key in published:
+                continue
+            published[key] = change_seq
+            seq = max(seq, change_seq)
+            self.publish(event)
+
+        return seq, {
+            key: change_seq for key, change_seq in published.items()
+            if change_seq > seq - Config.SYNC_SEQ_OVERLAP
+        }
+
+    def _poll(self):
+        seq, published = current_change_seq(), {}
+
+        while True:
+            if self._wait_for_subscribers():
+                seq, published = current_change_seq(), {}
+
+            seq, published = self._poll_once(seq, published)
+            time.sleep(Config.CHANGE_FEED_POLL_SECONDS)
+
+
+feed = ChangeFeed()
@@ -0,0 +1,140 @@
+from collections import defaultdict
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import DuplicateKeyError
+from utils.db import (
+    archive_collection, counters_collection, foods_collection, users_collection
+)
+
+FOOD_STATUSES = ["available", "reserved", "picked", "delivered", "expired"]
+
+PLATFORM = "platform"
+
+
+def donor_scope(donor_id):
+    return f"donor:{donor_id}"
+
+
+# { held: n } - foods the volunteer has reserved and not yet picked
+def volunteer_scope(volunteer_id):
+    return f"volunteer:{volunteer_id}"
+
+
+# deltas: { scope: { "foods.available": 1, ... } }
+def apply_deltas(deltas):
+    ops = [
+        UpdateOne({"_id": scope}, {"$inc": fields}, upsert=True)
+        for scope, fields in deltas.items()
+        if any(fields.values())
+    ]
+
+    if ops:
+        counters_collection.bulk_write(ops, ordered=False)
+
+
+def food_deltas(foods, fields):
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    for food in foods:
+        for scope in (PLATFORM, donor_scope(food["donorId"])):
+            for field, delta in fields.items():
+                deltas[scope][field] += delta
+
+    return deltas
+
+
+def held_deltas(foods, delta):
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    for food in foods:
+        if food.get("reservedBy"):
+            deltas[volunteer_scope(food["reservedBy"])]["held"] += delta
+
+    return deltas
+
+
+# Claims up to `wanted` reservation slots for the volunteer and returns
+# how many it got; cap <= 0 means no cap. The $inc is guarded on the
+# current count, so concurrent claims can't take the volunteer past cap.
+def claim_holds(volunteer_id, wanted, cap):
+    scope = volunteer_scope(volunteer_id)
+
+    if cap <= 0:
+        apply_deltas({scope: {"held": wanted}})
+        return wanted
+
+    while True:
+        doc = counters_collection.find_one({"_id": scope}, {"held": 1}) or {}
+        granted = min(wanted, cap - doc.get("held", 0))
+        if granted <= 0:
+            return 0
+
+        try:
+            counters_collection.update_one(
+                {"_id": scope, "held": {"$lte": cap - granted}},
+                {"$inc": {"held": granted}},
+                upsert=True
+            )
+            return granted
+        except DuplicateKeyError:
+            # the count moved past cap - granted since we read it; the
+            # upsert then collides with the existing document
+            continue
+
+
+def record_user_registered(role):
+    apply_deltas({PLATFORM: {f"users.{role}": 1}})
+
+
+def get_counters(scope):
+    doc = counters_collection.find_one({"_id": scope}) or {}
+    foods = doc.get("foods", {})
+
+    return {
+        "foods": {
+            "total": foods.get("total", 0),
+            **{status: foods.get(status, 0) for status in FOOD_STATUSES}
+        },
+        "users": doc.get("users", {})
+    }
+
+
+# Rebuild every counter document from the source collections
+def reconcile_counters():
+    scopes = defaultdict(lambda: {"foods": {"total": 0}, "users": {}})
+    scopes[PLATFORM]
+
+    # counters are all-time, archived foods still count
+    for collection in (foods_collection, archive_collection):
+        for row in collection.aggregate([
+            {"$group": {
+                "_id": {"donorId": "$donorId", "status": "$status"},
+                "n": {"$sum": 1}
+            }}
+        ]):
+            donor_id = row["_id"]["donorId"]
+            status = row["_id"]["status"]
+
+            for scope in (PLATFORM, donor_scope(donor_id)):
+                foods = scopes[scope]["foods"]
+                foods["total"] += row["n"]
+                foods[status] = foods.get(status, 0) + row["n"]
+
+    for row in users_collection.aggregate([
+        {"$group": {"_id": "$role", "n": {"$sum": 1}}}
+    ]):
+        scopes[PLATFORM]["users"][row["_id"]] = row["n"]
+
+    for row in foods_collection.aggregate([
+        {"$match": {"status": "reserved"}},
+        {"$group": {"_id": "$reservedBy", "n": {"$sum": 1}}}
+    ]):
+        scopes[volunteer_scope(row["_id"])] = {"held": row["n"]}
+
+    counters_collection.bulk_write([
+        ReplaceOne({"_id": scope}, doc, upsert=True)
+        for scope, doc in scopes.items()
+    ])
+
+    counters_collection.delete_many({"_id": {"$nin": list(scopes)}})
+
+    return len(scopes)
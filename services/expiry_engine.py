@@ -0,0 +1,220 @@
+import heapq
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from bson import ObjectId
+from config import Config
+from utils.db import foods_collection
+from services.food_lifecycle import transition_many
+from services.sync_service import changed_since, current_change_seq
+
+logger = logging.getLogger(__name__)
+
+
+# available food whose expiryTime has passed by `at`
+def due_by(at):
+    return {"status": "available", "expiryTime": {"$lte": at}}
+
+
+DUE_ORDER = [("expiryTime", 1), ("_id", 1)]
+
+
+# Expires each available food at its expiryTime instead of waiting for
+# the next sweep. Deadlines live in a min-heap that is seeded (and
+# periodically re-seeded) from the status + expiryTime index, so only
+# items due within EXPIRY_HORIZON_SECONDS are held in memory.
+#
+# Items added in this process are scheduled immediately. Items written
+# by other processes (web workers, other pods) are picked up by a
+# catch-up read of foods whose changeSeq moved since the last one, so
+# they are expired at most EXPIRY_CATCHUP_SECONDS late.
+class ExpiryEngine:
+    def __init__(self, batch_size, reseed_seconds, horizon_seconds, seed_limit, catch_up_seconds):
+        self.batch_size = batch_size
+        self.reseed_interval = timedelta(seconds=reseed_seconds)
+        self.catch_up_interval = timedelta(seconds=catch_up_seconds)
+        self.horizon = timedelta(seconds=horizon_seconds)
+        self.seed_limit = seed_limit
+
+        self._heap = []            # (expiryTime, food_id)
+        self._deadlines = {}       # food_id -> latest expiryTime; older heap entries are stale
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._next_seed = datetime.min
+        self._next_catch_up = datetime.min
+        self._seen_seq = 0         # changeSeq the heap is up to date with
+
+        # lag = when we expired it - expiryTime
+        self._lags = deque(maxlen=1000)
+        self._expired_total = 0
+        self._lag_sum = 0.0
+        self._lag_max = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+
+        self._stopping = False
+        self._next_seed = datetime.min
+        self._next_catch_up = datetime.min
+        self._thread = threading.Thread(target=self._run, name="expiry-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self._heap.clear()
+        self._deadlines.clear()
+
+    def schedule(self, food_id, expiry_time):
+        # also used for expiryTime edits; the old entry goes stale
+        if not self.running:
+            return
+
+        if expiry_time > datetime.utcnow() + self.horizon:
+            return  # a later re-seed will load it
+
+        with self._cond:
+            self._push(str(food_id), expiry_time)
+            self._cond.notify()
+
+    def metrics(self):
+        with self._cond:
+            lags = sorted(self._lags)
+
+        def pct(p):
+            return lags[min(len(lags) - 1, int(p * len(lags)))] if lags else 0.0
+
+        return {
+            "pending": len(self._deadlines),
+            "expired_total": self._expired_total,
+            "lag_seconds_avg": self._lag_sum / self._expired_total if self._expired_total else 0.0,
+            "lag_seconds_max": self._lag_max,
+            "lag_seconds_p50": pct(0.50),
+            "lag_seconds_p99": pct(0.99)
+        }
+
+    def _push(self, food_id, expiry_time):
+        if self._deadlines.get(food_id) == expiry_time:
+            return
+        self._deadlines[food_id] = expiry_time
+        heapq.heappush(self._heap, (expiry_time, food_id))
+
+    def _seed(self, now):
+        # read first: later writes are left to the catch-up
+        seq = current_change_seq()
+        cursor = foods_collection.find(
+            due_by(now + self.horizon),
+            {"expiryTime": 1}
+        ).sort(DUE_ORDER).limit(self.seed_limit)
+
+        with self._cond:
+            for doc in cursor:
+                self._push(str(doc["_id"]), doc["expiryTime"])
+
+        self._seen_seq = seq
+        self._next_seed = now + self.reseed_interval
+        self._next_catch_up = now + self.catch_up_interval
+
+    # A write takes its changeSeq before it commits, so the read reaches
+    # back SYNC_SEQ_OVERLAP numbers for writes that were still in flight.
+    def _catch_up(self, now):
+        seq = current_change_seq()
+        since = max(self._seen_seq - Config.SYNC_SEQ_OVERLAP, 0)
+        cursor = foods_collection.find(
+            changed_since(due_by(now + self.horizon), since),
+            {"expiryTime": 1}
+        ).limit(self.seed_limit)
+
+        with self._cond:
+            for doc in cursor:
+                self._push(str(doc["_id"]), doc["expiryTime"])
+
+        self._seen_seq = seq
+        self._next_catch_up = now + self.catch_up_interval
+
+    def _take_due(self, now):
+        due = {}
+
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            expiry_time, food_id = heapq.heappop(self._heap)
+            if self._deadlines.get(food_id) == expiry_time:
+                del self._deadlines[food_id]
+                due[food_id] = expiry_time
+
+        return due
+
+    def _expire(self, due, now):
+        changed = transition_many(
+            {
+                "_id": {"$in": [ObjectId(food_id) for food_id in due]},
+                # guards against an expiryTime pushed back by update_food
+                **due_by(now)
+            },
+            "expired",
+            {"expiredAt": now},
+            limit=len(due)
+        )
+
+        with self._cond:
+            for doc in changed:
+                lag = (now - due[str(doc["_id"])]).total_seconds()
+                self._lags.append(lag)
+                self._lag_sum += lag
+                self._lag_max = max(self._lag_max, lag)
+            self._expired_total += len(changed)
+
+    def _run(self):
+        while True:
+            now = datetime.utcnow()
+
+            try:
+                if now >= self._next_seed:
+                    self._seed(now)
+                elif now >= self._next_catch_up:
+                    self._catch_up(now)
+
+                with self._cond:
+                    if self._stopping:
+                        return
+                    due = self._take_due(now)
+
+                if due:
+                    self._expire(due, datetime.utcnow())
+                    continue
+            except Exception:
+                logger.exception("Expiry engine iteration failed")
+                self._next_seed = datetime.utcnow() + self.reseed_interval
+
+            with self._cond:
+                if self._stopping:
+                    return
+
+                wake_at = min(self._next_seed, self._next_catch_up)
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+
+                timeout = (wake_at - datetime.utcnow()).total_seconds()
+                if timeout > 0:
+                    self._cond.wait(timeout)
+
+
+engine = ExpiryEngine(
+    batch_size=Config.EXPIRY_BATCH_SIZE,
+    reseed_seconds=Config.EXPIRY_RESEED_SECONDS,
+    horizon_seconds=Config.EXPIRY_HORIZON_SECONDS,
+    seed_limit=Config.EXPIRY_SEED_LIMIT,
+    catch_up_seconds=Config.EXPIRY_CATCHUP_SECONDS
+)
@@ -1,13 +1,18 @@
 from datetime import datetime
-from utils.db import foods_collection
+from config import Config
+from services.food_lifecycle import transition_many
+from services.expiry_engine import due_by
 
+
+# Safety-net sweep; the expiry engine handles items on time
 def check_expired_food():
     now = datetime.utcnow()
 
-    foods_collection.update_many(
-        {
-            "expiryTime": {"$lte": now},
-            "status": "available"
-        },
-        {"$set": {"status": "expired"}}
-    )
+    # batches keep each pass bounded and let counters follow
+    while transition_many(
+        due_by(now),
+        "expired",
+        {"expiredAt": now},
+        limit=Config.EXPIRY_BATCH_SIZE
+    ):
+        pass
@@ -0,0 +1,241 @@
+import logging
+from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from utils.db import foods_collection
+from utils.response_cache import invalidate
+from services import counter_service, map_service, sync_service
+
+logger = logging.getLogger(__name__)
+
+# Every food status change goes through here so the side effects
+# (counters, change markers, tombstones, ...) stay in step with the
+# documents.
+
+# fields the side effects need from each changed document
+LIFECYCLE_FIELDS = {
+    "_id": 1, "donorId": 1, "status": 1, "reservedBy": 1,
+    "geohash": 1, "location": 1, "itemCategory": 1, "foodType": 1
+}
+
+
+def build_update(to_status, set_fields, unset_fields, seq):
+    update = {"$set": {
+        **(set_fields or {}),
+        "status": to_status,
+        "changeSeq": seq,
+        "updatedAt": datetime.utcnow()
+    }}
+    if unset_fields:
+        update["$unset"] = {field: "" for field in unset_fields}
+    return update
+
+
+# Returns (inserted docs, { position: error message }) - with several
+# docs the insert is unordered, so one bad document doesn't stop the rest.
+def create_foods(docs):
+    failed = {}
+    last_seq = sync_service.next_change_seq(len(docs))
+
+    for offset, doc in enumerate(docs):
+        doc["changeSeq"] = last_seq - len(docs) + 1 + offset
+
+    if len(docs) == 1:
+        foods_collection.insert_one(docs[0])
+    else:
+        try:
+            foods_collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err["errmsg"] for err in e.details["writeErrors"]}
+
+    inserted = [doc for i, doc in enumerate(docs) if i not in failed]
+    on_created(inserted)
+
+    return inserted, failed
+
+
+# Atomically move one document out of query["status"] into `to_status`.
+# Returns the pre-image, or None when the guard no longer matches.
+def transition_one(query, to_status, set_fields=None, unset_fields=None):
+    seq = sync_service.next_change_seq()
+
+    before = foods_collection.find_one_and_update(
+        query,
+        build_update(to_status, set_fields, unset_fields, seq),
+        projection=LIFECYCLE_FIELDS,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if before is not None:
+        on_status_changed([before], before["status"], to_status, seq)
+
+    return before
+
+
+# Batch version for jobs: one update_many over at most `limit`
+# documents matching query (whose "status" must be a single value).
+# Returns the pre-images of the ones this call actually changed.
+def transition_many(query, to_status, set_fields=None, unset_fields=None, limit=0):
+    before = {
+        doc["_id"]: doc
+        for doc in foods_collection.find(query, LIFECYCLE_FIELDS).limit(limit)
+    }
+    if not before:
+        return []
+
+    seq = sync_service.next_change_seq()
+
+    result = foods_collection.update_many(
+        {**query, "_id": {"$in": list(before)}},
+        build_update(to_status, set_fields, unset_fields, seq)
+    )
+
+    changed = moved_in(seq, before, result.modified_count)
+    on_status_changed(changed, query["status"], to_status, seq)
+
+    return changed
+
+
+# Per-document guarded transitions in one bulk write.
+# updates: [(query with "_id", set_fields)], each guarded on from_status.
+# Returns pre-images of the documents that made it; the rest lost a race.
+def transition_each(updates, from_status, to_status, unset_fields=None):
+    if not updates:
+        return []
+
+    ids = [query["_id"] for query, _ in updates]
+    found = {
+        doc["_id"]: doc
+        for doc in foods_collection.find(
+            {"_id": {"$in": ids}, "status": from_status}, LIFECYCLE_FIELDS
+        )
+    }
+    before = {food_id: found[food_id] for food_id in ids if food_id in found}
+    if not before:
+        return []
+
+    seq = sync_service.next_change_seq()
+
+    result = foods_collection.bulk_write([
+        UpdateOne(
+            {**query, "status": from_status},
+            build_update(to_status, set_fields, unset_fields, seq)
+        )
+        for query, set_fields in updates
+        if query["_id"] in before
+    ], ordered=False)
+
+    changed = moved_in(seq, before, result.modified_count)
+    on_status_changed(changed, from_status, to_status, seq)
+
+    return changed
+
+
+# A batch's changeSeq is taken for it alone, so the documents still
+# carrying it are the ones its write moved. `before` was read ahead of
+# the write with the same status guard; a document that left and came
+# back into it in between would be counted from the earlier read.
+def moved_in(seq, before, modified_count):
+    moved = {
+        doc["_id"]
+        for doc in foods_collection.find(
+            {"_id": {"$in": list(before)}, "changeSeq": seq}, {"_id": 1}
+        )
+    }
+
+    # a later write restamped them before we could read them back; the
+    # counters miss those until reconcile-counters runs
+    if len(moved) < modified_count:
+        logger.warning(
+            "%d of %d documents moved at changeSeq %d were rewritten before the read-back",
+            modified_count - len(moved), modified_count, seq
+        )
+
+    return [doc for food_id, doc in before.items() if food_id in moved]
+
+
+# Reserves as many of food_ids (in order) as the volunteer's cap allows.
+# The slots are claimed on the volunteer's held counter before the status
+# change, and the ones that lost their race are handed back; the rest go
+# back when the food leaves "reserved" (on_status_changed / on_deleted).
+# Returns (pre-images of the reserved docs, ids over the cap).
+def reserve_each(food_ids, volunteer_id, reserved_at, cap):
+    granted = counter_service.claim_holds(volunteer_id, len(food_ids), cap)
+
+    changed = transition_each(
+        [
+            ({"_id": food_id}, {"reservedBy": volunteer_id, "reservedAt": reserved_at})
+            for food_id in food_ids[:granted]
+        ],
+        "available",
+        "reserved"
+    )
+
+    if len(changed) < granted:
+        counter_service.apply_deltas({
+            counter_service.volunteer_scope(volunteer_id): {"held": len(changed) - granted}
+        })
+
+    return changed, food_ids[granted:]
+
+
+def update_food_fields(query, fields):
+    return foods_collection.update_one(query, {"$set": {
+        **fields,
+        "changeSeq": sync_service.next_change_seq(),
+        "updatedAt": datetime.utcnow()
+    }})
+
+
+def delete_one(query):
+    deleted = foods_collection.find_one_and_delete(query, projection=LIFECYCLE_FIELDS)
+
+    if deleted is not None:
+        on_deleted(deleted)
+
+    return deleted
+
+
+def on_created(docs):
+    counter_service.apply_deltas(
+        counter_service.food_deltas(docs, {"foods.total": 1, "foods.available": 1})
+    )
+    map_service.record_available(docs, 1)
+    invalidate("foods")
+
+
+def on_status_changed(docs, from_status, to_status, seq):
+    counter_service.apply_deltas(
+        counter_service.food_deltas(docs, {f"foods.{from_status}": -1, f"foods.{to_status}": 1})
+    )
+    # the slot was claimed by reserve_each
+    if from_status == "reserved":
+        counter_service.apply_deltas(counter_service.held_deltas(docs, -1))
+
+    # reservedBy is unset on the way out of a cart, so the volunteer's
+    # delta sync can only learn about it from a tombstone
+    if from_status == "reserved" and to_status == "available":
+        sync_service.record_cart_removals(docs, seq)
+
+    if from_status == "available":
+        map_service.record_available(docs, -1)
+    elif to_status == "available":
+        map_service.record_available(docs, 1)
+
+    # cached public responses only show delivered / expired totals
+    if to_status == "delivered":
+        invalidate("foods", "deliveries")
+    elif to_status == "expired":
+        invalidate("foods")
+
+
+def on_deleted(doc):
+    counter_service.apply_deltas(
+        counter_service.food_deltas([doc], {"foods.total": -1, f"foods.{doc['status']}": -1})
+    )
+    if doc["status"] == "reserved":
+        counter_service.apply_deltas(counter_service.held_deltas([doc], -1))
+    sync_service.record_deletion(doc["_id"], doc["donorId"])
+    if doc["status"] == "available":
+        map_service.record_available([doc], -1)
+    invalidate("foods")
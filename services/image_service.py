@@ -0,0 +1,87 @@
+import base64
+import binascii
+import io
+import os
+from PIL import Image, UnidentifiedImageError
+from werkzeug.datastructures import FileStorage
+from config import Config
+from utils.blob_store import get_blob_store
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def decode_base64_image(value):
+    # accepts raw base64 or a data URL ("data:image/png;base64,....")
+    if not isinstance(value, str):
+        raise InvalidImage("Image must be a base64 string")
+
+    if value.startswith("data:"):
+        value = value.partition(",")[2]
+
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidImage("Image is not valid base64")
+
+
+def store_image(data):
+    return store_image_file(io.BytesIO(data))
+
+
+# f: seekable binary file, e.g. a multipart upload spooled to disk
+def store_image_file(f):
+    if f.seek(0, os.SEEK_END) > Config.MAX_IMAGE_BYTES:
+        raise InvalidImage("Image is too large")
+
+    f.seek(0)
+    try:
+        img = Image.open(f)
+        img.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise InvalidImage("Unsupported image")
+
+    content_type = Image.MIME.get(img.format, "application/octet-stream")
+
+    thumb = img.convert("RGB")
+    thumb.thumbnail((Config.THUMBNAIL_SIZE, Config.THUMBNAIL_SIZE))
+    buf = io.BytesIO()
+    thumb.save(buf, "JPEG", quality=80, optimize=True)
+
+    store = get_blob_store()
+
+    return {
+        "hash": store.put_file(f, content_type),
+        "thumbnail": store.put(buf.getvalue(), "image/jpeg"),
+        "contentType": content_type
+    }
+
+
+def store_base64_image(value):
+    return store_image(decode_base64_image(value))
+
+
+# An image field is either a multipart file part or base64 in JSON
+def store_upload(value):
+    if isinstance(value, FileStorage):
+        return store_image_file(value.stream)
+    return store_base64_image(value)
+
+
+def image_url(key):
+    return f"{Config.IMAGE_BASE_URL}/{key}"
+
+
+# Replace a stored image reference with the URLs clients load it from.
+# Legacy inline base64 strings are passed through until migrated.
+def expand_image(doc, field):
+    ref = doc.pop(field, None)
+
+    if isinstance(ref, dict):
+        doc[f"{field}Url"] = image_url(ref["hash"])
+        doc[f"{field}ThumbnailUrl"] = image_url(ref["thumbnail"])
+    elif ref is not None:
+        doc[field] = ref
+
+    return doc
@@ -0,0 +1,77 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from utils.db import leases_collection
+
+logger = logging.getLogger(__name__)
+
+
+# A lease document in MongoDB: { _id: name, holder, expiresAt }.
+# Whoever holds an unexpired lease is the leader; the holder renews it
+# on every heartbeat, and once it stops (crash, network split) any other
+# process can take it over after expiresAt. A TTL index cleans up
+# abandoned leases.
+class LeaderLease:
+    def __init__(self, name, ttl_seconds):
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._valid_until = datetime.min
+
+    @property
+    def is_leader(self):
+        # judged on our own clock so a leader that can't reach Mongo
+        # stops running jobs once its lease would have lapsed
+        return datetime.utcnow() < self._valid_until
+
+    def heartbeat(self):
+        now = datetime.utcnow()
+
+        try:
+            doc = leases_collection.find_one_and_update(
+                {
+                    "_id": self.name,
+                    "$or": [
+                        {"holder": self.holder},
+                        {"expiresAt": {"$lt": now}}
+                    ]
+                },
+                {
+                    "$set": {
+                        "holder": self.holder,
+                        "expiresAt": now + self.ttl,
+                        "renewedAt": now
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # the lease exists and someone else holds it
+            doc = None
+        except PyMongoError:
+            logger.exception("Lease heartbeat failed")
+            return self.is_leader
+
+        was_leader = self.is_leader
+        self._valid_until = now + self.ttl if doc is not None else datetime.min
+
+        if self.is_leader != was_leader:
+            logger.info(
+                "%s %s leadership of %s",
+                self.holder, "acquired" if self.is_leader else "lost", self.name
+            )
+
+        return self.is_leader
+
+    def release(self):
+        self._valid_until = datetime.min
+
+        try:
+            leases_collection.delete_one({"_id": self.name, "holder": self.holder})
+        except PyMongoError:
+            logger.exception("Lease release failed")
@@ -0,0 +1,201 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import UpdateOne
+from config import Config
+from utils.db import (
+    archive_collection, foods_collection, karma_windows_collection, users_collection
+)
+from utils.pagination import paginate
+from utils.response_cache import invalidate
+
+# ⭐ KARMA POINTS
+KARMA_PER_DELIVERY = 10
+
+WINDOWS = ("week", "month")
+BOARD_SORT = [("karmaPoints", -1), ("_id", 1)]
+
+
+class InvalidWindow(ValueError):
+    pass
+
+
+# Period containing `at` -> (key, start, end), e.g. "week:2026-W42"
+def window_period(window, at):
+    day = datetime(at.year, at.month, at.day)
+
+    if window == "week":
+        year, week, _ = at.isocalendar()
+        start = day - timedelta(days=at.weekday())
+        return f"week:{year}-W{week:02d}", start, start + timedelta(days=7)
+
+    start = day.replace(day=1)
+    end = datetime(at.year + at.month // 12, at.month % 12 + 1, 1)
+    return f"month:{at:%Y-%m}", start, end
+
+
+def window_doc(key, volunteer_id, end):
+    return {
+        "window": key,
+        "volunteerId": volunteer_id,
+        "expiresAt": end + timedelta(days=Config.KARMA_WINDOW_RETENTION_DAYS)
+    }
+
+
+# One delivery event: bump the all-time totals on the user and the
+# running totals for the current week and month, so windowed boards
+# never have to re-aggregate deliveries.
+def credit_deliveries(volunteer_id, count, at=None):
+    at = at or datetime.utcnow()
+    karma = KARMA_PER_DELIVERY * count
+
+    users_collection.update_one(
+        {"_id": ObjectId(volunteer_id)},
+        {
+            "$inc": {
+                "karmaPoints": karma,
+                "deliveriesCompleted": count
+            }
+        }
+    )
+
+    ops = []
+    for window in WINDOWS:
+        key, _, end = window_period(window, at)
+        ops.append(UpdateOne(
+            {"_id": f"{key}:{volunteer_id}"},
+            {
+                "$inc": {"karmaPoints": karma, "deliveriesCompleted": count},
+                "$setOnInsert": window_doc(key, volunteer_id, end)
+            },
+            upsert=True
+        ))
+
+    karma_windows_collection.bulk_write(ops, ordered=False)
+    invalidate("karma")
+
+
+# window "all" | "week" | "month" -> (collection, query) of its board
+def board(window):
+    if window == "all":
+        return users_collection, {"role": "volunteer"}
+
+    if window not in WINDOWS:
+        raise InvalidWindow("window must be one of all, week, month")
+
+    key, _, _ = window_period(window, datetime.utcnow())
+    return karma_windows_collection, {"window": key}
+
+
+def ahead_of(query, karma):
+    return {**query, "karmaPoints": {"$gt": karma}}
+
+
+# Competition ranking (ties share a rank): 1 + number of volunteers
+# with more karma, counted on the board's index.
+def rank_for(window, karma):
+    collection, query = board(window)
+    return collection.count_documents(ahead_of(query, karma)) + 1
+
+
+def leaderboard_page(window, args):
+    collection, query = board(window)
+
+    projection = {"karmaPoints": 1, "deliveriesCompleted": 1}
+    if window == "all":
+        projection["name"] = 1
+    else:
+        projection["volunteerId"] = 1
+
+    docs, next_cursor = paginate(collection, query, projection, BOARD_SORT, args)
+
+    if docs:
+        # position of the first row, then ranks follow from the page order
+        first = docs[0]
+        karma = first.get("karmaPoints", 0)
+        greater = collection.count_documents(ahead_of(query, karma))
+        ahead = greater + collection.count_documents(
+            {**query, "karmaPoints": karma, "_id": {"$lt": first["_id"]}}
+        )
+
+        for i, doc in enumerate(docs):
+            if i == 0:
+                doc["rank"] = greater + 1
+            elif doc.get("karmaPoints") == docs[i - 1].get("karmaPoints"):
+                doc["rank"] = docs[i - 1]["rank"]
+            else:
+                doc["rank"] = ahead + i + 1
+
+    if window != "all":
+        names = {
+            str(user["_id"]): user.get("name")
+            for user in users_collection.find(
+                {"_id": {"$in": [ObjectId(doc["volunteerId"]) for doc in docs]}},
+                {"name": 1}
+            )
+        }
+        for doc in docs:
+            doc["_id"] = doc.pop("volunteerId")
+            doc["name"] = names.get(doc["_id"])
+
+    return docs, next_cursor
+
+
+def volunteer_rank(window, volunteer_id):
+    collection, query = board(window)
+
+    if window == "all":
+        doc = users_collection.find_one(
+            {"_id": ObjectId(volunteer_id)}, {"karmaPoints": 1, "deliveriesCompleted": 1}
+        )
+    else:
+        doc = karma_windows_collection.find_one(
+            {"_id": f"{query['window']}:{volunteer_id}"},
+            {"karmaPoints": 1, "deliveriesCompleted": 1}
+        )
+
+    karma = (doc or {}).get("karmaPoints", 0)
+
+    return {
+        "window": window,
+        "rank": rank_for(window, karma),
+        "karmaPoints": karma,
+        "deliveriesCompleted": (doc or {}).get("deliveriesCompleted", 0),
+        "total": collection.count_documents(query)
+    }
+
+
+# Rebuild the current week and month from delivered foods (backfill
+# after deploying, or repair); returns the number of window documents.
+def rebuild_windows():
+    now = datetime.utcnow()
+    written = 0
+
+    for window in WINDOWS:
+        key, start, end = window_period(window, now)
+
+        counts = defaultdict(int)
+        for collection in (foods_collection, archive_collection):
+            for row in collection.aggregate([
+                {"$match": {"status": "delivered", "deliveredAt": {"$gte": start, "$lt": end}}},
+                {"$group": {"_id": "$reservedBy", "n": {"$sum": 1}}}
+            ]):
+                counts[row["_id"]] += row["n"]
+
+        docs = [
+            {
+                "_id": f"{key}:{volunteer_id}",
+                **window_doc(key, volunteer_id, end),
+                "karmaPoints": KARMA_PER_DELIVERY * n,
+                "deliveriesCompleted": n
+            }
+            for volunteer_id, n in counts.items()
+        ]
+
+        karma_windows_collection.delete_many({"window": key})
+        if docs:
+            karma_windows_collection.insert_many(docs, ordered=False)
+        written += len(docs)
+
+    invalidate("karma")
+    return written
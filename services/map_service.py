@@ -0,0 +1,160 @@
+from collections import defaultdict
+from pymongo import UpdateOne
+from config import Config
+from utils.db import foods_collection, map_cells_collection
+from utils.geo import geohash_of
+from utils.geohash import cells_covering, count_covering
+
+
+class InvalidMapRequest(ValueError):
+    pass
+
+
+# map_cells holds one document per geohash prefix (for every precision
+# in MAP_CELL_PRECISIONS) with running totals over available food:
+#   { _id: "tepf", precision: 4, count, sumLat, sumLng,
+#     itemCategory: { cooked: n, ... }, foodType: { veg: n, ... } }
+# The lifecycle hooks keep it current, so a map pan reads a few small
+# documents by _id instead of aggregating foods.
+
+def bucket(value):
+    # used as a field name
+    return str(value or "unknown").replace(".", "_").replace("$", "_")
+
+
+def cell_deltas(foods, sign):
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    for food in foods:
+        geohash = food.get("geohash")
+        location = food.get("location")
+        if not geohash or not location:
+            continue
+
+        lng, lat = location["coordinates"]
+
+        for precision in Config.MAP_CELL_PRECISIONS:
+            fields = deltas[geohash[:precision]]
+            fields["count"] += sign
+            fields["sumLat"] += sign * lat
+            fields["sumLng"] += sign * lng
+            fields[f"itemCategory.{bucket(food.get('itemCategory'))}"] += sign
+            fields[f"foodType.{bucket(food.get('foodType'))}"] += sign
+
+    return deltas
+
+
+# sign: +1 when foods become available, -1 when they stop being
+def record_available(foods, sign):
+    ops = [
+        UpdateOne(
+            {"_id": cell},
+            {"$inc": dict(fields), "$setOnInsert": {"precision": len(cell)}},
+            upsert=True
+        )
+        for cell, fields in cell_deltas(foods, sign).items()
+    ]
+
+    if ops:
+        map_cells_collection.bulk_write(ops, ordered=False)
+
+
+# Map zoom level -> geohash precision (roughly one cell per 64-256 px
+# tile), coarsened until the box needs at most MAP_MAX_CELLS cells.
+def precision_for(zoom, box):
+    precisions = sorted(Config.MAP_CELL_PRECISIONS)
+    wanted = max(1, min(int(zoom) // 2, precisions[-1]))
+    candidates = [p for p in precisions if p <= wanted] or precisions[:1]
+
+    for precision in reversed(candidates):
+        if count_covering(*box, precision) <= Config.MAP_MAX_CELLS:
+            return precision
+
+    raise InvalidMapRequest("Bounding box too large for this zoom")
+
+
+def parse_bbox(value):
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in value.split(","))
+    except (AttributeError, ValueError):
+        raise InvalidMapRequest("bbox must be minLng,minLat,maxLng,maxLat")
+
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise InvalidMapRequest("Invalid bbox")
+
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def cells_query(box, precision):
+    return {"_id": {"$in": cells_covering(*box, precision)}, "count": {"$gt": 0}}
+
+
+def get_cells(bbox, zoom):
+    box = parse_bbox(bbox)
+
+    try:
+        zoom = float(zoom)
+    except (TypeError, ValueError):
+        raise InvalidMapRequest("Invalid zoom")
+
+    precision = precision_for(zoom, box)
+
+    cells = []
+    for doc in map_cells_collection.find(cells_query(box, precision)):
+        count = doc["count"]
+        cells.append({
+            "cell": doc["_id"],
+            "count": count,
+            "centroid": {"lat": doc["sumLat"] / count, "lng": doc["sumLng"] / count},
+            "itemCategory": {k: v for k, v in doc.get("itemCategory", {}).items() if v > 0},
+            "foodType": {k: v for k, v in doc.get("foodType", {}).items() if v > 0}
+        })
+
+    return precision, cells
+
+
+# Rebuild map_cells from the available foods, backfilling geohash on
+# documents written before it was stored.
+def reconcile_cells():
+    ops = []
+    for food in foods_collection.find(
+        {"geohash": {"$exists": False}, "location.type": "Point"},
+        {"location": 1}
+    ):
+        ops.append(UpdateOne(
+            {"_id": food["_id"]},
+            {"$set": {"geohash": geohash_of(food["location"])}}
+        ))
+
+        if len(ops) >= 500:
+            foods_collection.bulk_write(ops, ordered=False)
+            ops = []
+
+    if ops:
+        foods_collection.bulk_write(ops, ordered=False)
+
+    cells = defaultdict(lambda: defaultdict(int))
+    for food in foods_collection.find(
+        {"status": "available"},
+        {"geohash": 1, "location": 1, "itemCategory": 1, "foodType": 1}
+    ):
+        for cell, fields in cell_deltas([food], 1).items():
+            for field, value in fields.items():
+                cells[cell][field] += value
+
+    docs = []
+    for cell, fields in cells.items():
+        doc = {"_id": cell, "precision": len(cell)}
+        for field, value in fields.items():
+            if "." in field:
+                group, key = field.split(".", 1)
+                doc.setdefault(group, {})[key] = value
+            else:
+                doc[field] = value
+        docs.append(doc)
+
+    map_cells_collection.delete_many({})
+    if docs:
+        map_cells_collection.insert_many(docs, ordered=False)
+
+    return len(docs)
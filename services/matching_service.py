@@ -0,0 +1,104 @@
+import re
+from datetime import datetime
+import numpy as np
+from config import Config
+from utils.db import foods_collection
+from utils.geo import to_geojson
+
+QUANTITY_NUMBER = re.compile(r"\s*(\d+(?:\.\d+)?)")
+
+# read for scoring even when ?fields= leaves them out
+SCORING_FIELDS = ("expiryTime", "itemCategory", "quantity")
+
+
+def parse_quantity(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    match = QUANTITY_NUMBER.match(str(value or ""))
+    return float(match.group(1)) if match else 1.0
+
+
+# Nearest available, unexpired items within the radius: the 2dsphere
+# index bounds the window, scoring only ever sees FEED_CANDIDATES docs.
+def candidate_pipeline(origin, radius_km, projection, now):
+    lat, lng = origin
+
+    return [
+        {
+            "$geoNear": {
+                "near": to_geojson({"lat": lat, "lng": lng}),
+                "distanceField": "distanceKm",
+                "distanceMultiplier": 0.001,
+                "maxDistance": radius_km * 1000,
+                "query": {"status": "available", "expiryTime": {"$gt": now}},
+                "spherical": True
+            }
+        },
+        {"$limit": Config.FEED_CANDIDATES},
+        {"$project": {**projection, **{f: 1 for f in SCORING_FIELDS}, "distanceKm": 1}}
+    ]
+
+
+def candidate_window(origin, radius_km, projection, now):
+    return list(foods_collection.aggregate(
+        candidate_pipeline(origin, radius_km, projection, now)
+    ))
+
+
+# Each term is scaled to 0..1 and combined with FEED_WEIGHTS:
+#   urgency   exp(-hours left / FEED_URGENCY_HOURS), so the last hour counts most
+#   distance  1 at the volunteer, 0 at the edge of the radius
+#   category  FEED_CATEGORY_FACTORS (cooked spoils faster than packed)
+#   quantity  log-scaled against the largest candidate
+# Items that expire before the volunteer could get there are dropped.
+def score_candidates(foods, radius_km, now):
+    if not foods:
+        return np.empty(0), np.empty(0, dtype=bool)
+
+    weights = Config.FEED_WEIGHTS
+
+    hours_left = np.array([(f["expiryTime"] - now).total_seconds() / 3600 for f in foods])
+    distance = np.array([f["distanceKm"] for f in foods])
+    category = np.array([
+        Config.FEED_CATEGORY_FACTORS.get(f.get("itemCategory"), 0.5) for f in foods
+    ])
+    quantity = np.log1p([parse_quantity(f.get("quantity")) for f in foods])
+
+    urgency = np.exp(-np.maximum(hours_left, 0) / Config.FEED_URGENCY_HOURS)
+    nearness = 1 - np.clip(distance / radius_km, 0, 1)
+    amount = quantity / quantity.max() if quantity.max() > 0 else quantity
+
+    scores = (
+        weights["urgency"] * urgency
+        + weights["distance"] * nearness
+        + weights["category"] * category
+        + weights["quantity"] * amount
+    )
+    reachable = distance / Config.ROUTE_SPEED_KMH < hours_left
+
+    return scores, reachable
+
+
+def ranked_feed(origin, radius_km, projection, limit):
+    now = datetime.utcnow()
+    foods = candidate_window(origin, radius_km, projection, now)
+    scores, reachable = score_candidates(foods, radius_km, now)
+
+    indexes = np.flatnonzero(reachable)
+    # partial sort: only the top `limit` need ordering
+    if len(indexes) > limit:
+        indexes = indexes[np.argpartition(-scores[indexes], limit - 1)[:limit]]
+    indexes = indexes[np.argsort(-scores[indexes], kind="stable")]
+
+    hidden = [field for field in SCORING_FIELDS if field not in projection]
+
+    ranked = []
+    for i in indexes:
+        food = foods[i]
+        for field in hidden:
+            food.pop(field, None)
+        food["score"] = round(float(scores[i]), 4)
+        ranked.append(food)
+
+    return ranked, len(foods)
@@ -0,0 +1,105 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from werkzeug.security import generate_password_hash, check_password_hash
+from config import Config
+
+
+class HashingBusy(Exception):
+    pass
+
+
+# Password hashing is deliberately slow (scrypt/PBKDF2 burn a core for
+# tens to hundreds of ms), so it runs on a small process pool instead of
+# the request thread. At most PASSWORD_HASH_MAX_PENDING calls may be
+# queued or running; beyond that callers get HashingBusy (-> 503) rather
+# than piling up behind a login burst.
+#
+# Workers come from a forkserver (spawn where there is none), never a
+# fork of this process: by the first login it is running pymongo
+# monitors, the scheduler and the WSGI server's threads, and a forked
+# child can deadlock on a lock one of them held. The worker functions
+# only need werkzeug.security; app.py skips building the app when it
+# is re-imported as a worker's __mp_main__.
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, Config.PASSWORD_HASH_MAX_PENDING))
+
+
+def _get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            _executor = ProcessPoolExecutor(
+                max_workers=Config.PASSWORD_HASH_WORKERS,
+                mp_context=context
+            )
+        return _executor
+
+
+# A pool whose worker died (OOM killer, a crash) fails every later
+# submit; drop it so the next call builds a fresh one. Only the thread
+# that still sees `broken` installed clears it.
+def _reset_executor(broken):
+    global _executor
+
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _call(fn, *args):
+    executor = _get_executor()
+    try:
+        return executor.submit(fn, *args).result()
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        raise
+
+
+def _run(fn, *args):
+    # PASSWORD_HASH_WORKERS=0 hashes inline (dev, tests, single-user tools)
+    if Config.PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy("Too many pending password operations")
+
+    try:
+        try:
+            return _call(fn, *args)
+        except BrokenProcessPool:
+            # hashing has no side effects, so one retry on a new pool
+            return _call(fn, *args)
+    finally:
+        _slots.release()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, Config.PASSWORD_HASH_METHOD)
+
+
+def verify_password(hashed_password, password):
+    return _run(check_password_hash, hashed_password, password)
+
+
+# werkzeug stores "<method>$<salt>$<hash>" with defaults filled in
+# (e.g. "scrypt" -> "scrypt:32768:8:1"), so derive the stored form of
+# the configured method once and compare against that.
+@lru_cache(maxsize=None)
+def _stored_method(method):
+    return generate_password_hash("", method, salt_length=1).split("$", 1)[0]
+
+
+def needs_rehash(hashed_password):
+    return hashed_password.split("$", 1)[0] != _stored_method(Config.PASSWORD_HASH_METHOD)
+
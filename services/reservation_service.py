@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from config import Config
+from services.food_lifecycle import transition_many
+
+
+def stale_query(cutoff):
+    return {"status": "reserved", "reservedAt": {"$lte": cutoff}}
+
+
+# Return reservations that were never picked up to the available pool.
+# Walks the status + reservedAt index from the oldest hold, so the cost
+# is proportional to the number of stale holds, not all reservations.
+def release_stale_reservations():
+    if Config.RESERVATION_HOLD_MINUTES <= 0:
+        return 0
+
+    cutoff = datetime.utcnow() - timedelta(minutes=Config.RESERVATION_HOLD_MINUTES)
+    released = 0
+
+    while True:
+        changed = transition_many(
+            stale_query(cutoff),
+            "available",
+            unset_fields=["reservedBy", "reservedAt"],
+            limit=Config.EXPIRY_BATCH_SIZE
+        )
+        if not changed:
+            return released
+
+        released += len(changed)
+
+
+def hold_expires_at(reserved_at):
+    if Config.RESERVATION_HOLD_MINUTES <= 0:
+        return None
+    return reserved_at + timedelta(minutes=Config.RESERVATION_HOLD_MINUTES)
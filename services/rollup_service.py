@@ -0,0 +1,235 @@
+import bisect
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from config import Config
+from utils.db import (
+    archive_collection, foods_collection, rollups_collection, sequences_collection
+)
+from utils.pagination import after_cursor
+from services.counter_service import PLATFORM, donor_scope
+from services.sync_service import changed_since
+
+
+class InvalidRange(ValueError):
+    pass
+
+
+# event -> timestamp field; each is counted once per food, on its day
+EVENTS = {
+    "posted": "createdAt",
+    "reserved": "reservedAt",
+    "picked": "pickedAt",
+    "delivered": "deliveredAt",
+    "expired": "expiredAt"
+}
+
+# stage -> (from, to); durations are recorded when `to` is counted
+STAGES = {
+    "toReserve": ("createdAt", "reservedAt"),
+    "toPick": ("reservedAt", "pickedAt"),
+    "toDeliver": ("pickedAt", "deliveredAt")
+}
+STAGE_ENDS = {end: stage for stage, (_, end) in STAGES.items()}
+
+# Durations are kept as histograms (minutes, upper bounds) so medians
+# over any range of days can be estimated from summed buckets.
+DURATION_BINS = [5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 360, 480, 720, 1080, 1440, 2880, 10080]
+
+WATERMARK = "rollups"
+ARCHIVE_WATERMARK = "rollups:archive"
+# transition_many stamps a whole batch with one changeSeq, so walk
+# (changeSeq, _id) rather than changeSeq alone
+ORDER = [("changeSeq", 1), ("_id", 1)]
+ROLLUP_FIELDS = {
+    "donorId": 1, "itemCategory": 1, "changeSeq": 1, "rolledUp": 1,
+    **{field: 1 for field in EVENTS.values()}
+}
+
+
+def bucket_id(scope, day):
+    return f"{scope}:{day:%Y-%m-%d}"
+
+
+def duration_bin(minutes):
+    return str(bisect.bisect_left(DURATION_BINS, minutes))
+
+
+# Daily buckets in rollups, one per scope (platform / donor) and day:
+#   { _id: "platform:2026-10-18", scope, day,
+#     events: { posted: n, ... },
+#     byCategory: { cooked: { posted: n, expired: n, ... } },
+#     durations: { toReserve: { "<bin>": n, ... } } }
+#
+# The job walks foods by changeSeq from its watermark (minus an overlap,
+# since sequence numbers are taken before the write lands) and counts
+# each event a document has reached but not yet been counted for;
+# rolledUp on the food lists the events already counted.
+def roll_up(batch_size=None, collection=foods_collection, watermark=WATERMARK):
+    batch_size = batch_size or Config.ROLLUP_BATCH_SIZE
+    state = sequences_collection.find_one({"_id": watermark}) or {}
+    since = max(state.get("seq", 0) - Config.SYNC_SEQ_OVERLAP, 0)
+    query = changed_since({}, since)
+    processed = 0
+
+    while True:
+        foods = list(
+            collection.find(query, ROLLUP_FIELDS).sort(ORDER).limit(batch_size)
+        )
+        if not foods:
+            break
+
+        deltas = defaultdict(lambda: defaultdict(int))
+        flags = []
+
+        for food in foods:
+            counted = set(food.get("rolledUp", []))
+            new = [
+                event for event, field in EVENTS.items()
+                if event not in counted and isinstance(food.get(field), datetime)
+            ]
+            if not new:
+                continue
+
+            scopes = (PLATFORM, donor_scope(food["donorId"]))
+            category = food.get("itemCategory") or "unknown"
+
+            for event in new:
+                field = EVENTS[event]
+                day = food[field].replace(hour=0, minute=0, second=0, microsecond=0)
+                fields = {f"events.{event}": 1, f"byCategory.{category}.{event}": 1}
+
+                stage = STAGE_ENDS.get(field)
+                start = food.get(STAGES[stage][0]) if stage else None
+                if isinstance(start, datetime) and food[field] >= start:
+                    minutes = (food[field] - start).total_seconds() / 60
+                    fields[f"durations.{stage}.{duration_bin(minutes)}"] = 1
+
+                for scope in scopes:
+                    for name, value in fields.items():
+                        deltas[(scope, day)][name] += value
+
+            flags.append(UpdateOne(
+                {"_id": food["_id"]},
+                {"$addToSet": {"rolledUp": {"$each": new}}}
+            ))
+
+        if deltas:
+            rollups_collection.bulk_write([
+                UpdateOne(
+                    {"_id": bucket_id(scope, day)},
+                    {"$inc": dict(fields), "$setOnInsert": {"scope": scope, "day": day}},
+                    upsert=True
+                )
+                for (scope, day), fields in deltas.items()
+            ], ordered=False)
+        if flags:
+            collection.bulk_write(flags, ordered=False)
+
+        last = foods[-1]
+        query = after_cursor({}, ORDER, [last["changeSeq"], last["_id"]])
+        processed += len(foods)
+
+        sequences_collection.update_one(
+            {"_id": watermark},
+            {"$max": {"seq": last["changeSeq"]}},
+            upsert=True
+        )
+
+        if len(foods) < batch_size:
+            break
+
+    return processed
+
+
+# Archived foods no longer change, only a rebuild needs to walk them
+def roll_up_archive(batch_size=None):
+    return roll_up(batch_size, archive_collection, ARCHIVE_WATERMARK)
+
+
+# Start over: the next run recounts every food
+def reset_rollups():
+    rollups_collection.delete_many({})
+    for collection in (foods_collection, archive_collection):
+        collection.update_many({"rolledUp": {"$exists": True}}, {"$unset": {"rolledUp": ""}})
+    sequences_collection.delete_many({"_id": {"$in": [WATERMARK, ARCHIVE_WATERMARK]}})
+
+
+def parse_day(value, default):
+    if not value:
+        return default
+
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise InvalidRange("Dates must be YYYY-MM-DD")
+
+
+def median_minutes(histogram):
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    seen = 0
+    for index in range(len(DURATION_BINS) + 1):
+        count = histogram.get(str(index), 0)
+        if seen + count >= total / 2:
+            low = DURATION_BINS[index - 1] if index else 0
+            high = DURATION_BINS[index] if index < len(DURATION_BINS) else low
+            # interpolate within the bucket
+            return round(low + (high - low) * (total / 2 - seen) / count, 1) if count else low
+        seen += count
+
+    return None
+
+
+def series_query(scope, start, end):
+    return {"_id": {"$gte": bucket_id(scope, start), "$lte": bucket_id(scope, end)}}
+
+
+# ?from=&to= (inclusive, YYYY-MM-DD, default the last 30 days) ->
+# one row per day plus expiry rates and stage medians over the range
+def time_series(scope, args):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = parse_day(args.get("to"), today)
+    start = parse_day(args.get("from"), end - timedelta(days=29))
+
+    if start > end:
+        raise InvalidRange("from must not be after to")
+    if (end - start).days >= Config.ROLLUP_MAX_DAYS:
+        raise InvalidRange(f"At most {Config.ROLLUP_MAX_DAYS} days per request")
+
+    buckets = {
+        doc["day"]: doc
+        for doc in rollups_collection.find(series_query(scope, start, end))
+    }
+
+    days = []
+    by_category = defaultdict(lambda: defaultdict(int))
+    durations = defaultdict(lambda: defaultdict(int))
+
+    day = start
+    while day <= end:
+        doc = buckets.get(day, {})
+        days.append({
+            "date": f"{day:%Y-%m-%d}",
+            **{event: doc.get("events", {}).get(event, 0) for event in EVENTS}
+        })
+
+        for category, counts in doc.get("byCategory", {}).items():
+            for event, n in counts.items():
+                by_category[category][event] += n
+        for stage, histogram in doc.get("durations", {}).items():
+            for index, n in histogram.items():
+                durations[stage][index] += n
+
+        day += timedelta(days=1)
+
+    return {
+        "days": days,
+        "expiryRate": {
+            category: round(counts["expired"] / counts["posted"], 4) if counts["posted"] else None
+            for category, counts in by_category.items()
+        },
+        "medianMinutes": {stage: median_minutes(durations[stage]) for stage in STAGES}
+    }
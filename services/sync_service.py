@@ -0,0 +1,126 @@
+import base64
+import binascii
+import json
+import time
+from datetime import datetime
+from pymongo import ReturnDocument
+from config import Config
+from utils.db import foods_collection, sequences_collection, tombstones_collection
+
+
+class SyncResyncRequired(Exception):
+    pass
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+# Monotonic change marker: every write to foods stamps changeSeq from
+# this counter, so "what changed since N" is an index range.
+def next_change_seq(count=1):
+    doc = sequences_collection.find_one_and_update(
+        {"_id": "foods"},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["seq"]
+
+
+def current_change_seq():
+    doc = sequences_collection.find_one({"_id": "foods"})
+    return doc["seq"] if doc else 0
+
+
+# Tombstones remember ids that left a result set without leaving a
+# document behind to query: deletions (scope "all") and reservations
+# released from a volunteer's cart (scope "cart:<volunteer id>").
+# donorId lets the change feed route the delete to the donor's stream
+def record_deletion(food_id, donor_id):
+    tombstones_collection.insert_one({
+        "foodId": food_id,
+        "donorId": donor_id,
+        "scope": "all",
+        "seq": next_change_seq(),
+        "createdAt": datetime.utcnow()
+    })
+
+
+def record_cart_removals(docs, seq):
+    now = datetime.utcnow()
+    tombstones = [
+        {"foodId": doc["_id"], "scope": f"cart:{doc['reservedBy']}", "seq": seq, "createdAt": now}
+        for doc in docs
+        if doc.get("reservedBy")
+    ]
+
+    if tombstones:
+        tombstones_collection.insert_many(tombstones)
+
+
+def encode_token(seq):
+    raw = json.dumps({"s": seq, "t": int(time.time())}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        seq, issued_at = int(data["s"]), int(data["t"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidSyncToken("Invalid sync token")
+
+    # older than the tombstones we keep: we can't tell what was removed
+    if time.time() - issued_at > Config.SYNC_TOMBSTONE_TTL_HOURS * 3600:
+        raise SyncResyncRequired("Sync token expired")
+
+    return seq
+
+
+def changed_since(query, seq):
+    return {**query, "changeSeq": {"$gt": seq}}
+
+
+def tombstones_since(scopes, seq):
+    return {"scope": {"$in": scopes}, "seq": {"$gt": seq}}
+
+
+# Changes since `token`:
+#   items   - documents in the result set (upsert_query) changed since
+#   removed - ids that left it: changed documents matching removed_query
+#             plus tombstones in `scopes`
+# A few sequence numbers of overlap cover writes that took their
+# changeSeq just before the token was issued; clients apply both lists
+# idempotently.
+def delta(token, upsert_query, projection, removed_query, scopes):
+    since = max(decode_token(token) - Config.SYNC_SEQ_OVERLAP, 0)
+    limit = Config.SYNC_MAX_CHANGES
+
+    items = list(
+        foods_collection.find(changed_since(upsert_query, since), projection)
+        .sort("changeSeq", 1)
+        .limit(limit + 1)
+    )
+
+    removed = {
+        doc["_id"]
+        for doc in foods_collection.find(
+            changed_since(removed_query, since), {"_id": 1}
+        ).limit(limit + 1)
+    }
+    removed.update(
+        doc["foodId"]
+        for doc in tombstones_collection.find(
+            tombstones_since(scopes, since), {"foodId": 1}
+        ).limit(limit + 1)
+    )
+
+    if len(items) > limit or len(removed) > limit:
+        raise SyncResyncRequired("Too many changes")
+
+    # a document that left and came back is current, not removed
+    removed -= {doc["_id"] for doc in items}
+
+    return items, [str(food_id) for food_id in removed]
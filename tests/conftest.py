@@ -0,0 +1,176 @@
+# Behaviour tests run on mongomock: utils.db is imported here, before
+# any test module, with MongoClient swapped for mongomock's, so every
+# service reads and writes in-memory collections. (test_query_plans.py
+# opens its own pymongo client, it needs a real server for explain.)
+#
+#   pip install pytest mongomock && python -m pytest -q
+import base64
+import io
+import os
+from datetime import datetime, timedelta
+from unittest import mock
+import pytest
+from bson import ObjectId
+
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-of-at-least-32-bytes")
+os.environ.setdefault("RUN_JOBS", "false")
+# hash inline rather than on a pool of worker processes
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+if mongomock is not None:
+    from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+    from pymongo.results import BulkWriteResult
+
+    # Test-only: mongomock 4.3 predates the `sort` option pymongo 4.11
+    # added to UpdateOne / ReplaceOne, and its bulk_write fails on the
+    # ops current pymongo builds. Replay them one by one instead.
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        counts = {"nMatched": 0, "nModified": 0, "nUpserted": 0, "nInserted": 0, "nRemoved": 0}
+
+        for op in requests:
+            if isinstance(op, InsertOne):
+                self.insert_one(op._doc)
+                counts["nInserted"] += 1
+                continue
+            if isinstance(op, DeleteOne):
+                counts["nRemoved"] += self.delete_one(op._filter).deleted_count
+                continue
+
+            if isinstance(op, UpdateOne):
+                result = self.update_one(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, UpdateMany):
+                result = self.update_many(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, ReplaceOne):
+                result = self.replace_one(op._filter, op._doc, upsert=op._upsert)
+            else:
+                raise NotImplementedError(type(op).__name__)
+
+            counts["nMatched"] += result.matched_count
+            counts["nModified"] += result.modified_count
+            counts["nUpserted"] += result.upserted_id is not None
+
+        return BulkWriteResult(counts, True)
+
+    mongomock.collection.Collection.bulk_write = bulk_write
+
+    with mock.patch("pymongo.MongoClient", mongomock.MongoClient):
+        import utils.db  # noqa: F401
+
+
+PLANS_UNVERIFIED = (
+    "query plans: NOT VERIFIED (set TEST_MONGO_URI to a mongod to run tests/test_query_plans.py)"
+)
+
+
+def pytest_report_header(config):
+    if os.getenv("TEST_MONGO_URI"):
+        return "query plans: explained against TEST_MONGO_URI"
+    return PLANS_UNVERIFIED
+
+
+# repeated at the end, where -q runs still show it
+def pytest_terminal_summary(terminalreporter):
+    if not os.getenv("TEST_MONGO_URI"):
+        terminalreporter.write_line(PLANS_UNVERIFIED, yellow=True)
+
+
+# images go to a per-test directory, not BLOB_STORE_PATH
+@pytest.fixture(autouse=True)
+def blob_store(tmp_path, monkeypatch):
+    from utils.blob_store import LocalBlobStore
+
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    monkeypatch.setattr("utils.blob_store._store", store)
+    return store
+
+
+# a small PNG, base64 encoded as the JSON endpoints take it
+@pytest.fixture
+def image_b64():
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (640, 480), "red").save(buf, "PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+@pytest.fixture
+def mock_db():
+    if mongomock is None:
+        pytest.skip("mongomock not installed")
+
+    from utils.db import db as database
+    from utils.indexes import ensure_indexes
+    from utils.response_cache import cache
+
+    # the same (unique, partial) indexes whether or not app was imported
+    for name in database.list_collection_names():
+        database[name].delete_many({})
+    ensure_indexes(database)
+    cache._entries.clear()
+
+    return database
+
+
+# add_food(**overrides) -> stored food document, created through the
+# lifecycle like /add does
+@pytest.fixture
+def add_food(mock_db):
+    from models.food_model import Food
+    from services.food_lifecycle import create_foods
+
+    def add(donor_id="donor-1", lat=17.4, lng=78.5, expiry_hours=6, **overrides):
+        food = Food(
+            donor_id=donor_id,
+            food_name="rice",
+            quantity="5 plates",
+            food_type="veg",
+            item_category="cooked",
+            expiry_time=datetime.utcnow() + timedelta(hours=expiry_hours),
+            location={"lat": lat, "lng": lng},
+            address="Hyderabad",
+            is_same_as_location=True,
+            image=None
+        ).__dict__
+        food.update(overrides)
+
+        create_foods([food])
+        return food
+
+    return add
+
+
+@pytest.fixture
+def client(mock_db):
+    from app import app
+
+    return app.test_client()
+
+
+# login(role, **fields) -> (user id, Authorization headers) for a user
+# stored directly, without going through the password pool
+@pytest.fixture
+def login(client, mock_db):
+    from flask_jwt_extended import create_access_token
+
+    def login(role, **fields):
+        user_id = mock_db.users.insert_one({
+            "name": f"{role} {ObjectId()}",
+            "email": f"{ObjectId()}@example.com",
+            "role": role,
+            "createdAt": datetime.utcnow(),
+            **fields
+        }).inserted_id
+
+        with client.application.app_context():
+            token = create_access_token(identity=str(user_id), additional_claims={"role": role})
+
+        return str(user_id), {"Authorization": f"Bearer {token}"}
+
+    return login
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from config import Config
+from routes.food_routes import MY_FOODS_SORT
+from services.archive_service import archive_foods, find_foods_page
+from utils.pagination import page_result
+
+NOW = datetime.utcnow()
+OLD = NOW - timedelta(days=Config.ARCHIVE_AFTER_DAYS + 1)
+
+
+@pytest.fixture
+def foods(mock_db, monkeypatch):
+    monkeypatch.setattr(Config, "ARCHIVE_IMAGES", "keep")
+    monkeypatch.setattr(Config, "ARCHIVE_BATCH_SIZE", 2)
+
+    # newest first; every other one delivered long enough ago to archive
+    docs = [
+        {
+            "_id": ObjectId(),
+            "donorId": "donor-1",
+            "createdAt": NOW - timedelta(days=i),
+            "expiryTime": NOW,
+            **({"status": "delivered", "deliveredAt": OLD} if i % 2 else {"status": "available"})
+        }
+        for i in range(7)
+    ]
+    mock_db.foods.insert_many(docs)
+
+    return docs
+
+
+def history(args):
+    ids, cursor = [], None
+    while True:
+        docs, limit = find_foods_page(
+            {"donorId": "donor-1"}, None, MY_FOODS_SORT,
+            {**args, "limit": "2", **({"cursor": cursor} if cursor else {})}
+        )
+        docs, cursor = page_result(list(docs), MY_FOODS_SORT, limit)
+        ids += [doc["_id"] for doc in docs]
+        if cursor is None:
+            return ids
+
+
+def test_archive_moves_old_terminal_foods_in_batches(mock_db, foods):
+    assert archive_foods() == 3
+
+    assert mock_db.foods.count_documents({}) == 4
+    assert mock_db.foods_archive.count_documents({"archivedAt": {"$exists": True}}) == 3
+    assert archive_foods() == 0
+
+
+def test_history_pages_over_both_collections(mock_db, foods):
+    archive_foods()
+
+    assert history({"includeArchived": "true"}) == [doc["_id"] for doc in foods]
+    assert history({}) == [doc["_id"] for doc in foods if doc["status"] != "delivered"]
+
+
+def test_a_food_caught_mid_move_is_listed_once(mock_db, foods):
+    # copied to the archive, not yet deleted from foods
+    mock_db.foods_archive.insert_one({**foods[1], "archivedAt": NOW})
+
+    assert history({"includeArchived": "true"}) == [doc["_id"] for doc in foods]
+
+
+def test_my_foods_lists_archived_history_on_request(client, login, mock_db, monkeypatch):
+    monkeypatch.setattr(Config, "ARCHIVE_IMAGES", "keep")
+    donor_id, headers = login("donor")
+    delivered = {
+        "_id": ObjectId(), "donorId": donor_id, "createdAt": NOW,
+        "status": "delivered", "deliveredAt": OLD
+    }
+    current = {
+        "_id": ObjectId(), "donorId": donor_id, "createdAt": NOW + timedelta(seconds=1),
+        "status": "available"
+    }
+    mock_db.foods.insert_many([delivered, current])
+    archive_foods()
+
+    def listed(query):
+        page = client.get(f"/api/food/my-foods?limit=1{query}", headers=headers).json
+        ids = [item["_id"] for item in page["items"]]
+        while page["next_cursor"]:
+            page = client.get(
+                f"/api/food/my-foods?limit=1{query}&cursor={page['next_cursor']}", headers=headers
+            ).json
+            ids += [item["_id"] for item in page["items"]]
+        return ids
+
+    assert listed("") == [str(current["_id"])]
+    assert listed("&includeArchived=true") == [str(current["_id"]), str(delivered["_id"])]
@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from config import Config
+from services.counter_service import PLATFORM, donor_scope, get_counters
+
+
+@pytest.fixture
+def item(image_b64):
+    def item(**overrides):
+        return {
+            "foodName": "rice",
+            "quantity": "5 plates",
+            "foodType": "veg",
+            "itemCategory": "cooked",
+            "expiryTime": (datetime.utcnow() + timedelta(hours=6)).isoformat(),
+            "location": {"lat": 17.4, "lng": 78.5},
+            "address": "Hyderabad",
+            "isSameAsLocation": True,
+            "image": image_b64,
+            **overrides
+        }
+
+    return item
+
+
+def test_each_item_gets_its_own_result(client, login, item, mock_db, monkeypatch):
+    # several chunks, with failures spread across them
+    monkeypatch.setattr(Config, "BULK_INSERT_CHUNK", 2)
+    donor_id, headers = login("donor")
+    items = [item(), item(itemCategory="raw"), item(), item(foodName=""), item(), "not an object"]
+
+    response = client.post("/api/food/add/bulk", json=items, headers=headers)
+
+    assert response.status_code == 201
+    body = response.json
+    assert (body["created"], body["failed"]) == (3, 3)
+    assert [r["index"] for r in body["results"]] == list(range(6))
+    assert [r["status"] for r in body["results"]] == [
+        "created", "error", "created", "error", "created", "error"
+    ]
+    assert body["results"][1]["message"] == "Invalid item category"
+    assert body["results"][3]["message"] == "foodName is required"
+
+    stored = {str(doc["_id"]) for doc in mock_db.foods.find({"donorId": donor_id})}
+    assert stored == {r["_id"] for r in body["results"] if r["status"] == "created"}
+    assert get_counters(donor_scope(donor_id))["foods"]["available"] == 3
+    assert get_counters(PLATFORM)["foods"]["total"] == 3
+
+
+def test_ndjson_is_read_line_by_line(client, login, item, mock_db):
+    _, headers = login("donor")
+    body = "\n".join([json.dumps(item()), "{broken", "", json.dumps(item())]) + "\n"
+
+    response = client.post(
+        "/api/food/add/bulk",
+        data=body,
+        headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 201
+    assert [r["status"] for r in response.json["results"]] == ["created", "error", "created"]
+    assert mock_db.foods.count_documents({}) == 2
+
+
+def test_nothing_created_is_a_400(client, login, item, mock_db):
+    _, headers = login("donor")
+
+    response = client.post("/api/food/add/bulk", json=[item(location={})], headers=headers)
+
+    assert response.status_code == 400
+    assert response.json["results"] == [
+        {"index": 0, "status": "error", "message": "Valid location is required"}
+    ]
+    assert mock_db.foods.count_documents({}) == 0
+
+
+def test_rejects_bodies_that_are_not_lists_or_too_long(client, login, item, monkeypatch):
+    _, headers = login("donor")
+    monkeypatch.setattr(Config, "BULK_MAX_ITEMS", 2)
+
+    assert client.post("/api/food/add/bulk", json=item(), headers=headers).status_code == 400
+    assert client.post("/api/food/add/bulk", json=[item()] * 3, headers=headers).status_code == 413
+
+
+def test_only_donors_may_bulk_add(client, login, item):
+    _, headers = login("volunteer")
+
+    assert client.post("/api/food/add/bulk", json=[item()], headers=headers).status_code == 403
@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime
+from bson import ObjectId
+from services.counter_service import PLATFORM, get_counters
+from services.food_lifecycle import transition_each, transition_many, transition_one
+
+VOLUNTEER_ID = "volunteer-1"
+
+
+def reserve(food, volunteer_id=VOLUNTEER_ID):
+    return transition_one(
+        {"_id": food["_id"], "status": "available"},
+        "reserved",
+        {"reservedBy": volunteer_id, "reservedAt": datetime.utcnow()}
+    )
+
+
+def food_counts():
+    counts = get_counters(PLATFORM)["foods"]
+    return {status: n for status, n in counts.items() if n}
+
+
+def test_a_lost_race_changes_nothing(mock_db, add_food):
+    food = add_food()
+
+    assert reserve(food) is not None
+    assert reserve(food, "volunteer-2") is None
+
+    assert mock_db.foods.find_one({"_id": food["_id"]})["reservedBy"] == VOLUNTEER_ID
+    assert food_counts() == {"total": 1, "reserved": 1}
+
+
+def test_transition_each_reports_only_the_documents_it_moved(mock_db, add_food):
+    foods = [add_food() for _ in range(3)]
+    reserve(foods[1], "volunteer-2")
+
+    changed = transition_each(
+        [({"_id": f["_id"]}, {"reservedBy": VOLUNTEER_ID}) for f in foods],
+        "available",
+        "reserved"
+    )
+
+    assert [doc["_id"] for doc in changed] == [foods[0]["_id"], foods[2]["_id"]]
+    assert food_counts() == {"total": 3, "reserved": 3}
+
+
+def test_transition_many_returns_pre_images(mock_db, add_food):
+    foods = [add_food() for _ in range(3)]
+    for food in foods:
+        reserve(food)
+
+    changed = transition_many(
+        {"status": "reserved"}, "available", unset_fields=["reservedBy", "reservedAt"], limit=2
+    )
+
+    # reservedBy is gone from the documents but not from what we report
+    assert [doc["reservedBy"] for doc in changed] == [VOLUNTEER_ID, VOLUNTEER_ID]
+    assert food_counts() == {"total": 3, "available": 2, "reserved": 1}
+
+
+def test_a_document_rewritten_before_the_read_back_is_logged(mock_db, add_food, monkeypatch, caplog):
+    food = add_food()
+    update_many = mock_db.foods.update_many
+
+    # a later write restamps changeSeq right after ours
+    def update_then_restamp(query, update, **kwargs):
+        result = update_many(query, update, **kwargs)
+        mock_db.foods.update_one({"_id": food["_id"]}, {"$inc": {"changeSeq": 1}})
+        return result
+
+    monkeypatch.setattr(mock_db.foods, "update_many", update_then_restamp)
+
+    with caplog.at_level(logging.WARNING, "services.food_lifecycle"):
+        assert transition_many({"status": "available"}, "expired", limit=10) == []
+
+    assert "1 of 1 documents" in caplog.text
+
+
+def cart_ids(client, headers):
+    return {item["_id"]: item["status"] for item in client.get("/api/food/my-cart", headers=headers).json}
+
+
+def test_cart_batches_walk_items_through_the_cart(client, login, add_food, image_b64, mock_db):
+    volunteer_id, headers = login("volunteer")
+    foods = [add_food() for _ in range(3)]
+    ids = [str(f["_id"]) for f in foods]
+    reserve(foods[2], "volunteer-2")
+
+    response = client.post("/api/food/cart/reserve", json={"foodIds": ids}, headers=headers)
+    assert response.json == {"succeeded": ids[:2], "failed": ids[2:]}
+    assert cart_ids(client, headers) == {ids[0]: "reserved", ids[1]: "reserved"}
+
+    response = client.post("/api/food/cart/unreserve", json={"foodIds": [ids[1]]}, headers=headers)
+    assert response.json == {"succeeded": [ids[1]], "failed": []}
+
+    # someone else's reservation can't be picked
+    response = client.post("/api/food/cart/pick", json={"foodIds": [ids[0], ids[2]]}, headers=headers)
+    assert response.json == {"succeeded": [ids[0]], "failed": [ids[2]]}
+    assert cart_ids(client, headers) == {ids[0]: "picked"}
+
+    response = client.post("/api/food/cart/deliver", json={"items": [{
+        "foodId": ids[0], "deliveryAddress": "Shelter", "deliveryImage": image_b64
+    }]}, headers=headers)
+    assert response.json == {"succeeded": [ids[0]], "failed": []}
+
+    assert cart_ids(client, headers) == {}
+    assert mock_db.users.find_one({"_id": ObjectId(volunteer_id)})["deliveriesCompleted"] == 1
+    assert food_counts() == {"total": 3, "available": 1, "reserved": 1, "delivered": 1}
+
+
+def test_cart_batches_validate_their_input(client, login):
+    _, headers = login("volunteer")
+
+    for body in ({}, {"foodIds": []}, {"foodIds": "abc"}, {"foodIds": ["not-an-id"]}):
+        assert client.post("/api/food/cart/reserve", json=body, headers=headers).status_code == 400
+
+    response = client.post("/api/food/cart/deliver", json={"items": [{"foodId": "x"}, 1]}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,122 @@
+import json
+import pytest
+from services.change_feed import ChangeFeed, feed
+from services.food_lifecycle import delete_one, transition_many, transition_one
+from services.sync_service import current_change_seq
+
+
+@pytest.fixture
+def events():
+    reader = ChangeFeed()
+    received = []
+    reader.publish = received.append
+    return reader, received
+
+
+def kinds(received):
+    return [(event["type"], event["_id"]) for event in received]
+
+
+def test_poll_merges_upserts_and_deletes_in_change_order(mock_db, add_food, events):
+    reader, received = events
+    seq = current_change_seq()
+
+    kept, deleted = add_food(), add_food()
+    delete_one({"_id": deleted["_id"]})
+    transition_one({"_id": kept["_id"], "status": "available"}, "reserved", {"reservedBy": "v"})
+
+    reader._poll_once(seq, {})
+
+    # the deleted doc's insert went with the document
+    assert kinds(received) == [("delete", str(deleted["_id"])), ("upsert", str(kept["_id"]))]
+    assert received[0]["donorId"] == "donor-1"
+    assert received[1]["status"] == "reserved"
+
+
+def test_overlapping_polls_publish_each_change_once(mock_db, add_food, events):
+    reader, received = events
+    seq, published = current_change_seq(), {}
+
+    food = add_food()
+    seq, published = reader._poll_once(seq, published)
+    seq, published = reader._poll_once(seq, published)
+    assert kinds(received) == [("upsert", str(food["_id"]))]
+
+    # a new write to the same food is a new change
+    transition_one({"_id": food["_id"], "status": "available"}, "expired")
+    reader._poll_once(seq, published)
+    assert [event["status"] for event in received] == ["available", "expired"]
+
+
+def test_poll_pages_through_one_large_batch(mock_db, add_food, events, monkeypatch):
+    monkeypatch.setattr("services.change_feed.POLL_BATCH", 2)
+    reader, received = events
+    foods = [add_food(expiry_hours=-1) for _ in range(5)]
+    seq = current_change_seq()
+
+    # one update_many, one changeSeq for all five
+    transition_many({"status": "available"}, "expired", limit=10)
+    reader._poll_once(seq, {})
+
+    assert sorted(kinds(received)) == sorted(("upsert", str(f["_id"])) for f in foods)
+
+
+# the route's subscriber is read directly; no reader thread is started
+@pytest.fixture
+def stream(client, monkeypatch):
+    monkeypatch.setattr(feed, "_thread", object())
+
+    def stream(headers, query=""):
+        response = client.get(f"/api/food/stream{query}", headers=headers)
+        chunks = iter(response.response)
+        assert next(chunks) == b"retry: 5000\n\n"
+        return response, chunks
+
+    yield stream
+
+    feed._subscribers.clear()
+
+
+def read_event(chunks):
+    chunk = next(chunks).decode()
+    assert chunk.startswith("event: food\ndata: ")
+    return json.loads(chunk.split("data: ", 1)[1])
+
+
+def test_donors_see_their_own_changes_and_deletes(login, stream, add_food):
+    donor_id, headers = login("donor")
+    response, chunks = stream(headers)
+
+    theirs, other = add_food(donor_id=donor_id), add_food()
+    feed.publish({"type": "upsert", "_id": str(other["_id"]), "donorId": "donor-1"})
+    feed.publish({"type": "upsert", "_id": str(theirs["_id"]), "donorId": donor_id})
+    feed.publish({"type": "delete", "_id": str(theirs["_id"]), "donorId": donor_id, "changeSeq": 9})
+
+    assert read_event(chunks)["_id"] == str(theirs["_id"])
+    assert read_event(chunks) == {
+        "type": "delete", "_id": str(theirs["_id"]), "donorId": donor_id, "changeSeq": 9
+    }
+    response.close()
+
+
+def test_volunteers_get_events_in_their_area_without_other_users_ids(login, stream):
+    _, headers = login("volunteer")
+    response, chunks = stream(headers, "?lat=17.4&lng=78.5&radius=5")
+
+    far = {"type": "upsert", "_id": "far", "donorId": "d", "location": {"lat": 18.4, "lng": 78.5}}
+    near = {**far, "_id": "near", "location": {"lat": 17.41, "lng": 78.5}}
+    feed.publish(far)
+    feed.publish(near)
+
+    assert read_event(chunks) == {"type": "upsert", "_id": "near", "location": near["location"]}
+    response.close()
+
+
+def test_a_dropped_subscriber_is_told_to_resync(login, stream):
+    _, headers = login("volunteer")
+    response, chunks = stream(headers)
+
+    feed._drop_subscribers()
+
+    assert next(chunks) == b"event: resync\ndata: {}\n\n"
+    response.close()
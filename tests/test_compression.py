@@ -0,0 +1,83 @@
+import gzip
+import pytest
+from flask import Flask, Response, jsonify
+from config import Config
+from utils.compression import init_compression
+
+BIG = {"items": [{"foodName": f"rice {i}"} for i in range(200)]}
+
+
+@pytest.fixture
+def app_client():
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route("/big")
+    def big():
+        response = jsonify(BIG)
+        response.set_etag("abc")
+        return response
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/stream")
+    def stream():
+        return Response((b'{"n":%d}' % i for i in range(3)), mimetype="application/json")
+
+    @app.route("/missing")
+    def missing():
+        return jsonify(BIG), 404
+
+    return app.test_client()
+
+
+def jsonify_bytes(app_client, obj):
+    with app_client.application.app_context():
+        return jsonify(obj).get_data()
+
+
+def test_large_json_is_gzipped_and_etag_weakened(app_client):
+    response = app_client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert gzip.decompress(response.data) == jsonify_bytes(app_client, BIG)
+
+
+def test_small_json_goes_out_as_is(app_client):
+    response = app_client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert len(response.data) < Config.COMPRESS_MIN_BYTES
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_streamed_json_is_compressed_chunk_by_chunk(app_client):
+    response = app_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.data) == b'{"n":0}{"n":1}{"n":2}'
+
+
+@pytest.mark.parametrize("path, headers", [
+    ("/big", {"Accept-Encoding": "identity"}),
+    ("/big", {}),
+    ("/missing", {"Accept-Encoding": "gzip"})
+])
+def test_left_alone(app_client, path, headers):
+    response = app_client.get(path, headers=headers)
+
+    assert "Content-Encoding" not in response.headers
+
+
+def test_brotli_is_preferred_when_available(app_client):
+    brotli = pytest.importorskip("brotli")
+
+    response = app_client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.data) == jsonify_bytes(app_client, BIG)
@@ -0,0 +1,80 @@
+from datetime import datetime
+import pytest
+from services.counter_service import PLATFORM, donor_scope, get_counters, reconcile_counters
+from services.expiry_service import check_expired_food
+from services.food_lifecycle import delete_one, reserve_each
+
+
+def reserve(food):
+    changed, _ = reserve_each([food["_id"]], "volunteer-1", datetime.utcnow(), 0)
+    return changed[0] if changed else None
+
+
+def food_counts(scope):
+    counts = get_counters(scope)["foods"]
+    return {status: n for status, n in counts.items() if n}
+
+
+def test_counters_follow_every_lifecycle_step(mock_db, add_food):
+    foods = [add_food() for _ in range(3)] + [add_food(donor_id="donor-2", expiry_hours=-1)]
+
+    reserve(foods[0])
+    check_expired_food()
+    delete_one({"_id": foods[1]["_id"]})
+
+    assert food_counts(PLATFORM) == {"total": 3, "available": 1, "reserved": 1, "expired": 1}
+    assert food_counts(donor_scope("donor-1")) == {"total": 2, "available": 1, "reserved": 1}
+    assert food_counts(donor_scope("donor-2")) == {"total": 1, "expired": 1}
+
+    # the running totals agree with a recount from the documents
+    before = {doc["_id"]: doc.get("foods") for doc in mock_db.counters.find()}
+    reconcile_counters()
+    after = {doc["_id"]: doc.get("foods") for doc in mock_db.counters.find()}
+
+    for scope, foods in after.items():
+        if foods is not None:
+            assert {k: v for k, v in before[scope].items() if v} == foods
+
+
+def test_a_lost_race_counts_once(mock_db, add_food):
+    food = add_food()
+
+    assert reserve(food) is not None
+    assert reserve(food) is None
+
+    assert food_counts(PLATFORM) == {"total": 1, "reserved": 1}
+
+
+def test_stats_routes_read_the_counters(client, login, add_food):
+    donor_id, headers = login("donor")
+    add_food(donor_id=donor_id)
+    add_food(donor_id=donor_id, expiry_hours=-1)
+    check_expired_food()
+
+    assert client.get("/api/food/donor-stats", headers=headers).json == {
+        "total": 2, "delivered": 0, "expired": 1
+    }
+    assert client.get("/api/food/platform/stats", headers=headers).json == {
+        "totalPosted": 2, "totalDelivered": 0, "totalExpired": 1
+    }
+
+
+REGISTRATION = {
+    "name": "A", "email": "a@example.com", "password": "pw", "phone": "1",
+    "address": "Hyderabad", "location": {"lat": 17.4, "lng": 78.5}
+}
+
+
+@pytest.mark.parametrize("role", ["$x", "a.b", "admin"])
+def test_register_rejects_unknown_roles_before_storing(client, mock_db, role):
+    response = client.post("/api/auth/register", json={**REGISTRATION, "role": role})
+
+    assert response.status_code == 400
+    assert mock_db.users.count_documents({}) == 0
+    assert get_counters(PLATFORM)["users"] == {}
+
+
+def test_register_counts_users_by_role(client):
+    assert client.post("/api/auth/register", json={**REGISTRATION, "role": "volunteer"}).status_code == 201
+
+    assert get_counters(PLATFORM)["users"] == {"volunteer": 1}
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from services.expiry_engine import ExpiryEngine
+from services.expiry_service import check_expired_food
+from services.food_lifecycle import transition_one, update_food_fields
+
+
+def reserve(food):
+    return transition_one(
+        {"_id": food["_id"], "status": "available"},
+        "reserved",
+        {"reservedBy": "volunteer-1", "reservedAt": datetime.utcnow()}
+    )
+
+
+def test_expiry_sweep_skips_reserved_and_future_items(mock_db, add_food):
+    overdue = add_food(expiry_hours=-1)
+    held = add_food(expiry_hours=-1)
+    fresh = add_food()
+    reserve(held)
+
+    check_expired_food()
+
+    statuses = {doc["_id"]: doc["status"] for doc in mock_db.foods.find()}
+    assert statuses == {overdue["_id"]: "expired", held["_id"]: "reserved", fresh["_id"]: "available"}
+
+
+def new_engine():
+    return ExpiryEngine(
+        batch_size=100, reseed_seconds=30, horizon_seconds=3600, seed_limit=100, catch_up_seconds=2
+    )
+
+
+def run_once(engine, now):
+    with engine._cond:
+        due = engine._take_due(now)
+    if due:
+        engine._expire(due, now)
+
+
+def test_engine_expires_what_it_seeded(mock_db, add_food):
+    engine = new_engine()
+    food = add_food(expiry_hours=0.5)
+    engine._seed(datetime.utcnow())
+
+    run_once(engine, datetime.utcnow())
+    assert mock_db.foods.find_one({"_id": food["_id"]})["status"] == "available"
+
+    run_once(engine, datetime.utcnow() + timedelta(hours=1))
+    assert mock_db.foods.find_one({"_id": food["_id"]})["status"] == "expired"
+
+
+# schedule() is a no-op outside the leader, so a web process's insert
+# or expiryTime edit only reaches the heap through the catch-up read
+def test_catch_up_picks_up_writes_from_other_processes(mock_db, add_food):
+    engine = new_engine()
+    engine._seed(datetime.utcnow())
+
+    inserted = add_food(expiry_hours=0.5)
+    edited = add_food(expiry_hours=48)
+    update_food_fields({"_id": edited["_id"]}, {"expiryTime": datetime.utcnow() + timedelta(minutes=30)})
+
+    later = datetime.utcnow() + timedelta(hours=1)
+    run_once(engine, later)
+    assert mock_db.foods.count_documents({"status": "expired"}) == 0
+
+    engine._catch_up(datetime.utcnow())
+    run_once(engine, later)
+
+    assert {doc["_id"] for doc in mock_db.foods.find({"status": "expired"})} == {
+        inserted["_id"], edited["_id"]
+    }
+
+
+def test_lateness_is_bounded_by_the_catch_up_interval(mock_db):
+    engine = new_engine()
+    now = datetime.utcnow()
+    engine._seed(now)
+
+    assert engine._next_catch_up - now == timedelta(seconds=2)
+    assert engine._next_seed - now == timedelta(seconds=30)
@@ -0,0 +1,38 @@
+import random
+import pytest
+from utils.geohash import cell_size, cells_covering, count_covering, encode
+
+
+def test_encode_matches_the_reference_geohash():
+    assert encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert encode(17.4, 78.5, 5) == encode(17.4, 78.5, 7)[:5]
+
+
+def test_cell_size_halves_alternately():
+    assert cell_size(1) == (45.0, 45.0)
+    assert cell_size(2) == (45.0 / 8, 45.0 / 4)
+
+
+BOXES = [
+    (17.3, 78.4, 17.5, 78.6),
+    (-0.5, -0.5, 0.5, 0.5),          # straddles the equator and meridian
+    (89.0, 179.0, 90.0, 180.0),      # the grid's last row and column
+    (-90.0, -180.0, -89.0, -179.0)
+]
+
+
+@pytest.mark.parametrize("box", BOXES)
+@pytest.mark.parametrize("precision", [2, 4])
+def test_cells_covering_contains_every_point_in_the_box(box, precision):
+    min_lat, min_lng, max_lat, max_lng = box
+    cells = cells_covering(*box, precision)
+    rng = random.Random(precision)
+
+    points = [(min_lat, min_lng), (max_lat, max_lng)] + [
+        (rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng)) for _ in range(200)
+    ]
+    for lat, lng in points:
+        assert encode(lat, lng, precision) in cells
+
+    assert len(set(cells)) == len(cells)
+    assert count_covering(*box, precision) == len(cells)
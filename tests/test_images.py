@@ -0,0 +1,79 @@
+import base64
+from datetime import datetime, timedelta
+
+
+def food_payload(image):
+    return {
+        "foodName": "rice",
+        "quantity": "5 plates",
+        "foodType": "veg",
+        "itemCategory": "cooked",
+        "expiryTime": (datetime.utcnow() + timedelta(hours=6)).isoformat(),
+        "location": {"lat": 17.4, "lng": 78.5},
+        "address": "Hyderabad",
+        "isSameAsLocation": True,
+        "image": image
+    }
+
+
+def add_with_image(client, headers, image):
+    return client.post("/api/food/add", headers=headers, json=food_payload(image))
+
+
+def test_image_is_stored_by_hash_and_listed_as_urls(client, login, mock_db, blob_store, image_b64):
+    _, headers = login("donor")
+
+    assert add_with_image(client, headers, f"data:image/png;base64,{image_b64}").status_code == 201
+
+    ref = mock_db.foods.find_one()["image"]
+    assert ref["contentType"] == "image/png"
+    assert blob_store.get(ref["hash"])[0] == base64.b64decode(image_b64)
+
+    (food,) = client.get("/api/food/my-foods", headers=headers).json
+    assert food["imageUrl"] == f"/api/food/images/{ref['hash']}"
+    assert food["imageThumbnailUrl"] == f"/api/food/images/{ref['thumbnail']}"
+    assert "image" not in food
+
+
+def test_identical_uploads_share_one_blob(client, login, mock_db, image_b64):
+    _, headers = login("donor")
+    add_with_image(client, headers, image_b64)
+    add_with_image(client, headers, image_b64)
+
+    assert len({doc["image"]["hash"] for doc in mock_db.foods.find()}) == 1
+
+
+def test_image_is_served_cacheable_and_conditional(client, login, mock_db, image_b64):
+    _, headers = login("donor")
+    add_with_image(client, headers, image_b64)
+    ref = mock_db.foods.find_one()["image"]
+    url = f"/api/food/images/{ref['hash']}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == "image/png"
+    assert response.data == base64.b64decode(image_b64)
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    assert client.get(url, headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    partial = client.get(url, headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.data == response.data[:10]
+
+    thumbnail = client.get(f"/api/food/images/{ref['thumbnail']}")
+    assert thumbnail.mimetype == "image/jpeg"
+
+
+def test_unknown_or_malformed_keys_are_404(client):
+    assert client.get(f"/api/food/images/{'0' * 64}").status_code == 404
+    assert client.get("/api/food/images/..%2Fsecret").status_code == 404
+    assert client.get(f"/api/food/images/{'G' * 64}").status_code == 404
+
+
+def test_invalid_image_is_rejected(client, login, mock_db):
+    _, headers = login("donor")
+
+    assert add_with_image(client, headers, "not base64!").status_code == 400
+    assert add_with_image(client, headers, base64.b64encode(b"plain text").decode()).status_code == 400
+    assert mock_db.foods.count_documents({}) == 0
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from services.leaderboard_service import (
+    InvalidWindow, credit_deliveries, leaderboard_page, volunteer_rank, window_period
+)
+
+
+@pytest.fixture
+def volunteers(mock_db):
+    # deliveries: a 3, b 1, c 3, d 0; ObjectIds are increasing, so a
+    # sorts before c on the tie
+    names = {name: str(ObjectId()) for name in "abcd"}
+    mock_db.users.insert_many([
+        {
+            "_id": ObjectId(i), "name": name, "email": f"{name}@example.com",
+            "role": "volunteer", "karmaPoints": 0, "deliveriesCompleted": 0
+        }
+        for name, i in names.items()
+    ])
+
+    for name, count in (("a", 3), ("b", 1), ("c", 3)):
+        credit_deliveries(names[name], count)
+
+    return names
+
+
+def ranks(window, args):
+    items, next_cursor = leaderboard_page(window, args)
+    return [(item["name"], item["rank"]) for item in items], next_cursor
+
+
+@pytest.mark.parametrize("window", ["all", "week", "month"])
+def test_ties_share_a_rank_across_pages(volunteers, window):
+    first, cursor = ranks(window, {"limit": "2"})
+    second, _ = ranks(window, {"limit": "2", "cursor": cursor})
+
+    assert first == [("a", 1), ("c", 1)]
+    # d never delivered, so it has no window document
+    assert second == ([("b", 3), ("d", 4)] if window == "all" else [("b", 3)])
+
+
+def test_volunteer_rank(volunteers):
+    assert volunteer_rank("all", volunteers["c"]) == {
+        "window": "all", "rank": 1, "karmaPoints": 30, "deliveriesCompleted": 3, "total": 4
+    }
+    assert volunteer_rank("week", volunteers["d"])["rank"] == 4
+
+
+def test_credits_land_in_the_window_they_happened_in(mock_db, volunteers):
+    last_week = datetime.utcnow() - timedelta(days=7)
+    credit_deliveries(volunteers["b"], 5, at=last_week)
+
+    key, _, _ = window_period("week", last_week)
+    assert mock_db.karma_windows.find_one({"_id": f"{key}:{volunteers['b']}"})["karmaPoints"] == 50
+    assert volunteer_rank("week", volunteers["b"])["karmaPoints"] == 10
+
+
+def test_window_period_boundaries():
+    key, start, end = window_period("week", datetime(2026, 1, 1, 15))
+    assert (key, start, end) == ("week:2026-W01", datetime(2025, 12, 29), datetime(2026, 1, 5))
+
+    key, start, end = window_period("month", datetime(2026, 12, 31, 23))
+    assert (key, start, end) == ("month:2026-12", datetime(2026, 12, 1), datetime(2027, 1, 1))
+
+
+def test_unknown_window():
+    with pytest.raises(InvalidWindow):
+        leaderboard_page("year", {})
@@ -0,0 +1,69 @@
+from datetime import datetime
+import pytest
+from services.food_lifecycle import transition_one
+from services.map_service import (
+    InvalidMapRequest, get_cells, parse_bbox, precision_for, reconcile_cells
+)
+from utils.geohash import encode
+
+HYDERABAD = "78.3,17.3,78.6,17.5"
+
+
+def cells(precision=4):
+    found, items = get_cells(HYDERABAD, precision * 2)
+    assert found == precision
+    return {item["cell"]: item for item in items}
+
+
+def test_cells_count_available_food_with_centroids(mock_db, add_food):
+    add_food(lat=17.45, lng=78.45)
+    add_food(lat=17.46, lng=78.46, itemCategory="packed")
+    add_food(lat=17.35, lng=78.35)
+
+    by_cell = cells()
+    here = by_cell[encode(17.45, 78.45, 4)]
+
+    assert sum(item["count"] for item in by_cell.values()) == 3
+    assert here["count"] == 2
+    assert here["centroid"] == pytest.approx({"lat": 17.455, "lng": 78.455})
+    assert here["itemCategory"] == {"cooked": 1, "packed": 1}
+
+
+def test_food_leaves_and_rejoins_its_cells(mock_db, add_food):
+    food = add_food()
+
+    transition_one({"_id": food["_id"], "status": "available"}, "reserved", {"reservedAt": datetime.utcnow()})
+    assert cells() == {}
+
+    transition_one({"_id": food["_id"], "status": "reserved"}, "available")
+    assert [item["count"] for item in cells().values()] == [1]
+
+
+def test_reconcile_rebuilds_the_same_cells_and_backfills_geohash(mock_db, add_food):
+    for i in range(5):
+        add_food(lat=17.3 + i * 0.04, lng=78.4 + i * 0.04)
+    mock_db.foods.update_one({}, {"$unset": {"geohash": ""}})
+    kept = {doc["_id"]: doc for doc in mock_db.map_cells.find()}
+
+    reconcile_cells()
+
+    assert mock_db.foods.count_documents({"geohash": {"$exists": False}}) == 0
+    for doc in mock_db.map_cells.find():
+        assert doc["count"] == kept[doc["_id"]]["count"]
+        assert doc["sumLat"] == pytest.approx(kept[doc["_id"]]["sumLat"])
+
+
+def test_precision_coarsens_until_the_box_fits(monkeypatch):
+    box = parse_bbox("78.50,17.40,78.51,17.41")
+
+    assert precision_for(12, box) == 6
+    assert precision_for(4, box) == 2
+
+    monkeypatch.setattr("config.Config.MAP_MAX_CELLS", 4)
+    assert precision_for(12, box) == 5
+
+
+@pytest.mark.parametrize("bbox", ["1,2,3", "a,b,c,d", "78.6,17.3,78.3,17.5", "0,-91,1,1"])
+def test_invalid_bbox(bbox):
+    with pytest.raises(InvalidMapRequest):
+        parse_bbox(bbox)
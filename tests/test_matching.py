@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from services.matching_service import parse_quantity, score_candidates
+
+NOW = datetime(2026, 1, 1, 12)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (3, 3.0), (2.5, 2.5), ("12 plates", 12.0), (" 1.5kg", 1.5), ("some", 1.0), (None, 1.0)
+])
+def test_parse_quantity(value, expected):
+    assert parse_quantity(value) == expected
+
+
+def food(hours_left, distance_km, category="cooked", quantity="5"):
+    return {
+        "expiryTime": NOW + timedelta(hours=hours_left),
+        "distanceKm": distance_km,
+        "itemCategory": category,
+        "quantity": quantity
+    }
+
+
+def test_no_candidates():
+    scores, reachable = score_candidates([], 10, NOW)
+
+    assert len(scores) == 0 and len(reachable) == 0
+
+
+def test_each_term_moves_the_score_the_right_way():
+    foods = [
+        food(6, 2),
+        food(1, 2),                 # more urgent
+        food(6, 8),                 # further
+        food(6, 2, "packed"),       # keeps longer
+        food(6, 2, quantity="50")   # more of it
+    ]
+
+    scores, reachable = score_candidates(foods, 10, NOW)
+
+    assert reachable.all()
+    assert scores[1] > scores[0]
+    assert scores[2] < scores[0]
+    assert scores[3] < scores[0]
+    assert scores[4] > scores[0]
+    assert np.all((0 <= scores) & (scores <= 1))
+
+
+def test_items_that_expire_before_arrival_are_unreachable():
+    # 20 km/h: 8 km takes 24 minutes
+    scores, reachable = score_candidates([food(0.5, 8), food(0.3, 8), food(-1, 1)], 10, NOW)
+
+    assert reachable.tolist() == [True, False, False]
@@ -0,0 +1,69 @@
+import logging
+import time
+from types import SimpleNamespace
+import bson
+import pytest
+from flask import jsonify
+from prometheus_client import REGISTRY
+from config import Config
+from utils.metrics import CommandMetrics
+
+REPLY = {"cursor": {"firstBatch": [{"_id": 1, "foodName": "rice"}] * 3, "id": 0}, "ok": 1}
+
+
+# mongomock emits no command events, so the listener is fed by hand
+def run_command(listener, reply, request_id=1):
+    listener.started(SimpleNamespace(
+        request_id=request_id, command_name="find", command={"find": "foods"}
+    ))
+    listener.succeeded(SimpleNamespace(
+        request_id=request_id, command_name="find", reply=reply, duration_micros=2500
+    ))
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.parametrize("rate, measured", [(0.0, 0), (1.0, 1)])
+def test_reply_sizes_are_sampled(monkeypatch, rate, measured):
+    monkeypatch.setattr(Config, "MONGO_REPLY_SAMPLE_RATE", rate)
+    labels = {"collection": "foods", "command": "find", "route": "background"}
+    count = sample("mongodb_reply_size_bytes_count", **labels)
+    total = sample("mongodb_reply_size_bytes_sum", **labels)
+    documents = sample("mongodb_documents_returned_total", **labels)
+
+    run_command(CommandMetrics(), REPLY)
+
+    assert sample("mongodb_reply_size_bytes_count", **labels) - count == measured
+    assert sample("mongodb_reply_size_bytes_sum", **labels) - total == measured * len(bson.encode(REPLY))
+    # latency and document counts are recorded for every command
+    assert sample("mongodb_documents_returned_total", **labels) - documents == 3
+
+
+def test_slow_requests_log_each_commands_reply_size(client, monkeypatch, caplog):
+    monkeypatch.setattr(Config, "SLOW_REQUEST_MS", 1)
+    monkeypatch.setattr(Config, "MONGO_REPLY_SAMPLE_RATE", 0.0)
+
+    def slow_view():
+        run_command(CommandMetrics(), REPLY)
+        time.sleep(0.01)
+        return jsonify({})
+
+    monkeypatch.setitem(client.application.view_functions, "food.public_stats", slow_view)
+
+    with caplog.at_level(logging.WARNING, "utils.metrics"):
+        assert client.get("/api/food/public/stats").status_code == 200
+
+    assert "Slow request GET /api/food/public/stats" in caplog.text
+    assert f"find foods 2.5 ms 3 docs {len(bson.encode(REPLY))} bytes" in caplog.text
+
+
+def test_metrics_endpoint_reports_requests_by_route(client):
+    client.get("/api/food/public/stats")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert 'route="/api/food/public/stats"' in response.get_data(as_text=True)
@@ -0,0 +1,87 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+
+NOW = datetime.utcnow()
+
+
+# mongomock has no $geoNear: record the pipeline the route builds and
+# answer with what the server would return for it
+@pytest.fixture
+def geo_near(mock_db, monkeypatch):
+    pipelines = []
+    results = []
+
+    def aggregate(pipeline, *args, **kwargs):
+        pipelines.append(pipeline)
+        return iter(results.pop(0))
+
+    monkeypatch.setattr(mock_db.foods, "aggregate", aggregate)
+    return pipelines, results
+
+
+def nearby_doc(distance_km):
+    return {"_id": ObjectId(), "foodName": "rice", "distanceKm": distance_km, "expiryTime": NOW}
+
+
+@pytest.mark.parametrize("query", [
+    "lat=17.4", "lat=91&lng=78.5", "lat=17.4&lng=78.5&radius=0", "lat=17.4&lng=78.5&radius=1000",
+    "lat=17.4&lng=78.5&radius=far"
+])
+def test_invalid_area(client, login, query):
+    _, headers = login("volunteer")
+
+    assert client.get(f"/api/food/available?{query}", headers=headers).status_code == 400
+
+
+def test_nearby_pages_by_distance(client, login, geo_near):
+    pipelines, results = geo_near
+    _, headers = login("volunteer")
+    docs = [nearby_doc(0.5), nearby_doc(1.2), nearby_doc(2.0)]
+    results.append(docs)
+
+    first = client.get("/api/food/available?lat=17.4&lng=78.5&radius=5&limit=2", headers=headers).json
+
+    geo = pipelines[0][0]["$geoNear"]
+    assert geo["near"] == {"type": "Point", "coordinates": [78.5, 17.4]}
+    assert geo["maxDistance"] == 5000
+    assert geo["query"] == {"status": "available"}
+    assert pipelines[0][-2] == {"$limit": 3}
+
+    assert [item["_id"] for item in first["items"]] == [str(d["_id"]) for d in docs[:2]]
+    assert first["items"][0]["distanceKm"] == 0.5
+    # the default projection leaves expiryTime in, it is shown
+    assert "expiryTime" in first["items"][0]
+
+    results.append([docs[2]])
+    second = client.get(
+        f"/api/food/available?lat=17.4&lng=78.5&radius=5&limit=2&cursor={first['next_cursor']}",
+        headers=headers
+    ).json
+
+    geo = pipelines[1][0]["$geoNear"]
+    assert geo["minDistance"] == pytest.approx(1200 - 1)
+    assert pipelines[1][1]["$match"]["$or"][0] == {"distanceKm": {"$gt": 1.2}}
+    assert [item["_id"] for item in second["items"]] == [str(docs[2]["_id"])]
+    assert second["next_cursor"] is None
+
+
+def test_unpaged_nearby_is_a_bare_array(client, login, geo_near):
+    pipelines, results = geo_near
+    _, headers = login("donor")
+    results.append([nearby_doc(0.5)])
+
+    response = client.get("/api/food/available?lat=17.4&lng=78.5", headers=headers)
+
+    assert [item["distanceKm"] for item in response.json] == [0.5]
+    assert not any("$limit" in stage for stage in pipelines[0])
+
+
+def test_without_an_area_soonest_expiry_comes_first(client, login, add_food):
+    _, headers = login("volunteer")
+    later, sooner = add_food(expiry_hours=5), add_food(expiry_hours=1)
+
+    items = client.get("/api/food/available?limit=10", headers=headers).json["items"]
+
+    assert [item["_id"] for item in items] == [str(sooner["_id"]), str(later["_id"])]
+    assert items[0]["location"] == {"lat": 17.4, "lng": 78.5}
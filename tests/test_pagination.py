@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from utils.pagination import (
+    InvalidPageRequest, after_cursor, decode_cursor, encode_cursor, find_page,
+    hidden_sort_fields, is_unpaged, keyset_filter, page_result, parse_page_args, sort_key
+)
+
+SORT = [("expiryTime", 1), ("_id", 1)]
+NOW = datetime(2026, 1, 1, 12)
+
+
+def test_cursor_round_trips_datetimes_and_object_ids():
+    doc = {"_id": ObjectId(), "expiryTime": NOW, "foodName": "rice"}
+
+    assert decode_cursor(encode_cursor(doc, SORT), SORT) == [NOW, doc["_id"]]
+
+
+@pytest.mark.parametrize("token", ["not-base64!", "bnVsbA", encode_cursor({"_id": 1}, [("_id", 1)])])
+def test_decode_cursor_rejects_garbage_and_wrong_length(token):
+    with pytest.raises(InvalidPageRequest):
+        decode_cursor(token, SORT)
+
+
+def test_parse_page_args_caps_and_validates_limit():
+    assert parse_page_args({}) == (20, None)
+    assert parse_page_args({"limit": "5000", "cursor": "c"}) == (1000, "c")
+
+    for limit in ("0", "-1", "ten"):
+        with pytest.raises(InvalidPageRequest):
+            parse_page_args({"limit": limit})
+
+
+def test_is_unpaged_only_without_limit_and_cursor():
+    assert is_unpaged({})
+    assert is_unpaged({"fields": "foodName"})
+    assert not is_unpaged({"limit": "10"})
+    assert not is_unpaged({"cursor": "abc"})
+
+
+def test_hidden_sort_fields_are_the_ones_the_projection_left_out():
+    assert hidden_sort_fields({"_id": 1, "foodName": 1}, SORT) == ("expiryTime",)
+    assert hidden_sort_fields({"expiryTime": 1}, SORT) == ("_id",)
+    assert hidden_sort_fields(None, SORT) == ()
+
+
+def test_keyset_filter_is_lexicographic():
+    food_id = ObjectId()
+
+    assert keyset_filter([("reservedAt", -1), ("_id", -1)], [NOW, food_id]) == {"$or": [
+        {"reservedAt": {"$lt": NOW}},
+        {"reservedAt": NOW, "_id": {"$lt": food_id}}
+    ]}
+
+
+def test_after_cursor_folds_query_into_each_branch():
+    food_id = ObjectId()
+
+    assert after_cursor({"status": "available"}, SORT, [NOW, food_id]) == {"$or": [
+        {"status": "available", "expiryTime": {"$gt": NOW}},
+        {"status": "available", "expiryTime": NOW, "_id": {"$gt": food_id}}
+    ]}
+
+
+def test_after_cursor_keeps_a_query_on_a_sort_field_separate():
+    query = {"expiryTime": {"$lte": NOW}}
+    values = [NOW, ObjectId()]
+
+    assert after_cursor(query, SORT, values) == {
+        "$and": [query, keyset_filter(SORT, values)]
+    }
+
+
+def test_page_result_trims_the_lookahead_doc_into_a_cursor():
+    docs = [{"_id": i, "expiryTime": NOW} for i in range(3)]
+
+    page, next_cursor = page_result(docs, SORT, 2)
+
+    assert page == docs[:2]
+    assert decode_cursor(next_cursor, SORT) == [NOW, 1]
+    assert page_result(docs, SORT, 3) == (docs, None)
+
+
+def test_sort_key_orders_missing_and_null_first_like_mongo():
+    docs = [
+        {"_id": 3, "expiryTime": NOW},
+        {"_id": 2},
+        {"_id": 1, "expiryTime": None},
+        {"_id": 4, "expiryTime": 5}
+    ]
+
+    assert [d["_id"] for d in sorted(docs, key=sort_key(SORT))] == [1, 2, 4, 3]
+    assert [d["_id"] for d in sorted(docs, key=sort_key([("_id", -1)]))] == [4, 3, 2, 1]
+
+
+# every _id, page by page, following next cursors
+def walk(find, sort, limit):
+    ids, cursor = [], None
+
+    while True:
+        args = {"limit": str(limit), **({"cursor": cursor} if cursor else {})}
+        docs, page_limit = find(args)
+        docs, cursor = page_result(list(docs), sort, page_limit)
+        ids += [doc["_id"] for doc in docs]
+
+        if cursor is None:
+            return ids
+
+
+def test_find_page_walks_ties_without_gaps_or_repeats(mock_db):
+    # several docs share each expiryTime, so only _id tells them apart
+    docs = [{"_id": ObjectId(), "expiryTime": NOW + timedelta(hours=i % 3)} for i in range(10)]
+    mock_db.foods.insert_many(docs)
+
+    expected = [d["_id"] for d in sorted(docs, key=sort_key(SORT))]
+
+    def find(args):
+        return find_page(mock_db.foods, {}, None, SORT, args)
+
+    assert walk(find, SORT, 3) == expected
+
+
+def test_find_page_whole_list_returns_every_doc_unpaged(mock_db):
+    mock_db.foods.insert_many([{"expiryTime": NOW} for _ in range(30)])
+
+    docs, limit = find_page(mock_db.foods, {}, None, SORT, {}, whole_list=True)
+
+    assert limit is None
+    assert len(list(docs)) == 30
+
+
+def test_my_foods_pages_newest_first(client, login, add_food):
+    donor_id, headers = login("donor")
+    foods = [add_food(donor_id=donor_id) for _ in range(5)]
+    add_food(donor_id="someone-else")
+
+    ids, cursor = [], None
+    while True:
+        query = f"limit=2&cursor={cursor}" if cursor else "limit=2"
+        page = client.get(f"/api/food/my-foods?{query}", headers=headers).json
+        ids += [item["_id"] for item in page["items"]]
+        # createdAt is a sort field the default projection leaves out
+        assert all("createdAt" not in item for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert ids == [str(food["_id"]) for food in reversed(foods)]
+
+
+def test_list_endpoints_reject_bad_page_args(client, login):
+    _, headers = login("donor")
+
+    assert client.get("/api/food/my-foods?limit=0", headers=headers).status_code == 400
+    assert client.get("/api/food/my-foods?cursor=garbage", headers=headers).status_code == 400
+
+
+def test_unpaged_request_keeps_the_bare_array(client, login, add_food):
+    donor_id, headers = login("donor")
+    for _ in range(25):
+        add_food(donor_id=donor_id)
+
+    response = client.get("/api/food/my-foods", headers=headers)
+
+    assert isinstance(response.json, list)
+    assert len(response.json) == 25
@@ -0,0 +1,76 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from werkzeug.security import generate_password_hash
+from config import Config
+from services import password_service
+from services.password_service import hash_password, needs_rehash, verify_password
+
+
+class InlineExecutor:
+    def __init__(self, broken=False, **kwargs):
+        self.broken = broken
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        if self.broken:
+            raise BrokenProcessPool("a worker died")
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, **kwargs):
+        self.shut_down = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(password_service, "ProcessPoolExecutor", InlineExecutor)
+    monkeypatch.setattr(password_service, "_executor", None)
+
+
+def test_a_broken_pool_is_replaced_and_the_call_retried(pool, monkeypatch):
+    broken = InlineExecutor(broken=True)
+    monkeypatch.setattr(password_service, "_executor", broken)
+
+    assert verify_password(generate_password_hash("pw"), "pw")
+
+    assert broken.shut_down
+    assert password_service._executor is not broken
+
+
+def test_the_retry_happens_once(pool, monkeypatch):
+    monkeypatch.setattr(
+        password_service, "ProcessPoolExecutor", lambda **kwargs: InlineExecutor(broken=True)
+    )
+
+    with pytest.raises(BrokenProcessPool):
+        hash_password("pw")
+
+    # the slot is given back either way
+    assert password_service._slots.acquire(blocking=False)
+    password_service._slots.release()
+
+
+def test_login_rehashes_an_outdated_hash(client, mock_db):
+    old = generate_password_hash("pw", "pbkdf2:sha256:1000")
+    mock_db.users.insert_one({"email": "a@example.com", "password": old, "role": "donor", "name": "A"})
+    assert needs_rehash(old)
+
+    response = client.post("/api/auth/login", json={"email": "a@example.com", "password": "pw"})
+
+    assert response.status_code == 200
+    stored = mock_db.users.find_one({"email": "a@example.com"})["password"]
+    assert stored != old and not needs_rehash(stored)
+    assert verify_password(stored, "pw")
+
+
+def test_login_rejects_a_wrong_password_without_rehashing(client, mock_db):
+    old = generate_password_hash("pw", "pbkdf2:sha256:1000")
+    mock_db.users.insert_one({"email": "a@example.com", "password": old, "role": "donor", "name": "A"})
+
+    response = client.post("/api/auth/login", json={"email": "a@example.com", "password": "nope"})
+
+    assert response.status_code == 401
+    assert mock_db.users.find_one({"email": "a@example.com"})["password"] == old
@@ -0,0 +1,44 @@
+import pytest
+from services.image_service import store_base64_image
+from utils.projection import VIEWS, InvalidFields, projection_for
+
+
+def test_default_fieldset_always_includes_id():
+    projection = projection_for("available", "volunteer", {})
+
+    assert projection == {"_id": 1, **{field: 1 for field in VIEWS["available"]["default"]}}
+
+
+def test_requested_fields_are_trimmed():
+    assert projection_for("my-foods", "donor", {"fields": " foodName, status,"}) == {
+        "_id": 1, "foodName": 1, "status": 1
+    }
+
+
+def test_fields_are_checked_against_the_role():
+    assert projection_for("public-deliveries", None, {"fields": "foodName"}) == {
+        "_id": 1, "foodName": 1
+    }
+
+    with pytest.raises(InvalidFields, match="Invalid fields: donorId"):
+        projection_for("available", "volunteer", {"fields": "foodName,donorId"})
+
+    # donor-only fields are not on the volunteer's list
+    with pytest.raises(InvalidFields):
+        projection_for("my-foods", "volunteer", {"fields": "foodName"})
+
+
+def test_empty_fields_are_rejected():
+    with pytest.raises(InvalidFields):
+        projection_for("available", "donor", {"fields": " , "})
+
+
+def test_list_routes_return_only_the_requested_fields(client, login, add_food, image_b64):
+    donor_id, headers = login("donor")
+    add_food(donor_id=donor_id, image=store_base64_image(image_b64))
+
+    items = client.get("/api/food/my-foods?limit=5&fields=foodName,image", headers=headers).json["items"]
+
+    # the image comes back as URLs, never the stored key
+    assert set(items[0]) == {"_id", "foodName", "imageUrl", "imageThumbnailUrl"}
+    assert client.get("/api/food/my-foods?fields=donorId", headers=headers).status_code == 400
@@ -0,0 +1,231 @@
+# Runs explain() on the query shape of every route and fails on any
+# collection scan. Filters, sorts and pipelines come from the builders
+# the routes and services use, so the shapes follow the code.
+#
+# Needs a real MongoDB (mongomock has no planner):
+#
+#   TEST_MONGO_URI=mongodb://localhost:27017 python -m pytest -q
+#
+# Without it these tests skip and the index claims go unchecked (the
+# run's header says so). TEST_MONGO_REQUIRED=true, for CI jobs that
+# provide a mongod, turns the missing URI into a failure instead.
+#
+# Collections are created in a throwaway database that is dropped after.
+import os
+from datetime import datetime, timedelta
+import pytest
+
+pymongo = pytest.importorskip("pymongo")
+
+from bson import ObjectId
+from utils.indexes import ensure_indexes
+from utils.pagination import after_cursor
+from routes.food_routes import (
+    AVAILABLE, AVAILABLE_SORT, CART_SORT, DELIVERED, DELIVERIES_SORT, DONORS,
+    MY_FOODS_SORT, NO_LONGER_AVAILABLE, VOLUNTEERS, VOLUNTEERS_SORT, cart_query,
+    delivered_by, nearby_pipeline
+)
+from services.archive_service import TERMINAL, archivable
+from services.change_feed import POLL_SORT, poll_query
+from services.counter_service import PLATFORM, donor_scope
+from services.expiry_engine import DUE_ORDER, due_by
+from services.leaderboard_service import BOARD_SORT, ahead_of, board
+from services.map_service import cells_query
+from services.matching_service import candidate_pipeline
+from services.reservation_service import stale_query
+from services.rollup_service import ORDER as ROLLUP_ORDER, series_query
+from services.sync_service import changed_since, tombstones_since
+
+TEST_MONGO_URI = os.getenv("TEST_MONGO_URI")
+
+if not TEST_MONGO_URI and os.getenv("TEST_MONGO_REQUIRED", "false").lower() == "true":
+    pytest.fail("TEST_MONGO_REQUIRED is set but TEST_MONGO_URI is not", pytrace=False)
+
+pytestmark = pytest.mark.skipif(
+    not TEST_MONGO_URI, reason="query plans not verified: TEST_MONGO_URI not set"
+)
+
+DONOR_ID = str(ObjectId())
+VOLUNTEER_ID = str(ObjectId())
+NOW = datetime.utcnow()
+POINT = {"type": "Point", "coordinates": [78.5, 17.4]}
+
+
+@pytest.fixture(scope="module")
+def db():
+    client = pymongo.MongoClient(TEST_MONGO_URI, serverSelectionTimeoutMS=2000)
+    name = f"zero_hunger_plans_{ObjectId()}"
+    database = client[name]
+
+    # a few documents so the planner has something to choose between
+    database.foods.insert_many([
+        {
+            "donorId": DONOR_ID,
+            "status": status,
+            "reservedBy": VOLUNTEER_ID,
+            "createdAt": NOW,
+            "expiryTime": NOW,
+            "reservedAt": NOW,
+            "deliveredAt": NOW,
+            "location": POINT
+        }
+        for status in ("available", "reserved", "picked", "delivered", "expired")
+    ])
+    database.users.insert_many([
+        {"email": f"{role}@example.com", "role": role, "createdAt": NOW, "location": POINT}
+        for role in ("donor", "volunteer")
+    ])
+    database.counters.insert_one({"_id": "platform"})
+    week = board("week")[1]["window"]
+    database.karma_windows.insert_one(
+        {"_id": f"{week}:{VOLUNTEER_ID}", "window": week, "karmaPoints": 10}
+    )
+    ensure_indexes(database)
+
+    yield database
+
+    client.drop_database(name)
+    client.close()
+
+
+def find_shape(collection, query, sort=None):
+    return {"find": collection, "filter": query, "sort": dict(sort or [])}
+
+
+def count_shape(collection, query):
+    # count_documents() is an aggregate of $match + $group
+    return {
+        "aggregate": collection,
+        "pipeline": [{"$match": query}, {"$group": {"_id": 1, "n": {"$sum": 1}}}],
+        "cursor": {}
+    }
+
+
+def aggregate_shape(collection, pipeline):
+    return {"aggregate": collection, "pipeline": pipeline, "cursor": {}}
+
+
+def page_shape(collection, query, sort):
+    # second page of a cursor-paginated listing
+    values = [NOW if field != "_id" else ObjectId() for field, _ in sort]
+    return find_shape(collection, after_cursor(query, sort, values), sort)
+
+
+ORIGIN = (17.4, 78.5)
+BOX = (17.3, 78.4, 17.5, 78.6)
+
+FOOD_SHAPES = {
+    "my_foods": find_shape("foods", {"donorId": DONOR_ID}, MY_FOODS_SORT),
+    "my_foods_page": page_shape("foods", {"donorId": DONOR_ID}, MY_FOODS_SORT),
+    "update_food": find_shape(
+        "foods", {"_id": ObjectId(), "donorId": DONOR_ID}
+    ),
+    "donor_stats": find_shape("counters", {"_id": donor_scope(DONOR_ID)}),
+    "available": find_shape("foods", AVAILABLE, AVAILABLE_SORT),
+    "available_page": page_shape("foods", AVAILABLE, AVAILABLE_SORT),
+    "available_nearby": aggregate_shape(
+        "foods", nearby_pipeline(ORIGIN, 10, {"foodName": 1}, 20)
+    ),
+    "available_nearby_page": aggregate_shape(
+        "foods", nearby_pipeline(ORIGIN, 10, {"foodName": 1}, 20, [1.5, NOW, ObjectId()])
+    ),
+    "available_ranked_candidates": aggregate_shape(
+        "foods", candidate_pipeline(ORIGIN, 10, {"foodName": 1}, NOW)
+    ),
+    "available_since": find_shape(
+        "foods", changed_since(AVAILABLE, 10), [("changeSeq", 1)]
+    ),
+    "available_since_removed": find_shape(
+        "foods", changed_since(NO_LONGER_AVAILABLE, 10)
+    ),
+    "sync_tombstones": find_shape(
+        "food_tombstones", tombstones_since(["all", f"cart:{VOLUNTEER_ID}"], 10)
+    ),
+    "reserve_food": find_shape(
+        "foods", {"_id": ObjectId(), "status": "available"}
+    ),
+    "stale_reservations": find_shape("foods", stale_query(NOW)),
+    "my_cart": find_shape("foods", cart_query(VOLUNTEER_ID), CART_SORT),
+    "my_cart_since": find_shape(
+        "foods", changed_since(cart_query(VOLUNTEER_ID), 10), [("changeSeq", 1)]
+    ),
+    "volunteer_profile_count": count_shape("foods", delivered_by(VOLUNTEER_ID)),
+    "volunteer_deliveries": find_shape(
+        "foods", delivered_by(VOLUNTEER_ID), DELIVERIES_SORT
+    ),
+    "platform_stats": find_shape("counters", {"_id": PLATFORM}),
+    "public_deliveries": find_shape("foods", DELIVERED, [("deliveredAt", -1)]),
+    "expiry_job": find_shape("foods", due_by(NOW)),
+    "expiry_seed": find_shape("foods", due_by(NOW), DUE_ORDER),
+    "expiry_catch_up": find_shape("foods", changed_since(due_by(NOW), 10)),
+    "change_feed_poll": find_shape("foods", poll_query(10), POLL_SORT),
+    "change_feed_poll_page": find_shape("foods", poll_query(10, [12, ObjectId()]), POLL_SORT),
+    "change_feed_poll_deletes": find_shape(
+        "food_tombstones", tombstones_since(["all"], 10), [("seq", 1)]
+    ),
+    "rollup_job": find_shape("foods", changed_since({}, 10), ROLLUP_ORDER),
+    "rollup_job_page": find_shape(
+        "foods", after_cursor({}, ROLLUP_ORDER, [10, ObjectId()]), ROLLUP_ORDER
+    ),
+    "rollup_series": find_shape(
+        "daily_rollups", series_query(PLATFORM, NOW - timedelta(days=29), NOW)
+    ),
+    "map_cells": find_shape("map_cells", cells_query(BOX, 5)),
+    "transition_many_guarded": find_shape(
+        "foods", {"_id": ObjectId(), **due_by(NOW)}
+    ),
+}
+
+AUTH_SHAPES = {
+    "login": find_shape("users", {"email": "donor@example.com"}),
+    "volunteer_profile": find_shape("users", {"_id": ObjectId()}),
+    "public_donors": find_shape("users", DONORS, [("createdAt", -1)]),
+    "public_volunteers": find_shape("users", VOLUNTEERS, VOLUNTEERS_SORT),
+}
+
+
+def board_shapes(window):
+    collection, query = board(window)
+    return {
+        f"leaderboard_{window}": find_shape(collection.name, query, BOARD_SORT),
+        f"leaderboard_{window}_rank": count_shape(collection.name, ahead_of(query, 10)),
+    }
+
+
+LEADERBOARD_SHAPES = {**board_shapes("all"), **board_shapes("week")}
+
+ARCHIVE_SHAPES = {
+    **{
+        f"archive_{status}": find_shape("foods", archivable(status, NOW))
+        for status in TERMINAL
+    },
+    "my_foods_archived_page": page_shape(
+        "foods_archive", {"donorId": DONOR_ID}, MY_FOODS_SORT
+    ),
+    "volunteer_deliveries_archived": find_shape(
+        "foods_archive", delivered_by(VOLUNTEER_ID), DELIVERIES_SORT
+    ),
+    "rollup_archive_rebuild": find_shape(
+        "foods_archive", changed_since({}, 10), ROLLUP_ORDER
+    ),
+}
+
+ALL_SHAPES = {**FOOD_SHAPES, **AUTH_SHAPES, **LEADERBOARD_SHAPES, **ARCHIVE_SHAPES}
+
+
+def stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from stages(value)
+
+
+@pytest.mark.parametrize("shape", list(ALL_SHAPES.values()), ids=list(ALL_SHAPES))
+def test_route_query_uses_an_index(db, shape):
+    plan = db.command("explain", shape, verbosity="queryPlanner")
+
+    assert "COLLSCAN" not in set(stages(plan))
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+import pytest
+from config import Config
+from services.counter_service import claim_holds, reconcile_counters, volunteer_scope
+from services.food_lifecycle import reserve_each
+from services.reservation_service import release_stale_reservations
+
+
+@pytest.fixture
+def cap(monkeypatch):
+    monkeypatch.setattr(Config, "MAX_ACTIVE_RESERVATIONS", 2)
+    return 2
+
+
+def held(mock_db, volunteer_id):
+    return (mock_db.counters.find_one({"_id": volunteer_scope(volunteer_id)}) or {}).get("held", 0)
+
+
+def test_claims_never_take_a_volunteer_past_the_cap(mock_db):
+    assert claim_holds("volunteer-1", 1, 3) == 1
+    assert claim_holds("volunteer-1", 5, 3) == 2
+    assert claim_holds("volunteer-1", 1, 3) == 0
+    assert held(mock_db, "volunteer-1") == 3
+
+
+def test_a_claim_retries_when_the_count_moved_under_it(mock_db, monkeypatch):
+    claim_holds("volunteer-1", 1, 3)
+    find_one = mock_db.counters.find_one
+
+    # another request takes a slot between our read and our $inc
+    def stale_read(*args, **kwargs):
+        doc = find_one(*args, **kwargs)
+        monkeypatch.setattr(mock_db.counters, "find_one", find_one)
+        mock_db.counters.update_one({"_id": doc["_id"]}, {"$inc": {"held": 1}})
+        return doc
+
+    monkeypatch.setattr(mock_db.counters, "find_one", stale_read)
+
+    assert claim_holds("volunteer-1", 2, 3) == 1
+    assert held(mock_db, "volunteer-1") == 3
+
+
+def test_reserve_route_enforces_the_cap(client, login, add_food, mock_db, cap):
+    volunteer_id, headers = login("volunteer")
+    foods = [add_food() for _ in range(3)]
+
+    codes = [client.post(f"/api/food/reserve/{f['_id']}", headers=headers).status_code for f in foods]
+
+    assert codes == [200, 200, 400]
+    assert held(mock_db, volunteer_id) == 2
+    assert mock_db.foods.count_documents({"status": "reserved"}) == 2
+
+
+def test_a_lost_race_gives_its_slot_back(client, login, add_food, mock_db, cap):
+    volunteer_id, headers = login("volunteer")
+    taken, free, spare = add_food(), add_food(), add_food()
+    reserve_each([taken["_id"]], "volunteer-2", datetime.utcnow(), cap)
+
+    ids = [str(taken["_id"]), str(free["_id"]), str(spare["_id"])]
+    response = client.post("/api/food/cart/reserve", json={"foodIds": ids}, headers=headers)
+
+    assert response.json == {"succeeded": [ids[1]], "failed": [ids[0]], "overLimit": [ids[2]]}
+    assert held(mock_db, volunteer_id) == 1
+
+
+def test_every_way_out_of_reserved_frees_the_slot(client, login, add_food, mock_db, cap):
+    volunteer_id, headers = login("volunteer")
+    donor_id, donor_headers = login("donor")
+
+    # pick, unreserve, donor delete, stale release
+    for path in ("pick", "unreserve", "delete", "stale"):
+        food = add_food(donor_id=donor_id)
+        reserved_at = datetime.utcnow()
+        if path == "stale":
+            reserved_at -= timedelta(minutes=Config.RESERVATION_HOLD_MINUTES + 1)
+        reserve_each([food["_id"]], volunteer_id, reserved_at, cap)
+        assert held(mock_db, volunteer_id) == 1
+
+        if path == "delete":
+            response = client.delete(f"/api/food/delete/{food['_id']}", headers=donor_headers)
+        elif path == "stale":
+            assert release_stale_reservations() == 1
+            response = None
+        else:
+            response = client.post(f"/api/food/{path}/{food['_id']}", headers=headers)
+
+        assert response is None or response.status_code == 200
+        assert held(mock_db, volunteer_id) == 0, path
+
+
+def test_reconcile_rebuilds_held_counts(mock_db, add_food, cap):
+    reserve_each([add_food()["_id"], add_food()["_id"]], "volunteer-1", datetime.utcnow(), cap)
+    mock_db.counters.update_one({"_id": volunteer_scope("volunteer-1")}, {"$set": {"held": 7}})
+
+    reconcile_counters()
+
+    assert held(mock_db, "volunteer-1") == 2
@@ -0,0 +1,106 @@
+import pytest
+from flask import Flask, jsonify
+from config import Config
+from utils.response_cache import Entry, ResponseCache, cached
+
+
+def entry(tags, expires_at=float("inf")):
+    return Entry(b"{}", "etag", "application/json", expires_at, frozenset(tags))
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = ResponseCache(2)
+    for key in "ab":
+        cache.put(key, entry({"foods"}), cache.generation({"foods"}))
+
+    cache.get("a")
+    cache.put("c", entry({"foods"}), cache.generation({"foods"}))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+
+def test_expired_entries_are_dropped():
+    cache = ResponseCache(2)
+    cache.put("a", entry({"foods"}, expires_at=0), cache.generation({"foods"}))
+
+    assert cache.get("a") is None
+
+
+def test_invalidate_drops_tagged_entries_only():
+    cache = ResponseCache(4)
+    cache.put("foods", entry({"foods"}), cache.generation({"foods"}))
+    cache.put("users", entry({"users"}), cache.generation({"users"}))
+
+    cache.invalidate("foods")
+
+    assert cache.get("foods") is None
+    assert cache.get("users") is not None
+
+
+def test_a_render_that_raced_an_invalidation_is_not_stored():
+    cache = ResponseCache(4)
+    generation = cache.generation({"foods"})
+
+    cache.invalidate("foods")
+    cache.put("a", entry({"foods"}), generation)
+
+    assert cache.get("a") is None
+
+
+@pytest.fixture
+def view_client(monkeypatch):
+    monkeypatch.setitem(Config.RESPONSE_CACHE_TTL, "test-view", 60)
+    monkeypatch.setattr("utils.response_cache.cache", ResponseCache(8))
+
+    app = Flask(__name__)
+    calls = []
+
+    @app.route("/view")
+    @cached("test-view", ["foods"])
+    def view():
+        calls.append(1)
+        return jsonify({"n": len(calls)})
+
+    app.calls = calls
+    return app.test_client()
+
+
+def test_cached_view_renders_once_and_revalidates_with_etag(view_client):
+    first = view_client.get("/view")
+    second = view_client.get("/view")
+
+    assert first.json == second.json == {"n": 1}
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert view_client.application.calls == [1]
+
+    not_modified = view_client.get("/view", headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+
+    # the query string is part of the key
+    assert view_client.get("/view?page=2").json == {"n": 2}
+
+
+@pytest.fixture
+def volunteers(client, login, monkeypatch):
+    monkeypatch.setitem(Config.RESPONSE_CACHE_TTL, "public-volunteers", 60)
+    # more than a streamed page's worth
+    for _ in range(Config.STREAM_MIN_ITEMS + 5):
+        login("volunteer")
+    return client
+
+
+@pytest.mark.parametrize("query", ["", "?limit=500"])
+def test_large_public_volunteer_lists_are_cached_too(volunteers, query):
+    first = volunteers.get(f"/api/food/public/volunteers{query}")
+
+    assert first.status_code == 200
+    assert "ETag" in first.headers
+    items = first.json if not query else first.json["items"]
+    assert len(items) == Config.STREAM_MIN_ITEMS + 5
+    assert all(set(item) == {"_id", "name"} for item in items)
+
+    again = volunteers.get(
+        f"/api/food/public/volunteers{query}", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert again.status_code == 304
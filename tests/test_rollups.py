@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from services.counter_service import PLATFORM, donor_scope
+from services.rollup_service import (
+    ARCHIVE_WATERMARK, WATERMARK, InvalidRange, median_minutes, roll_up, roll_up_archive,
+    time_series
+)
+
+DAY = datetime(2026, 1, 10)
+ONE_DAY = {"from": "2026-01-10", "to": "2026-01-10"}
+
+
+def food(seq, donor_id="donor-1", **events):
+    return {
+        "_id": ObjectId(),
+        "donorId": donor_id,
+        "itemCategory": "cooked",
+        "changeSeq": seq,
+        "createdAt": DAY + timedelta(hours=9),
+        **{field: DAY + timedelta(hours=9, minutes=minutes) for field, minutes in events.items()}
+    }
+
+
+def day_totals(scope=PLATFORM):
+    (row,) = time_series(scope, ONE_DAY)["days"]
+    return {event: n for event, n in row.items() if event != "date" and n}
+
+
+def test_each_event_is_counted_once_across_runs(mock_db):
+    foods = [
+        food(1, reservedAt=10),
+        food(2, reservedAt=10),
+        food(3, "donor-2", expiredAt=600)
+    ]
+    mock_db.foods.insert_many(foods)
+
+    assert roll_up(batch_size=2) == 3
+    assert day_totals() == {"posted": 3, "reserved": 2, "expired": 1}
+    assert day_totals(donor_scope("donor-2")) == {"posted": 1, "expired": 1}
+
+    # a later change is picked up from the watermark (re-reading the
+    # overlap counts nothing twice)
+    mock_db.foods.update_one(
+        {"_id": foods[0]["_id"]},
+        {"$set": {"pickedAt": DAY + timedelta(hours=10), "changeSeq": 4}}
+    )
+    roll_up()
+
+    assert day_totals() == {"posted": 3, "reserved": 2, "picked": 1, "expired": 1}
+    assert mock_db.sequences.find_one({"_id": WATERMARK})["seq"] == 4
+
+
+def test_a_batch_sharing_one_change_seq_is_walked_in_full(mock_db):
+    mock_db.foods.insert_many([food(5) for _ in range(7)])
+
+    roll_up(batch_size=3)
+
+    assert day_totals() == {"posted": 7}
+
+
+def test_series_fills_empty_days_and_reports_medians(mock_db):
+    mock_db.foods.insert_many([
+        food(1, reservedAt=10),
+        food(2, reservedAt=10),
+        food(3, expiredAt=60)
+    ])
+    roll_up()
+
+    series = time_series(PLATFORM, {"from": "2026-01-09", "to": "2026-01-11"})
+
+    assert [row["date"] for row in series["days"]] == ["2026-01-09", "2026-01-10", "2026-01-11"]
+    assert series["days"][0]["posted"] == 0
+    assert series["expiryRate"] == {"cooked": round(1 / 3, 4)}
+    # both in the 5-10 minute bin: interpolated to its middle
+    assert series["medianMinutes"] == {"toReserve": 7.5, "toPick": None, "toDeliver": None}
+
+
+def test_archive_has_its_own_watermark(mock_db):
+    mock_db.foods_archive.insert_many([food(1), food(2)])
+
+    assert roll_up_archive() == 2
+    assert roll_up() == 0
+    assert mock_db.sequences.find_one({"_id": ARCHIVE_WATERMARK})["seq"] == 2
+    assert day_totals() == {"posted": 2}
+
+
+@pytest.mark.parametrize("histogram, median", [
+    ({}, None),
+    ({"0": 1}, 2.5),
+    ({"1": 2, "3": 2}, 10.0),
+    ({"18": 4}, 10080)
+])
+def test_median_minutes(histogram, median):
+    assert median_minutes(histogram) == median
+
+
+@pytest.mark.parametrize("args", [
+    {"from": "2026-02-01", "to": "2026-01-01"},
+    {"from": "2020-01-01", "to": "2026-01-01"},
+    {"from": "10/01/2026"}
+])
+def test_invalid_range(args):
+    with pytest.raises(InvalidRange):
+        time_series(PLATFORM, args)
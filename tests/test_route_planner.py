@@ -0,0 +1,62 @@
+from itertools import permutations
+import numpy as np
+import pytest
+from services.route_planner import plan_route, route_cost
+from utils.geo import haversine_km, haversine_matrix
+
+ORIGIN = (17.40, 78.50)
+SPEED_KMH = 20
+LATENESS_KM = 5
+
+
+def test_no_stops():
+    assert plan_route(ORIGIN, [], SPEED_KMH, LATENESS_KM) == ([], [], [], 0.0)
+
+
+def test_stops_on_a_line_are_visited_outwards():
+    stops = [(17.40, 78.50 + 0.01 * k, 99) for k in (3, 1, 4, 2)]
+
+    order, legs, arrivals, _ = plan_route(ORIGIN, stops, SPEED_KMH, LATENESS_KM)
+
+    assert order == [1, 3, 0, 2]
+    assert legs[0] == pytest.approx(haversine_km(*ORIGIN, *stops[1][:2]))
+    assert arrivals == pytest.approx(np.cumsum(legs) / SPEED_KMH)
+
+
+def test_an_item_about_to_expire_is_pulled_forward():
+    # 1 km behind the volunteer / 10.6 km ahead, reachable in time only directly
+    near = (17.40, 78.49, 99)
+    far_and_urgent = (17.40, 78.60, 0.55)
+
+    assert plan_route(ORIGIN, [near, far_and_urgent], SPEED_KMH, 0)[0] == [0, 1]
+    assert plan_route(ORIGIN, [near, far_and_urgent], SPEED_KMH, 1000)[0] == [1, 0]
+
+
+def test_small_routes_match_brute_force():
+    rng = np.random.default_rng(7)
+    stops = [
+        (17.4 + rng.uniform(-0.05, 0.05), 78.5 + rng.uniform(-0.05, 0.05), rng.uniform(0.1, 1))
+        for _ in range(6)
+    ]
+
+    _, _, _, cost = plan_route(ORIGIN, stops, SPEED_KMH, LATENESS_KM)
+
+    lats = np.array([ORIGIN[0]] + [s[0] for s in stops])
+    lngs = np.array([ORIGIN[1]] + [s[1] for s in stops])
+    dist = haversine_matrix(lats, lngs, lats, lngs)
+    deadlines = np.array([np.inf] + [s[2] for s in stops])
+    orders = np.array(list(permutations(range(1, 7))))
+    best = route_cost(orders, dist, deadlines, SPEED_KMH, LATENESS_KM).min()
+
+    # 2-opt is a heuristic; on six stops it should be at or near optimal
+    assert cost <= best * 1.05
+
+
+def test_max_passes_bounds_the_search():
+    rng = np.random.default_rng(1)
+    stops = [(17.4 + rng.uniform(-0.1, 0.1), 78.5 + rng.uniform(-0.1, 0.1), 99) for _ in range(30)]
+
+    _, _, _, bounded = plan_route(ORIGIN, stops, SPEED_KMH, LATENESS_KM, max_passes=1)
+    _, _, _, full = plan_route(ORIGIN, stops, SPEED_KMH, LATENESS_KM)
+
+    assert full <= bounded
@@ -0,0 +1,143 @@
+import base64
+import json
+import time
+from datetime import datetime, timedelta
+import pytest
+from config import Config
+from routes.food_routes import AVAILABLE, NO_LONGER_AVAILABLE, cart_query, cart_removed_query
+from services.food_lifecycle import delete_one, reserve_each
+from services.reservation_service import release_stale_reservations
+from services.sync_service import (
+    InvalidSyncToken, SyncResyncRequired, current_change_seq, decode_token, delta, encode_token
+)
+
+VOLUNTEER_ID = "volunteer-1"
+
+
+def reserve(food, volunteer_id=VOLUNTEER_ID, at=None):
+    reserve_each([food["_id"]], volunteer_id, at or datetime.utcnow(), 0)
+
+
+def available_delta(token):
+    return delta(token, AVAILABLE, {"_id": 1}, NO_LONGER_AVAILABLE, ["all"])
+
+
+@pytest.fixture
+def no_overlap(monkeypatch):
+    monkeypatch.setattr(Config, "SYNC_SEQ_OVERLAP", 0)
+
+
+def test_tokens_round_trip_and_expire():
+    assert decode_token(encode_token(42)) == 42
+
+    with pytest.raises(InvalidSyncToken):
+        decode_token("garbage!")
+
+    issued = time.time() - Config.SYNC_TOMBSTONE_TTL_HOURS * 3600 - 1
+    old = base64.urlsafe_b64encode(json.dumps({"s": 1, "t": int(issued)}).encode()).decode()
+    with pytest.raises(SyncResyncRequired):
+        decode_token(old)
+
+
+def test_delta_reports_changes_and_removals_since_the_token(mock_db, add_food, no_overlap):
+    add_food()
+    taken, deleted = add_food(), add_food()
+    token = encode_token(current_change_seq())
+
+    added = add_food()
+    reserve(taken)
+    delete_one({"_id": deleted["_id"]})
+
+    items, removed = available_delta(token)
+
+    assert [doc["_id"] for doc in items] == [added["_id"]]
+    assert sorted(removed) == sorted([str(taken["_id"]), str(deleted["_id"])])
+
+
+def test_released_reservation_leaves_a_cart_tombstone(mock_db, add_food, no_overlap):
+    food = add_food()
+    reserve(food, at=datetime.utcnow() - timedelta(minutes=Config.RESERVATION_HOLD_MINUTES + 1))
+    token = encode_token(current_change_seq())
+
+    assert release_stale_reservations() == 1
+
+    # reservedBy is gone from the document, only the tombstone knows
+    def cart_delta(volunteer_id):
+        return delta(
+            token,
+            cart_query(volunteer_id),
+            {"_id": 1},
+            cart_removed_query(volunteer_id),
+            ["all", f"cart:{volunteer_id}"]
+        )
+
+    assert cart_delta(VOLUNTEER_ID) == ([], [str(food["_id"])])
+    # nobody else's cart hears about it
+    assert cart_delta("volunteer-2") == ([], [])
+
+
+def test_a_food_that_left_and_came_back_is_not_removed(mock_db, add_food, no_overlap):
+    food = add_food()
+    token = encode_token(current_change_seq())
+
+    reserve(food, at=datetime.utcnow() - timedelta(days=1))
+    release_stale_reservations()
+
+    items, removed = available_delta(token)
+
+    assert [doc["_id"] for doc in items] == [food["_id"]]
+    assert removed == []
+
+
+def test_too_many_changes_ask_for_a_resync(mock_db, add_food, no_overlap, monkeypatch):
+    token = encode_token(current_change_seq())
+    for _ in range(3):
+        add_food()
+
+    monkeypatch.setattr(Config, "SYNC_MAX_CHANGES", 2)
+    with pytest.raises(SyncResyncRequired):
+        available_delta(token)
+
+
+def test_available_since_returns_the_delta_and_a_new_token(client, login, add_food, no_overlap):
+    _, headers = login("volunteer")
+    kept, taken = add_food(), add_food()
+
+    page = client.get("/api/food/available?limit=10", headers=headers).json
+    assert {item["_id"] for item in page["items"]} == {str(kept["_id"]), str(taken["_id"])}
+
+    added = add_food()
+    reserve(taken, "volunteer-2")
+
+    body = client.get(f"/api/food/available?since={page['sync_token']}", headers=headers).json
+    assert [item["_id"] for item in body["items"]] == [str(added["_id"])]
+    assert body["removed"] == [str(taken["_id"])]
+
+    # nothing since the new token
+    body = client.get(f"/api/food/available?since={body['sync_token']}", headers=headers).json
+    assert (body["items"], body["removed"]) == ([], [])
+
+
+def test_my_cart_since_sees_its_own_releases(client, login, add_food, no_overlap):
+    volunteer_id, headers = login("volunteer")
+    food = add_food()
+    reserve(food, volunteer_id)
+
+    token = client.get("/api/food/my-cart?limit=10", headers=headers).json["sync_token"]
+    assert client.post(f"/api/food/unreserve/{food['_id']}", headers=headers).status_code == 200
+
+    body = client.get(f"/api/food/my-cart?since={token}", headers=headers).json
+    assert (body["items"], body["removed"]) == ([], [str(food["_id"])])
+
+
+def test_since_rejects_bad_and_stale_tokens(client, login, add_food, no_overlap, monkeypatch):
+    _, headers = login("volunteer")
+    token = encode_token(current_change_seq())
+
+    assert client.get("/api/food/available?since=garbage!", headers=headers).status_code == 400
+    assert client.get("/api/food/my-cart?since=garbage!", headers=headers).status_code == 400
+
+    add_food()
+    add_food()
+    monkeypatch.setattr(Config, "SYNC_MAX_CHANGES", 1)
+    assert client.get(f"/api/food/available?since={token}", headers=headers).status_code == 410
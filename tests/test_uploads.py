@@ -0,0 +1,84 @@
+import base64
+import io
+import json
+from datetime import datetime, timedelta
+from config import Config
+
+FIELDS = {
+    "foodName": "rice",
+    "quantity": "5 plates",
+    "foodType": "veg",
+    "itemCategory": "cooked",
+    "address": "Hyderabad",
+    "location": {"lat": 17.4, "lng": 78.5},
+    "isSameAsLocation": True
+}
+
+
+def multipart(image_bytes, **fields):
+    data = {**FIELDS, "expiryTime": (datetime.utcnow() + timedelta(hours=6)).isoformat(), **fields}
+    return {"data": json.dumps(data), "image": (io.BytesIO(image_bytes), "food.png")}
+
+
+def test_add_takes_the_image_as_a_file_part(client, login, image_b64, mock_db):
+    donor_id, headers = login("donor")
+
+    response = client.post(
+        "/api/food/add",
+        data=multipart(base64.b64decode(image_b64)),
+        headers=headers,
+        content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 201
+    food = mock_db.foods.find_one({"donorId": donor_id})
+    assert food["foodName"] == "rice"
+    assert set(food["image"]) >= {"hash", "thumbnail"}
+
+
+def test_multipart_needs_a_json_data_part(client, login, image_b64):
+    _, headers = login("donor")
+    body = multipart(base64.b64decode(image_b64))
+    body["data"] = "{not json"
+
+    response = client.post(
+        "/api/food/add", data=body, headers=headers, content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 400
+
+
+def test_uploads_over_the_limit_are_refused(client, login, mock_db, monkeypatch):
+    monkeypatch.setattr(Config, "MAX_UPLOAD_BYTES", 1024)
+    _, headers = login("donor")
+
+    response = client.post(
+        "/api/food/add",
+        data=multipart(b"\0" * 4096),
+        headers=headers,
+        content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 413
+    assert response.json == {"message": "Request is too large"}
+    assert mock_db.foods.count_documents({}) == 0
+
+
+def test_deliver_takes_the_delivery_image_as_a_file_part(client, login, add_food, image_b64, mock_db):
+    _, headers = login("volunteer")
+    food_id = str(add_food()["_id"])
+    client.post(f"/api/food/reserve/{food_id}", headers=headers)
+    client.post(f"/api/food/pick/{food_id}", headers=headers)
+
+    response = client.post(
+        f"/api/food/deliver/{food_id}",
+        data={
+            "data": json.dumps({"deliveryAddress": "Shelter"}),
+            "deliveryImage": (io.BytesIO(base64.b64decode(image_b64)), "proof.png")
+        },
+        headers=headers,
+        content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 200
+    assert mock_db.foods.find_one()["status"] == "delivered"
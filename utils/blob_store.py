@@ -0,0 +1,144 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from config import Config
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobStore:
+    # Content-addressed: the key of a blob is the sha256 of its bytes,
+    # so identical uploads are only stored once.
+
+    @staticmethod
+    def key_for(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data, content_type):
+        raise NotImplementedError
+
+    def put_file(self, f, content_type):
+        # f: seekable binary file; backends override to avoid the read()
+        f.seek(0)
+        return self.put(f.read(), content_type)
+
+    def get(self, key):
+        # -> (bytes, content_type) or None
+        raise NotImplementedError
+
+    def open(self, key):
+        # -> (path or binary file, content_type) or None, for send_file
+        blob = self.get(key)
+        if blob is None:
+            return None
+        data, content_type = blob
+        return io.BytesIO(data), content_type
+
+    def exists(self, key):
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def put(self, data, content_type):
+        key = self.key_for(data)
+        path = self._path(key)
+
+        if os.path.exists(path):
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # content type first so a visible blob always has one
+        self._write_atomic(path + ".type", content_type.encode())
+        self._write_atomic(path, data)
+        return key
+
+    # Uploads spooled to disk by the request parser are hashed and
+    # copied in chunks instead of being read into memory.
+    def put_file(self, f, content_type):
+        f.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+        key = digest.hexdigest()
+        path = self._path(key)
+
+        if os.path.exists(path):
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        f.seek(0)
+        self._write_atomic(path + ".type", content_type.encode())
+        self._write_atomic(path, f)
+        return key
+
+    def get(self, key):
+        path = self._path(key)
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            with open(path + ".type", "rb") as f:
+                content_type = f.read().decode()
+        except FileNotFoundError:
+            return None
+
+        return data, content_type
+
+    def open(self, key):
+        path = self._path(key)
+
+        try:
+            with open(path + ".type", "rb") as f:
+                content_type = f.read().decode()
+        except FileNotFoundError:
+            return None
+
+        # absolute: send_file resolves relative paths against the app root
+        return os.path.abspath(path), content_type
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    @staticmethod
+    def _write_atomic(path, data):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(data, bytes):
+                    f.write(data)
+                else:
+                    shutil.copyfileobj(data, f, CHUNK_SIZE)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+BACKENDS = {
+    "local": lambda: LocalBlobStore(Config.BLOB_STORE_PATH),
+}
+
+_store = None
+
+
+def get_blob_store():
+    global _store
+
+    if _store is None:
+        backend = Config.BLOB_STORE_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown blob store backend: {backend}")
+        _store = BACKENDS[backend]()
+
+    return _store
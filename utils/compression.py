@@ -0,0 +1,81 @@
+import gzip
+import zlib
+from flask import request
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# preferred first when the client rates them equally
+ENCODINGS = ["br", "gzip"] if brotli else ["gzip"]
+
+
+def compressor(encoding):
+    if encoding == "br":
+        c = brotli.Compressor(quality=Config.COMPRESS_BROTLI_QUALITY)
+        return c.process, c.finish
+
+    # wbits 31: zlib stream with a gzip header
+    c = zlib.compressobj(Config.COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return c.compress, c.flush
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=Config.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, Config.COMPRESS_GZIP_LEVEL)
+
+
+def compress_stream(chunks, encoding):
+    process, finish = compressor(encoding)
+
+    try:
+        for chunk in chunks:
+            out = process(chunk)
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+
+
+# Compresses JSON responses of at least COMPRESS_MIN_BYTES (streamed
+# pages always) with the best encoding the client accepts. A strong
+# ETag set by the response cache is weakened, since the bytes now
+# depend on Accept-Encoding; If-None-Match compares weakly anyway.
+def init_compression(app):
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.mimetype != "application/json"
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < Config.COMPRESS_MIN_BYTES:
+                return response
+            response.set_data(compress(data, encoding))
+
+        response.headers["Content-Encoding"] = encoding
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
@@ -1,8 +1,18 @@
 from pymongo import MongoClient
 from config import Config
+from utils.metrics import CommandMetrics
 
-client = MongoClient(Config.MONGO_URI)
-db = client["zero_hunger"]
+client = MongoClient(Config.MONGO_URI, event_listeners=[CommandMetrics()])
+db = client[Config.MONGO_DB_NAME]
 
 users_collection = db.users
 foods_collection = db.foods
+archive_collection = db.foods_archive
+counters_collection = db.counters
+leases_collection = db.leases
+sequences_collection = db.sequences
+tombstones_collection = db.food_tombstones
+karma_windows_collection = db.karma_windows
+map_cells_collection = db.map_cells
+rollups_collection = db.daily_rollups
+
@@ -0,0 +1,75 @@
+import math
+import numpy as np
+from config import Config
+from utils.geohash import encode as geohash_encode
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+# { lat, lng } -> (lat, lng) floats, None if missing or out of range
+def parse_lat_lng(location):
+    if not isinstance(location, dict):
+        return None
+
+    try:
+        lat = float(location["lat"])
+        lng = float(location["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        return None
+
+    return lat, lng
+
+
+# { lat, lng } -> GeoJSON Point (MongoDB wants [lng, lat])
+def to_geojson(location):
+    if isinstance(location, dict) and location.get("type") == "Point":
+        return location
+
+    parsed = parse_lat_lng(location)
+    if parsed is None:
+        return None
+
+    lat, lng = parsed
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+# GeoJSON Point -> { lat, lng } shape the clients expect
+def to_lat_lng(location):
+    if isinstance(location, dict) and location.get("type") == "Point":
+        lng, lat = location["coordinates"]
+        return {"lat": lat, "lng": lng}
+    return location
+
+
+# GeoJSON Point -> geohash at GEOHASH_PRECISION (stored on foods for
+# the map cells)
+def geohash_of(location):
+    lng, lat = location["coordinates"]
+    return geohash_encode(lat, lng, Config.GEOHASH_PRECISION)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# Pairwise great-circle distances (km) between two sets of points,
+# given as arrays of degrees; returns a len(lats1) x len(lats2) matrix.
+def haversine_matrix(lats1, lngs1, lats2, lngs2):
+    lat1 = np.radians(np.asarray(lats1, dtype=float))[:, None]
+    lng1 = np.radians(np.asarray(lngs1, dtype=float))[:, None]
+    lat2 = np.radians(np.asarray(lats2, dtype=float))[None, :]
+    lng2 = np.radians(np.asarray(lngs2, dtype=float))[None, :]
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
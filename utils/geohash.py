@@ -0,0 +1,74 @@
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(lat, lng, precision):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # bits alternate lng, lat, lng, ...
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                value = value * 2 + 1
+                lng_range[0] = mid
+            else:
+                value *= 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                value = value * 2 + 1
+                lat_range[0] = mid
+            else:
+                value *= 2
+                lat_range[1] = mid
+
+        even = not even
+        bits += 1
+
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+# (height, width) in degrees of a cell at this precision
+def cell_size(precision):
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+# Every cell at `precision` that overlaps the box
+def cells_covering(min_lat, min_lng, max_lat, max_lng, precision):
+    height, width = cell_size(precision)
+    cells = []
+
+    # walk the grid through cell centres, starting from the cell that
+    # contains the box's south-west corner
+    lat = (int((min_lat + 90) // height) + 0.5) * height - 90
+    while lat - height / 2 < max_lat and lat < 90:
+        lng = (int((min_lng + 180) // width) + 0.5) * width - 180
+        while lng - width / 2 < max_lng and lng < 180:
+            cells.append(encode(lat, lng, precision))
+            lng += width
+        lat += height
+
+    return cells
+
+
+def count_covering(min_lat, min_lng, max_lat, max_lng, precision):
+    height, width = cell_size(precision)
+    last_row = round(180 / height) - 1
+    last_col = round(360 / width) - 1
+
+    rows = min(int((max_lat + 90) // height), last_row) - int((min_lat + 90) // height) + 1
+    cols = min(int((max_lng + 180) // width), last_col) - int((min_lng + 180) // width) + 1
+    return rows * cols
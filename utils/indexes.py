@@ -0,0 +1,114 @@
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from config import Config
+
+# Every query the routes run should be served by one of these.
+# Sort keys end in _id because the cursor pagination tie-breaks on it.
+INDEXES = {
+    "foods": [
+        # /my-foods
+        IndexModel(
+            [("donorId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)],
+            name="donor_createdAt"
+        ),
+        # /available, expiry job
+        IndexModel(
+            [("status", ASCENDING), ("expiryTime", ASCENDING), ("_id", ASCENDING)],
+            name="status_expiryTime"
+        ),
+        # /my-cart, /volunteer/profile
+        IndexModel(
+            [("reservedBy", ASCENDING), ("status", ASCENDING),
+             ("reservedAt", DESCENDING), ("_id", DESCENDING)],
+            name="reservedBy_status_reservedAt"
+        ),
+        # stale reservation sweeper
+        IndexModel(
+            [("status", ASCENDING), ("reservedAt", ASCENDING)],
+            name="status_reservedAt"
+        ),
+        # /volunteer/deliveries
+        IndexModel(
+            [("reservedBy", ASCENDING), ("status", ASCENDING),
+             ("deliveredAt", DESCENDING), ("_id", DESCENDING)],
+            name="reservedBy_status_deliveredAt"
+        ),
+        # /public/deliveries
+        IndexModel(
+            [("status", ASCENDING), ("deliveredAt", DESCENDING)],
+            name="status_deliveredAt"
+        ),
+        # delta sync (?since=) on /available and /my-cart
+        IndexModel([("status", ASCENDING), ("changeSeq", ASCENDING)], name="status_changeSeq"),
+        IndexModel([("reservedBy", ASCENDING), ("changeSeq", ASCENDING)], name="reservedBy_changeSeq"),
+        # rollups, change feed polling fallback
+        IndexModel([("changeSeq", ASCENDING)], name="changeSeq"),
+        # /available?lat=&lng=
+        IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+    ],
+    "foods_archive": [
+        # /my-foods?includeArchived=true
+        IndexModel(
+            [("donorId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)],
+            name="donor_createdAt"
+        ),
+        # /volunteer/deliveries?includeArchived=true
+        IndexModel(
+            [("reservedBy", ASCENDING), ("status", ASCENDING),
+             ("deliveredAt", DESCENDING), ("_id", DESCENDING)],
+            name="reservedBy_status_deliveredAt"
+        ),
+        # karma window rebuild
+        IndexModel(
+            [("status", ASCENDING), ("deliveredAt", DESCENDING)],
+            name="status_deliveredAt"
+        ),
+        # rollup rebuild
+        IndexModel([("changeSeq", ASCENDING)], name="changeSeq"),
+    ],
+    "food_tombstones": [
+        IndexModel([("scope", ASCENDING), ("seq", ASCENDING)], name="scope_seq"),
+        IndexModel(
+            [("createdAt", ASCENDING)],
+            name="createdAt_ttl",
+            expireAfterSeconds=Config.SYNC_TOMBSTONE_TTL_HOURS * 3600
+        ),
+    ],
+    "leases": [
+        # drops abandoned leader leases
+        IndexModel([("expiresAt", ASCENDING)], name="expiresAt_ttl", expireAfterSeconds=0),
+    ],
+    "karma_windows": [
+        # weekly / monthly leaderboard pages and rank counts
+        IndexModel(
+            [("window", ASCENDING), ("karmaPoints", DESCENDING), ("_id", ASCENDING)],
+            name="window_karmaPoints"
+        ),
+        IndexModel([("expiresAt", ASCENDING)], name="expiresAt_ttl", expireAfterSeconds=0),
+    ],
+    "users": [
+        # login, register (duplicate check is the unique constraint)
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # /public/donors, /public/volunteers
+        IndexModel(
+            [("role", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)],
+            name="role_createdAt"
+        ),
+        # /public/leaderboard and /volunteer/rank
+        IndexModel(
+            [("role", ASCENDING), ("karmaPoints", DESCENDING), ("_id", ASCENDING)],
+            name="role_karmaPoints"
+        ),
+        IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+    ],
+}
+
+
+# createIndexes is a no-op for indexes that already exist with the same
+# name and spec, so this is safe to run on every startup.
+def ensure_indexes(db):
+    created = {}
+
+    for collection_name, models in INDEXES.items():
+        created[collection_name] = db[collection_name].create_indexes(models)
+
+    return created
@@ -0,0 +1,99 @@
+import orjson
+from bson import ObjectId
+from flask import Response, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
+from config import Config
+from utils.pagination import encode_cursor, page_result
+
+# naive datetimes in the database are UTC
+OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    return orjson.dumps(obj, default=default, option=OPTIONS)
+
+
+# app.json: ObjectId -> hex string, datetime -> ISO 8601, via orjson
+class OrjsonProvider(JSONProvider):
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj) + b"\n", mimetype=self.mimetype)
+
+
+# {"items": [...], **fields, "next_cursor": ...} for a cursor that was
+# opened with limit + 1. Small pages are serialized in one go; pages of
+# STREAM_MIN_ITEMS or more are written as a chunked array straight off
+# the cursor, so memory stays flat however large the page is.
+# transform(doc) runs on each item before it is serialized, then the
+# hidden fields are dropped. limit None (an unpaged legacy request,
+# see find_page) streams every doc as a bare array.
+# stream=False renders every size in one go; @cached views need it,
+# a streamed body can't be hashed for an ETag or stored.
+def page_response(docs, sort, limit, transform=None, hidden=(), stream=True, **fields):
+    def present(doc):
+        if transform:
+            transform(doc)
+        for field in hidden:
+            doc.pop(field, None)
+
+    if limit is None and not stream:
+        docs = list(docs)
+        for doc in docs:
+            present(doc)
+        return jsonify(docs), 200
+
+    if limit is not None and (limit < Config.STREAM_MIN_ITEMS or not stream):
+        docs, next_cursor = page_result(list(docs), sort, limit)
+        for doc in docs:
+            present(doc)
+        return jsonify({"items": docs, **fields, "next_cursor": next_cursor}), 200
+
+    def generate():
+        buffer = bytearray(b"[" if limit is None else b'{"items":[')
+        last = None
+        next_cursor = None
+
+        try:
+            for count, doc in enumerate(docs):
+                if count == limit:
+                    next_cursor = encode_cursor(last, sort)
+                    break
+
+                # transform may drop sort fields, keep them for the cursor
+                last = {field: doc.get(field) for field, _ in sort}
+                present(doc)
+
+                if count:
+                    buffer += b","
+                buffer += dumps(doc)
+
+                if len(buffer) >= Config.STREAM_CHUNK_BYTES:
+                    yield bytes(buffer)
+                    buffer.clear()
+        finally:
+            close = getattr(docs, "close", None)
+            if close:
+                close()
+
+        if limit is None:
+            buffer += b"]"
+        else:
+            buffer += b"],"
+            buffer += dumps({**fields, "next_cursor": next_cursor})[1:]
+        yield bytes(buffer)
+
+    return Response(stream_with_context(generate()), mimetype="application/json"), 200
@@ -0,0 +1,219 @@
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar
+import bson
+from bson.errors import InvalidDocument
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY,
+    generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route",
+    ["method", "route", "status"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size by route",
+    ["method", "route"],
+    buckets=[256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216]
+)
+MONGO_LATENCY = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency",
+    ["collection", "command", "route"],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5]
+)
+MONGO_DOCUMENTS = Counter(
+    "mongodb_documents_returned_total",
+    "Documents returned by MongoDB commands",
+    ["collection", "command", "route"]
+)
+# Encoding a reply again costs about as much as decoding it did, so only
+# a MONGO_REPLY_SAMPLE_RATE share of replies is measured: the histogram
+# gives sizes per command, its count is not the number of commands.
+MONGO_REPLY_SIZE = Histogram(
+    "mongodb_reply_size_bytes",
+    "Sampled MongoDB reply sizes",
+    ["collection", "command", "route"],
+    buckets=[256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216]
+)
+MONGO_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "Failed MongoDB commands",
+    ["collection", "command", "route"]
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Cached endpoint lookups by result (hit, miss, bypass)",
+    ["cache", "result"]
+)
+
+# Mongo commands issued while handling the current request; the command
+# listener runs on the thread that issued the command, so a ContextVar
+# ties each command to its request.
+_current = ContextVar("mongo_commands", default=None)
+
+
+def current_route():
+    state = _current.get()
+    return state["route"] if state else "background"
+
+
+def reply_bytes(reply):
+    try:
+        return len(bson.encode(reply))
+    except (InvalidDocument, TypeError):
+        return None
+
+
+class CommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = command.get("collection", "")
+        self._pending[event.request_id] = collection
+
+    def succeeded(self, event):
+        collection = self._pending.pop(event.request_id, "")
+        reply = event.reply
+
+        documents = 0
+        cursor = reply.get("cursor")
+        if isinstance(cursor, dict):
+            documents = len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+        elif "value" in reply:
+            documents = 1 if reply["value"] else 0
+
+        self._record(event, collection, event.duration_micros / 1e6, documents, reply)
+
+    def failed(self, event):
+        collection = self._pending.pop(event.request_id, "")
+        MONGO_FAILURES.labels(collection, event.command_name, current_route()).inc()
+        self._record(event, collection, event.duration_micros / 1e6, 0)
+
+    def _record(self, event, collection, seconds, documents, reply=None):
+        route = current_route()
+        labels = (collection, event.command_name, route)
+
+        MONGO_LATENCY.labels(*labels).observe(seconds)
+        MONGO_DOCUMENTS.labels(*labels).inc(documents)
+
+        if reply is not None and random.random() < Config.MONGO_REPLY_SAMPLE_RATE:
+            size = reply_bytes(reply)
+            if size is not None:
+                MONGO_REPLY_SIZE.labels(*labels).observe(size)
+
+        # the reply is kept so a slow request can log its size; it is
+        # only encoded if the request turns out to be slow
+        state = _current.get()
+        if state is not None:
+            state["commands"].append((
+                collection, event.command_name, seconds, documents,
+                reply if Config.SLOW_REQUEST_MS else None
+            ))
+
+
+# Expiry engine lag, read at scrape time from the engine in this
+# process; nothing is reported where it isn't running (web processes
+# with RUN_JOBS=false - the worker serves it on WORKER_METRICS_PORT).
+# describe() keeps registration from calling collect(), which would
+# import the engine (and utils.db) while utils.db is still being
+# imported.
+class ExpiryEngineCollector:
+    NAMES = (
+        "pending", "expired_total", "lag_seconds_avg",
+        "lag_seconds_max", "lag_seconds_p50", "lag_seconds_p99"
+    )
+
+    def describe(self):
+        for name in self.NAMES:
+            yield GaugeMetricFamily(f"expiry_engine_{name}", f"Expiry engine {name}")
+
+    def collect(self):
+        from services.expiry_engine import engine
+
+        if not engine.running:
+            return
+
+        for name, value in engine.metrics().items():
+            yield GaugeMetricFamily(f"expiry_engine_{name}", f"Expiry engine {name}", value=value)
+
+
+REGISTRY.register(ExpiryEngineCollector())
+
+
+def init_metrics(app):
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_token = _current.set({
+            "route": request.url_rule.rule if request.url_rule else "unmatched",
+            "commands": []
+        })
+
+    @app.after_request
+    def record_request(response):
+        state = _current.get()
+        if state is None or "metrics_start" not in g:
+            return response
+
+        elapsed = time.perf_counter() - g.metrics_start
+        route = state["route"]
+
+        REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(elapsed)
+        # streamed responses have no length up front
+        if response.content_length is not None:
+            RESPONSE_SIZE.labels(request.method, route).observe(response.content_length)
+
+        if Config.SLOW_REQUEST_MS and elapsed * 1000 >= Config.SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request %s %s: %.1f ms, %s bytes, mongo: %s",
+                request.method, route, elapsed * 1000, response.content_length,
+                "; ".join(
+                    f"{cmd} {coll} {sec * 1000:.1f} ms {docs} docs "
+                    f"{reply_bytes(reply) if reply is not None else '-'} bytes"
+                    for coll, cmd, sec, docs, reply in state["commands"]
+                ) or "none"
+            )
+
+        return response
+
+    @app.teardown_request
+    def reset_request_state(exc):
+        token = g.pop("metrics_token", None)
+        if token is not None:
+            _current.reset(token)
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(generate_latest(scrape_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+# Under gunicorn every worker process writes its samples to
+# PROMETHEUS_MULTIPROC_DIR (set before start, emptied on each deploy,
+# with multiprocess.mark_process_dead in the child_exit hook); a scrape
+# of any one worker then merges them all. Without it, the process's own
+# registry is served.
+def scrape_registry():
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # the engine's gauges are read live, not from the shared files
+    registry.register(ExpiryEngineCollector())
+    return registry
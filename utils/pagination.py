@@ -0,0 +1,177 @@
+import base64
+import binascii
+import heapq
+from datetime import datetime
+from functools import cmp_to_key
+from itertools import islice
+from bson import ObjectId, json_util
+from config import Config
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+# Cursors are opaque to clients: the sort-key values of the last item
+# on the page, BSON-JSON encoded so datetimes and ObjectIds round-trip.
+def encode_cursor(doc, sort):
+    values = [doc.get(field) for field, _ in sort]
+    raw = json_util.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, sort):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidPageRequest("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise InvalidPageRequest("Invalid cursor")
+
+    return values
+
+
+def parse_page_args(args):
+    try:
+        limit = int(args.get("limit", Config.PAGE_SIZE_DEFAULT))
+    except ValueError:
+        raise InvalidPageRequest("Invalid limit")
+
+    if limit < 1:
+        raise InvalidPageRequest("Invalid limit")
+
+    return min(limit, Config.PAGE_SIZE_MAX), args.get("cursor")
+
+
+# Clients written before pagination send neither limit nor cursor and
+# expect the whole list as a bare array; limit None stands for that.
+def is_unpaged(args):
+    return "limit" not in args and "cursor" not in args
+
+
+# Sort fields find_page adds to a projection only for the cursor;
+# page_response drops them from the items.
+def hidden_sort_fields(projection, sort):
+    if projection is None:
+        return ()
+    return tuple(field for field, _ in sort if field not in projection)
+
+
+# Lexicographic "strictly after" filter for a compound sort, e.g.
+# [(expiryTime, 1), (_id, 1)] after (t, id) ->
+#   expiryTime > t  OR  (expiryTime == t AND _id > id)
+def keyset_filter(sort, values):
+    clauses = []
+
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+
+    return {"$or": clauses}
+
+
+# Fold the base query into every $or branch so each branch is a plain
+# index range on the endpoint's compound index.
+def after_cursor(query, sort, values):
+    branches = keyset_filter(sort, values)["$or"]
+
+    if any(field in query for field, _ in sort):
+        return {"$and": [query, {"$or": branches}]}
+
+    return {"$or": [{**query, **branch} for branch in branches]}
+
+
+# Open cursor over limit + 1 docs (the extra one says whether there is
+# a next page); see page_result and json_provider.page_response.
+# whole_list: the endpoint predates pagination, unpaged requests get
+# every doc and limit None.
+def find_page(collection, query, projection, sort, args, whole_list=False):
+    # sort must end with _id so every position is unique
+    if projection is not None:
+        projection = {**projection, **{field: 1 for field, _ in sort}}
+
+    if whole_list and is_unpaged(args):
+        return collection.find(query, projection).sort(sort), None
+
+    limit, cursor = parse_page_args(args)
+
+    if cursor:
+        query = after_cursor(query, sort, decode_cursor(cursor, sort))
+
+    return collection.find(query, projection).sort(sort).limit(limit + 1), limit
+
+
+# BSON comparison order of the types a sort field can hold; a missing
+# field sorts as null, before everything else
+# (bool before int, which it subclasses)
+TYPE_ORDER = (
+    (type(None), 0), (bool, 7), ((int, float), 1), (str, 2), (dict, 3),
+    (list, 4), (bytes, 5), (ObjectId, 6), (datetime, 8)
+)
+
+
+def bson_rank(value):
+    for types, rank in TYPE_ORDER:
+        if isinstance(value, types):
+            return rank
+    return 9
+
+
+def sort_key(sort):
+    def compare(a, b):
+        for field, direction in sort:
+            x, y = a.get(field), b.get(field)
+            # values are only compared within the same type
+            x, y = (bson_rank(x), x), (bson_rank(y), y)
+            if x != y:
+                return direction if x > y else -direction
+        return 0
+
+    return cmp_to_key(compare)
+
+
+# The same document in two collections (mid-move) has the same sort
+# key, so its copies come out of the merge next to each other.
+def unique_by_id(docs):
+    last_id = None
+
+    for doc in docs:
+        if doc["_id"] != last_id:
+            yield doc
+        last_id = doc["_id"]
+
+
+# find_page over several collections holding the same kind of document
+# (foods + foods_archive): each is read in index order with the same
+# keyset filter and the cursors are merged lazily, so a page still
+# reads at most limit + 1 docs per collection.
+def find_page_merged(collections, query, projection, sort, args, whole_list=False):
+    pages = []
+
+    for collection in collections:
+        docs, limit = find_page(collection, query, projection, sort, args, whole_list)
+        pages.append(docs)
+
+    merged = unique_by_id(heapq.merge(*pages, key=sort_key(sort)))
+    if limit is None:
+        return merged, None
+
+    return islice(merged, limit + 1), limit
+
+
+def paginate(collection, query, projection, sort, args):
+    docs, limit = find_page(collection, query, projection, sort, args)
+    return page_result(list(docs), sort, limit)
+
+
+def page_result(docs, sort, limit):
+    next_cursor = None
+
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort)
+
+    return docs, next_cursor
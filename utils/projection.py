@@ -0,0 +1,88 @@
+class InvalidFields(ValueError):
+    pass
+
+
+FOOD_DETAILS = (
+    "foodName", "quantity", "foodType", "itemCategory", "expiryTime",
+    "address", "location", "isSameAsLocation", "image", "createdAt"
+)
+DELIVERY_DETAILS = (
+    "deliveredAt", "deliveryAddress", "deliveryImage", "deliveryNotes"
+)
+
+# Per list endpoint: the lean default fieldset, and the fields each role
+# may ask for with ?fields=a,b,c ("*" = any caller). _id is always
+# returned; image fields come back as <field>Url / <field>ThumbnailUrl.
+VIEWS = {
+    "my-foods": {
+        "default": (
+            "foodName", "quantity", "foodType", "itemCategory", "expiryTime",
+            "status", "address", "image", "isSameAsLocation"
+        ),
+        "allowed": {
+            "donor": FOOD_DETAILS + DELIVERY_DETAILS + (
+                "status", "updatedAt", "reservedAt", "pickedAt"
+            )
+        }
+    },
+    "available": {
+        "default": (
+            "foodName", "quantity", "foodType", "itemCategory", "expiryTime",
+            "address", "location", "image"
+        ),
+        "allowed": {
+            "volunteer": FOOD_DETAILS,
+            "donor": FOOD_DETAILS
+        }
+    },
+    "my-cart": {
+        "default": (
+            "foodName", "quantity", "foodType", "itemCategory", "expiryTime",
+            "status", "address", "location", "image", "reservedAt", "pickedAt"
+        ),
+        "allowed": {
+            "volunteer": FOOD_DETAILS + ("status", "updatedAt", "reservedAt", "pickedAt")
+        }
+    },
+    "volunteer-deliveries": {
+        "default": (
+            "foodName", "quantity", "itemCategory", "deliveryAddress",
+            "deliveryImage", "deliveredAt"
+        ),
+        "allowed": {
+            "volunteer": FOOD_DETAILS + DELIVERY_DETAILS + ("reservedAt", "pickedAt")
+        }
+    },
+    "public-deliveries": {
+        "default": ("foodName", "deliveryImage", "deliveredAt", "deliveryAddress"),
+        "allowed": {
+            "*": (
+                "foodName", "foodType", "itemCategory", "quantity",
+                "deliveredAt", "deliveryAddress", "deliveryImage"
+            )
+        }
+    }
+}
+
+
+# ?fields= (or the view's default) -> Mongo projection
+def projection_for(view, role, args):
+    spec = VIEWS[view]
+    requested = args.get("fields")
+
+    if requested is None:
+        fields = spec["default"]
+    else:
+        fields = [field.strip() for field in requested.split(",") if field.strip()]
+        allowed = spec["allowed"].get(role) or spec["allowed"].get("*", ())
+
+        if not fields:
+            raise InvalidFields("fields must not be empty")
+
+        rejected = [field for field in fields if field not in allowed]
+        if rejected:
+            raise InvalidFields(
+                f"Invalid fields: {', '.join(rejected)}; allowed: {', '.join(allowed)}"
+            )
+
+    return {"_id": 1, **{field: 1 for field in fields}}
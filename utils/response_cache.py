@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+from functools import wraps
+from flask import Response, make_response, request
+from config import Config
+from utils.metrics import RESPONSE_CACHE_REQUESTS
+
+Entry = namedtuple("Entry", ["body", "etag", "mimetype", "expires_at", "tags"])
+
+
+# In-process TTL + LRU cache of whole response bodies. Entries carry
+# tags ("users", "foods", ...) and the write paths invalidate by tag.
+# Each process has its own cache, so writes made by another process
+# (e.g. the expiry job on the leader) show up once the TTL runs out.
+class ResponseCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    # read before rendering; put() drops the entry if any of its tags
+    # were invalidated meanwhile, so a stale render is never stored
+    def generation(self, tags):
+        with self._lock:
+            return tuple(self._generations[tag] for tag in tags)
+
+    def put(self, key, entry, generation):
+        with self._lock:
+            if tuple(self._generations[tag] for tag in entry.tags) != generation:
+                return
+
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+
+            stale = [key for key, entry in self._entries.items() if entry.tags & set(tags)]
+            for key in stale:
+                del self._entries[key]
+
+
+cache = ResponseCache(Config.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def invalidate(*tags):
+    cache.invalidate(*tags)
+
+
+# Serve the view from the cache for RESPONSE_CACHE_TTL[name] seconds,
+# keyed on the query string, with a strong ETag so clients can
+# revalidate with If-None-Match and get a 304.
+def cached(name, tags):
+    tags = frozenset(tags)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            ttl = Config.RESPONSE_CACHE_TTL.get(name, 0)
+            if ttl <= 0:
+                return view(*args, **kwargs)
+
+            key = (name, tuple(sorted(request.args.items(multi=True))))
+            entry = cache.get(key)
+
+            if entry is not None:
+                RESPONSE_CACHE_REQUESTS.labels(name, "hit").inc()
+            else:
+                generation = cache.generation(tags)
+                response = make_response(view(*args, **kwargs))
+
+                # errors and streamed pages go out as they are
+                if response.status_code != 200 or response.is_streamed:
+                    RESPONSE_CACHE_REQUESTS.labels(name, "bypass").inc()
+                    return response
+
+                RESPONSE_CACHE_REQUESTS.labels(name, "miss").inc()
+                body = response.get_data()
+                entry = Entry(
+                    body,
+                    hashlib.sha256(body).hexdigest(),
+                    response.mimetype,
+                    time.monotonic() + ttl,
+                    tags
+                )
+                cache.put(key, entry, generation)
+
+            response = Response(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+            # let clients keep a copy but revalidate it every time
+            response.headers["Cache-Control"] = "no-cache"
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,37 @@
+import logging
+import signal
+import sys
+from apscheduler.schedulers.blocking import BlockingScheduler
+from prometheus_client import start_http_server
+from config import Config
+from utils.db import db
+from utils.indexes import ensure_indexes
+from scheduler import configure_jobs, shutdown
+
+# Standalone job runner, so web processes can start with RUN_JOBS=false:
+#
+#   python worker.py
+#
+# Any number of workers can run; the scheduler lease elects one leader.
+# Each serves its metrics (expiry engine lag, job Mongo commands) on
+# WORKER_METRICS_PORT, since web processes don't see them.
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    ensure_indexes(db)
+
+    if Config.WORKER_METRICS_PORT:
+        start_http_server(Config.WORKER_METRICS_PORT)
+
+    scheduler = BlockingScheduler()
+    configure_jobs(scheduler)
+
+    def stop(signum, frame):
+        shutdown(scheduler)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    scheduler.start()